@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of the cost of a cached call through `MethodCache`.
+
+It compares, per call:
+
+- the music21 call without any cache
+- a call through `SmartModuleCache` whose result is already cached
+- building the `CallableArguments` key with the fast key scheme and with
+  `deepdiff.DeepHash` (the scheme used for every argument before the fast one)
+
+Usage::
+
+    python benchmarks/method_cache.py [path/to/score.xml] [number of calls]
+"""
+import sys
+from timeit import timeit
+
+from music21.converter import parse
+from music21.note import Note
+from music21.stream import Measure
+
+from musif.cache import SmartModuleCache
+from musif.cache.cache import CallableArguments
+
+
+def _per_call(stmt, number: int) -> float:
+    return timeit(stmt, number=number) / number * 1e6
+
+
+def main(file_path: str = "xml_example/example.xml", number: int = 2000):
+    score = parse(file_path)
+    part = score.parts[0]
+    cached_part = SmartModuleCache(part, resurrect_reference=None)
+    cached_part.getElementsByClass(Measure)
+
+    results = {
+        "music21 getElementsByClass(Measure)": _per_call(
+            lambda: part.getElementsByClass(Measure), number
+        ),
+        "cached getElementsByClass(Measure)": _per_call(
+            lambda: cached_part.getElementsByClass(Measure), number
+        ),
+        "key (Measure,), fast": _per_call(lambda: CallableArguments(Measure), number),
+        "key (Measure,), DeepHash": _per_call(
+            lambda: CallableArguments(Measure)._deep_hash(), number
+        ),
+        "key ([Note, Measure], 'x', flat=True), fast": _per_call(
+            lambda: CallableArguments([Note, Measure], "x", flat=True), number
+        ),
+        "key ([Note, Measure], 'x', flat=True), DeepHash": _per_call(
+            lambda: CallableArguments([Note, Measure], "x", flat=True)._deep_hash(),
+            number,
+        ),
+    }
+    width = max(len(name) for name in results)
+    for name, microseconds in results.items():
+        print(f"{name:<{width}}  {microseconds:10.2f} us/call")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *map(int, sys.argv[2:3]))
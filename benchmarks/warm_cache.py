@@ -0,0 +1,71 @@
+"""
+Check that features can be added over a warm cache.
+
+It extracts the features `first` into an empty `cache_dir`, then the features `second`
+over that cache (so that the cached objects that `first` did not use are resurrected),
+and compares the result with `second` extracted into another empty `cache_dir`. The
+time and the cache counters of each run are printed, and the exit status is 1 if the
+results differ.
+
+Usage::
+
+    python benchmarks/warm_cache.py [data_dir] [first features] [second features] [window_size] [overlap]
+
+Features are comma-separated, e.g.::
+
+    python benchmarks/warm_cache.py xml_example core core,scale
+    python benchmarks/warm_cache.py xml_example core core,tempo 4 1
+"""
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
+
+from musif.extract.extract import FeaturesExtractor
+
+
+def _extract(data_dir: str, features: str, cache_dir: str, **kwargs) -> DataFrame:
+    extractor = FeaturesExtractor(
+        None,
+        data_dir=data_dir,
+        basic_modules=["scoring"],
+        features=features.split(","),
+        cache_dir=cache_dir,
+        console_log_level="ERROR",
+        **kwargs,
+    )
+    start = perf_counter()
+    df = extractor.extract()
+    print(f"{features:<30} {perf_counter() - start:8.2f} s  {extractor.cache_stats}")
+    return df
+
+
+def main(
+    data_dir: str = "xml_example",
+    first: str = "core",
+    second: str = "core,scale",
+    window_size: int = None,
+    overlap: int = 0,
+) -> bool:
+    kwargs = {}
+    if window_size is not None:
+        kwargs = dict(window_size=window_size, overlap=overlap)
+    with TemporaryDirectory() as warm_dir, TemporaryDirectory() as cold_dir:
+        _extract(data_dir, first, warm_dir, **kwargs)
+        warm = _extract(data_dir, second, warm_dir, **kwargs)
+        cold = _extract(data_dir, second, cold_dir, **kwargs)
+    try:
+        assert_frame_equal(warm, cold)
+    except AssertionError as e:
+        print(f"The warm and cold extractions differ: {e}")
+        return False
+    print("The warm and cold extractions are equal")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(
+        0 if main(*sys.argv[1:4], *map(int, sys.argv[4:6])) else 1
+    )
@@ -5,6 +5,7 @@ from pathlib import Path
 import musif.musicxml.constants as musicxml_c
 import musif.extract.constants as extract_c
 
+from musif.cache import CacheStore
 from musif.config import ExtractConfiguration, PostProcessConfiguration
 from musif.extract.extract import FeaturesExtractor
 from musif.logs import perr, pinfo
@@ -176,7 +177,50 @@ def main(
     processed_df.to_csv(output_path, index=False)
 
 
+def cache_stats(cache_dir: str = "musif_cache"):
+    """
+    Prints the number of files, the size and the last use of the cache.
+
+    Examples of usage:
+        musif cache stats --cache_dir=musif_cache
+
+    Args:
+        cache_dir : directory of the cache
+    """
+    stats = CacheStore(cache_dir).stats()
+    for k, v in stats.items():
+        print(f"{k}: {v}")
+
+
+def cache_prune(cache_dir: str = "musif_cache", max_size: str = None):
+    """
+    Removes the least recently used files of the cache until its size is within
+    `max_size`.
+
+    Examples of usage:
+        musif cache prune --cache_dir=musif_cache --max_size=10GB
+        musif cache prune --max_size=0
+            -> empties the cache
+
+    Args:
+        cache_dir : directory of the cache
+        max_size : maximum size of the cache, in bytes or as a string, e.g. '500MB'
+    """
+    if max_size is None:
+        perr("Please, provide the maximum size of the cache with `--max_size`")
+        sys.exit(1)
+    removed, freed = CacheStore(cache_dir).prune(str(max_size))
+    pinfo(f"Removed {removed} files ({freed} bytes) from {cache_dir}")
+
+
 if __name__ == "__main__":
     import fire
 
-    fire.Fire(main, name="musif")
+    if len(sys.argv) > 1 and sys.argv[1] == "cache":
+        fire.Fire(
+            {"stats": cache_stats, "prune": cache_prune},
+            command=sys.argv[2:],
+            name="musif cache",
+        )
+    else:
+        fire.Fire(main, name="musif")
@@ -1,5 +1,6 @@
 """
 This package implements utilities to cache and speed-up the extraction of features.
 """
-from .cache import SmartModuleCache, CACHE_FILE_EXTENSION
-from .utils import isinstance, iscache, hasattr, store_score_df, FileCacheIntoRAM
+from .cache import SmartModuleCache, CacheStats, cache_stats, CACHE_FILE_EXTENSION
+from .utils import isinstance, iscache, hasattr, store_score_df, FileCacheIntoRAM, file_cache
+from .store import CacheStore, atomic_write, parse_size
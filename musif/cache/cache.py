@@ -1,18 +1,103 @@
 import logging
 import random
 import weakref
+from hashlib import blake2b
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from deepdiff import DeepHash, deephash
 
 from musif.common.exceptions import CannotResurrectObject, SmartCacheModified
-from musif.logs import pinfo, pwarn
+from musif.logs import pdebug, pwarn
 
 deephash.logger.setLevel(logging.ERROR)
 
 CACHE_FILE_EXTENSION = ".pkl"
 
 
+class CacheStats:
+    """
+    Counters describing how the cache has been used in the current process.
+
+    * `hits`: number of scores loaded from a cache file without parsing them
+    * `misses`: number of scores that had to be parsed because no usable cache file
+      was found
+    * `resurrections`: number of times a cached object had to load its reference
+      object (i.e. music21 was used again) because an attribute was not in cache
+    * `module_hits`: number of feature modules whose features were loaded from the
+      features cache (see `features_cache_dir`) instead of being computed
+    * `module_misses`: number of feature modules that were computed because their
+      features were not in the features cache
+    * `ram_hits` and `ram_misses`: number of scores found (or not found) in the RAM
+      cache (see `ram_cache_size`)
+    * `invalidations`: number of cache files that were parsed again because their
+      header did not match the current versions and options (also counted in
+      `misses`)
+
+    Objects of this class can be summed and subtracted, so that the counters
+    collected by different processes (or before and after an operation) can be
+    merged.
+    """
+
+    __slots__ = (
+        "hits",
+        "misses",
+        "resurrections",
+        "module_hits",
+        "module_misses",
+        "ram_hits",
+        "ram_misses",
+        "invalidations",
+    )
+
+    def __init__(
+        self,
+        hits: int = 0,
+        misses: int = 0,
+        resurrections: int = 0,
+        module_hits: int = 0,
+        module_misses: int = 0,
+        ram_hits: int = 0,
+        ram_misses: int = 0,
+        invalidations: int = 0,
+    ):
+        self.hits = hits
+        self.misses = misses
+        self.resurrections = resurrections
+        self.module_hits = module_hits
+        self.module_misses = module_misses
+        self.ram_hits = ram_hits
+        self.ram_misses = ram_misses
+        self.invalidations = invalidations
+
+    def copy(self) -> "CacheStats":
+        return CacheStats(*(getattr(self, k) for k in self.__slots__))
+
+    def reset(self) -> None:
+        for k in self.__slots__:
+            setattr(self, k, 0)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __add__(self, other: "CacheStats") -> "CacheStats":
+        return CacheStats(
+            *(getattr(self, k) + getattr(other, k) for k in self.__slots__)
+        )
+
+    def __sub__(self, other: "CacheStats") -> "CacheStats":
+        return CacheStats(
+            *(getattr(self, k) - getattr(other, k) for k in self.__slots__)
+        )
+
+    def __repr__(self):
+        values = ", ".join(f"{k}={v}" for k, v in self.to_dict().items())
+        return f"CacheStats({values})"
+
+
+cache_stats = CacheStats()
+"""Counters of the cache usage in this process"""
+
+
 class ObjectReference:
     """
     This handles the calls to the reference object so that both
@@ -20,7 +105,7 @@ class ObjectReference:
     resurrects it, the other sees it.
     """
 
-    __slots__ = ("reference", "resurrect_reference", "parent", "name", "args")
+    __slots__ = ("reference", "resurrect_reference", "parent", "name", "args", "kwargs")
 
     def __init__(
         self,
@@ -29,15 +114,18 @@ class ObjectReference:
         parent=None,
         name: str = "",
         args: Optional[Tuple] = None,
+        kwargs: Optional[Tuple] = None,
     ):
         self.reference = reference
         self.resurrect_reference = resurrect_reference
         self.parent = parent
         self.name = name
         self.args = args
+        self.kwargs = kwargs
         # self.deephash = DeepHash(reference)[reference]
 
     def _try_resurrect(self) -> None:
+        cache_stats.resurrections += 1
         if self.resurrect_reference is None:
             if self.parent is None:
                 raise CannotResurrectObject(self)
@@ -51,13 +139,14 @@ class ObjectReference:
                     else:
                         origin = getattr(origin, self.name[i])
                     if self.args[i] is not None:
-                        origin = origin(*self.args[i])
+                        kwargs = self.kwargs[i] if self.kwargs is not None else None
+                        origin = origin(*self.args[i], **(kwargs or {}))
                 self.reference = origin
 
         else:
             func = self.resurrect_reference[0]
             args = self.resurrect_reference[1:]
-            pinfo(f"Resurrecting via function call: {func}{args}")
+            pdebug(f"Resurrecting via function call: {getattr(func, '__name__', func)}")
             self.reference = func(*args)
             # self.deephash = DeepHash(self.reference)
 
@@ -77,6 +166,7 @@ class ObjectReference:
             parent=self.parent,
             name=self.name,
             args=self.args,
+            kwargs=self.kwargs,
         )
 
     def __setstate__(self, state):
@@ -85,6 +175,7 @@ class ObjectReference:
         self.parent = state["parent"]
         self.name = state["name"]
         self.args = state["args"]
+        self.kwargs = state.get("kwargs")
 
     def __repr__(self):
         return f"ObjectReference({self.reference}, {self.name})"
@@ -165,6 +256,7 @@ class SmartModuleCache:
         parent: Optional[ObjectReference] = None,
         name: Tuple[str] = ("",),
         args: Tuple[Optional[Tuple]] = (None,),
+        kwargs: Tuple[Optional[Dict]] = (None,),
         target_addresses: List[str] = ["music21"],
         check_reference_changes: bool = False,
     ):
@@ -176,7 +268,7 @@ class SmartModuleCache:
             "_hash": random.randint(10**10, 10**15),
             "_target_addresses": target_addresses,
             "_reference": ObjectReference(
-                reference, resurrect_reference, parent, name, args
+                reference, resurrect_reference, parent, name, args, kwargs
             ),
             "_check_reference_changes": check_reference_changes,
             "_type": type(reference),
@@ -201,6 +293,32 @@ class SmartModuleCache:
             return False, e
         return True, None
 
+    def get_reference(self) -> Any:
+        """
+        Returns the wrapped object, resurrecting it if needed. The operations done on
+        the returned object are not cached.
+        """
+        reference = self.cache["_reference"]
+        if not hasattr(reference, "reference") or reference.reference is None:
+            reference._try_resurrect()
+        return reference.reference
+
+    def get_resurrect_reference(self) -> Optional[Tuple]:
+        """
+        Returns the function, followed by its arguments, used to resurrect the
+        reference object, or None if it is resurrected from the parent object.
+        """
+        return self.cache["_reference"].resurrect_reference
+
+    def set_resurrect_reference(self, resurrect_reference: Optional[Tuple]):
+        """
+        Sets the function, followed by its arguments, used to resurrect the reference
+        object. Objects obtained from this one only resurrect this object instead of
+        its parents, e.g. a single part of a score can be parsed instead of the whole
+        score.
+        """
+        self.cache["_reference"].resurrect_reference = resurrect_reference
+
     def __repr__(self):
         _reference = self.cache["_reference"]
         _addresses = self.cache["_target_addresses"]
@@ -210,7 +328,8 @@ class SmartModuleCache:
     def __str__(self):
         s = self.cache.get("__str__")
         if s is None:
-            s = str(self.cache["_reference"].reference)
+            # the reference object is resurrected if the cache was loaded from disk
+            s = self.cache["_reference"].get_attr("__str__")()
             self.cache["__str__"] = s
         return s
 
@@ -263,8 +382,7 @@ class SmartModuleCache:
         # traceback.print_list(
         #     [f for f in traceback.extract_stack() if "musif" in f.filename]
         # )
-        if self.cache["_reference"].reference is not None:
-            self.cache["_reference"].get_attr("__setattr__")(name, value)
+        self.cache["_reference"].get_attr("__setattr__")(name, value)
 
     def _get_new_attr(self, name: str) -> Any:
         if name.startswith(self.SPECIAL_METHODS_NAME):
@@ -373,16 +491,22 @@ class SmartModuleCache:
 class CallableArguments:
     """
     This class represents a set of ordered arguments.
-    The hash is the concatenation of the argument hashes.
-    If the arguments are SmartModuleCache objects, this object uses their cache (which
-    persists to disk), otherwise it uses `deepdiff.DeepHash` to compute a hash based on
-    the content value (which should persists across pickling).
-
-    Note that `DeepHash` may be much slower than the builtin `hash()` function,
-    so for large and complex objects like `music21.Score`, just use a
-    `SmartModuleCache` wrapper.
+
+    The hash must persist across pickling, because `MethodCache` objects are pickled
+    with their dictionary. When all the arguments are of simple types (`str`, `int`,
+    `float`, `bool`, `None`, classes, `SmartModuleCache` objects and tuples or lists of
+    these), the hash is computed from a textual key of the arguments, which is fast.
+    `SmartModuleCache` objects are represented by their own hash, which persists to
+    disk with their cache.
+
+    Otherwise, it falls back to `deepdiff.DeepHash` to compute a hash based on the
+    content value of the arguments. Note that `DeepHash` may be much slower, so for
+    large and complex objects like `music21.Score`, just use a `SmartModuleCache`
+    wrapper.
     """
 
+    __slots__ = ("args", "kwargs", "_hash")
+
     def __init__(self, *args, **kwargs):
         self.args = []
         self.kwargs = {}
@@ -390,20 +514,24 @@ class CallableArguments:
         # removing weakreferences (cannot be pickled)
         for arg in args:
             if isinstance(arg, weakref.ReferenceType):
-                __import__('ipdb').set_trace()
                 self.args.append(arg())
             else:
                 self.args.append(arg)
 
         for k, v in kwargs.items():
-            if isinstance(k, weakref.ReferenceType):
-                __import__('ipdb').set_trace()
-                k = k()
             if isinstance(v, weakref.ReferenceType):
-                __import__('ipdb').set_trace()
                 v = v()
-            kwargs[k] = v
+            self.kwargs[k] = v
 
+        key = _fast_key(self.args, self.kwargs)
+        if key is not None:
+            self._hash = int.from_bytes(
+                blake2b(key.encode("utf-8"), digest_size=8).digest(), "big"
+            )
+        else:
+            self._hash = self._deep_hash()
+
+    def _deep_hash(self) -> int:
         h = ""
 
         # hashing SmartModuleCache
@@ -421,7 +549,14 @@ class CallableArguments:
         all_args = (self.args, self.kwargs)
         h += DeepHash(all_args, exclude_types=[SmartModuleCache])[all_args]
 
-        self._hash = int(h, 16)
+        return int(h, 16)
+
+    def __getstate__(self):
+        return {"args": self.args, "kwargs": self.kwargs, "_hash": self._hash}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            object.__setattr__(self, k, v)
 
     def __hash__(self):
         return self._hash
@@ -435,13 +570,52 @@ class CallableArguments:
     def __repr__(self):
         ret = "CallableArguments("
         for a in self.args:
-            ret += f"{repr(self.args)}, "
+            ret += f"{repr(a)}, "
         for k, v in self.kwargs.items():
             ret += f"{repr(k)}={repr(v)}, "
         ret += ")"
         return ret
 
 
+_SIMPLE_TYPES = {str: "s", int: "i", float: "f", bool: "b", type(None): "n"}
+
+
+def _fast_key(args: list, kwargs: dict) -> Optional[str]:
+    """
+    Returns a textual key of the arguments, stable across processes, or None if any
+    argument is not of a simple type (see `CallableArguments`).
+    """
+    parts = []
+    for arg in args:
+        if not _append_key(arg, parts):
+            return None
+    for k in sorted(kwargs.keys()):
+        parts.append(f"k{k}=")
+        if not _append_key(kwargs[k], parts):
+            return None
+    return "".join(parts)
+
+
+def _append_key(obj: Any, parts: List[str]) -> bool:
+    t = type(obj)
+    prefix = _SIMPLE_TYPES.get(t)
+    if prefix is not None:
+        parts.append(f"{prefix}{obj!r};")
+    elif t is SmartModuleCache:
+        parts.append(f"c{hash(obj)};")
+    elif isinstance(obj, type):
+        parts.append(f"t{obj.__module__}.{obj.__qualname__};")
+    elif t is tuple or t is list:
+        parts.append("(" if t is tuple else "[")
+        for item in obj:
+            if not _append_key(item, parts):
+                return False
+        parts.append(");" if t is tuple else "];")
+    else:
+        return False
+    return True
+
+
 class MethodCache:
     """
     A simple wrapper that checks if the arguments are in the
@@ -472,7 +646,7 @@ class MethodCache:
         self.special_method = special_method
         self.check_reference_changes = check_reference_changes
 
-    def _wmo(self, obj, args=None):
+    def _wmo(self, obj, args=None, kwargs=None):
         from .utils import wrap_module_objects
         return wrap_module_objects(
             obj,
@@ -481,6 +655,7 @@ class MethodCache:
             parent=self.reference,
             name=(self.name,),
             args=(args,),
+            kwargs=(kwargs,),
         )
 
     def __call__(self, *args, **kwargs):
@@ -502,7 +677,8 @@ class MethodCache:
                 # caching _MyNone and returning None
                 self.cache[call_args] = _MyNone
             else:
-                res = self._wmo(res, args=(*args, *kwargs.values()))
+                # keyword arguments are replayed by name when `res` is resurrected
+                res = self._wmo(res, args=tuple(args), kwargs=kwargs)
                 self.cache[call_args] = res
             if self.check_reference_changes and self.reference.ischanged():
                 pwarn(str(SmartCacheModified(self, self.name)))
@@ -0,0 +1,266 @@
+import importlib.metadata
+import json
+import os
+import pickle
+import re
+import struct
+import time
+from pathlib import Path, PurePath
+from tempfile import mkstemp
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+import music21
+
+from musif.common.exceptions import CacheHeaderMismatch
+from musif.logs import lwarn
+
+from .cache import CACHE_FILE_EXTENSION
+
+CACHE_MAGIC = b"MUSIFCACHE"
+"""First bytes of the files written by `CacheStore`"""
+
+CACHE_FORMAT = 2
+"""Version of the format of the files written by `CacheStore`"""
+
+_HEADER_LENGTH = struct.Struct(">I")
+
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(size: Union[int, str, None]) -> Optional[int]:
+    """
+    Converts a size such as `1048576`, `'500MB'`, `'10 GB'` or `'2G'` to a number of
+    bytes (units are powers of 1024). `None` is returned as is.
+    """
+    if size is None or isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", str(size).upper())
+    if match is None:
+        raise ValueError(f"Invalid size: {size}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def get_versions() -> Dict[str, str]:
+    """
+    Returns the versions of musif and music21.
+    """
+    try:
+        musif_version = importlib.metadata.version("musif")
+    except importlib.metadata.PackageNotFoundError:
+        musif_version = "unknown"
+    return {"musif": musif_version, "music21": str(music21.__version__)}
+
+
+def atomic_write(path: Union[str, PurePath], data: bytes) -> None:
+    """
+    Writes `data` to `path` through a temporary file in the same directory, which is
+    then renamed, so that readers (e.g. other workers) never see a truncated file.
+    """
+    path = Path(path)
+    fd, tmp_path = mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class CacheStore:
+    """
+    A content-addressed store of pickled objects on disk.
+
+    Each file starts with a small JSON header containing the versions of musif and
+    music21 and the fields given by the caller (e.g. the options used to load a score).
+    `load` compares the header with the expected one before unpickling the object, and
+    raises :class:`musif.common.exceptions.CacheHeaderMismatch` if they differ, so that
+    only the outdated files are built again. `read_header` reads the header alone.
+
+    Each object is saved in a file named after its key (usually a content hash, see
+    :func:`musif.extract.incremental.file_digest`), in a shard directory named after the
+    first two characters of the key, so that directories stay small even with very large
+    corpora. Files are written atomically, so the same store can be shared by many
+    workers.
+
+    If `max_size` (bytes, or a string like `'10GB'`) is not None, the least recently
+    used files are removed when the store exceeds it. The time of the last use is the
+    modification time of the files, which is updated each time a file is loaded.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, PurePath],
+        max_size: Union[int, str, None] = None,
+        extension: str = CACHE_FILE_EXTENSION,
+    ):
+        self.directory = Path(directory)
+        self.max_size = parse_size(max_size)
+        self.extension = extension
+        # bytes written since the size of the store was last checked
+        self._written = 0
+
+    def path(self, key: str) -> Path:
+        """
+        Returns the path of the file of `key`.
+        """
+        return self.directory / key[:2] / f"{key}{self.extension}"
+
+    def get(self, key: str, header: Optional[dict] = None) -> Optional[Any]:
+        """
+        Returns the object stored with `key`, or None if it is not stored, if its header
+        does not match `header` or if it cannot be loaded.
+        """
+        path = self.path(key)
+        if not path.exists():
+            return None
+        try:
+            return self.load(path, header)
+        except CacheHeaderMismatch as e:
+            lwarn(str(e))
+            return None
+        except Exception as e:
+            lwarn(f"Cannot load the cached object {path}: {e}")
+            return None
+
+    def put(self, key: str, obj: Any, header: Optional[dict] = None) -> None:
+        """
+        Stores `obj` with `key` and `header`.
+        """
+        self.dump(self.path(key), obj, header)
+
+    def make_header(self, header: Optional[dict] = None) -> dict:
+        """
+        Returns the full header of a file: the format, the versions of musif and
+        music21 and the fields in `header`.
+        """
+        full_header = {"format": CACHE_FORMAT, **get_versions()}
+        if header is not None:
+            full_header.update(header)
+        # normalized as it is read from the file
+        return json.loads(json.dumps(full_header, sort_keys=True, default=repr))
+
+    def read_header(self, path: Union[str, PurePath]) -> Optional[dict]:
+        """
+        Returns the header of the file `path` without unpickling the object, or None
+        if the file has no header (e.g. it was written by an older version of musif).
+        """
+        with open(path, "rb") as f:
+            return self._read_header(f)
+
+    def _read_header(self, f) -> Optional[dict]:
+        if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+            return None
+        (length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+        return json.loads(f.read(length).decode("utf-8"))
+
+    def load(self, path: Union[str, PurePath], header: Optional[dict] = None) -> Any:
+        """
+        Unpickles the file `path` and marks it as recently used.
+
+        If `header` is not None, the header of the file must be equal to
+        `make_header(header)`, otherwise `CacheHeaderMismatch` is raised before
+        unpickling. Files without a header never match.
+        """
+        with open(path, "rb") as f:
+            found = self._read_header(f)
+            if header is not None:
+                expected = self.make_header(header)
+                if found != expected:
+                    raise CacheHeaderMismatch(path, expected, found)
+            if found is None:
+                # legacy files contain the pickle alone
+                f.seek(0)
+            obj = pickle.load(f)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return obj
+
+    def dump(
+        self, path: Union[str, PurePath], obj: Any, header: Optional[dict] = None
+    ) -> None:
+        """
+        Pickles `obj` into the file `path` atomically, after the header built from
+        `header`, and, if needed, removes the least recently used files to keep the
+        store within `max_size`.
+        """
+        path = Path(path)
+        encoded_header = json.dumps(
+            self.make_header(header), sort_keys=True
+        ).encode("utf-8")
+        data = b"".join(
+            (
+                CACHE_MAGIC,
+                _HEADER_LENGTH.pack(len(encoded_header)),
+                encoded_header,
+                pickle.dumps(obj),
+            )
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, data)
+        if self.max_size is not None:
+            self._written += len(data)
+            # scanning the store is expensive: do it after writing 1/10 of the budget
+            if self._written >= self.max_size // 10:
+                self.prune()
+
+    def entries(self) -> Iterator[Tuple[Path, int, float]]:
+        """
+        Yields the path, the size in bytes and the time of the last use of each file in
+        the store.
+        """
+        if not self.directory.exists():
+            return
+        for path in self.directory.rglob(f"*{self.extension}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                # removed by another worker
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the number of files, their total size in bytes, the number of shards and
+        the time of the oldest and most recent use.
+        """
+        entries = list(self.entries())
+        last_uses = [last_use for _, _, last_use in entries]
+        return {
+            "directory": str(self.directory),
+            "files": len(entries),
+            "size": sum(size for _, size, _ in entries),
+            "max_size": self.max_size,
+            "shards": len({path.parent for path, _, _ in entries}),
+            "oldest_use": time.ctime(min(last_uses)) if entries else None,
+            "newest_use": time.ctime(max(last_uses)) if entries else None,
+        }
+
+    def prune(self, max_size: Union[int, str, None] = None) -> Tuple[int, int]:
+        """
+        Removes the least recently used files until the store is within `max_size`
+        (the `max_size` of the store by default). Returns the number of files removed
+        and the bytes freed.
+        """
+        max_size = parse_size(max_size) if max_size is not None else self.max_size
+        self._written = 0
+        if max_size is None:
+            return 0, 0
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        removed, freed = 0, 0
+        for path, size, _ in entries:
+            if total - freed <= max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
@@ -1,8 +1,10 @@
 import builtins
 import pickle
+import sys
 import weakref
+from collections import OrderedDict
 from pathlib import PurePath, Path
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import music21 as m21
 import pandas as pd
@@ -12,32 +14,97 @@ from musif.cache.cache import MethodCache, ObjectReference, SmartModuleCache
 
 class FileCacheIntoRAM:
     """
-    This class simply stores a dictionary of key-value. In `musif`, it is used to cache
-    the objects (values) coming from the parsing of files (whose names are the keys). It
-    is never written to disk and only kept into RAM.
+    A least-recently-used cache of key-value pairs kept into RAM, with a capacity in
+    bytes. In `musif`, it is used to cache the objects (values) coming from the loading
+    of files (whose content hashes are the keys), so that a score loaded again in the
+    same process, e.g. by another extraction or to resurrect cached objects, is neither
+    read from the disk cache nor parsed again. It is never written to disk.
+
+    The size of each value is given by the caller or estimated from its pickled size.
+    Values larger than the capacity are not stored. `get` and `put` are O(1).
+
+    The counters `hits`, `misses` and `evictions` describe its usage.
     """
 
     def __init__(self, capacity: int):
         self._capacity = capacity
-        self._items = []
+        self._items = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
 
-    def put(self, key: str, value: Any):
-        if self.full:
-            del self._items[0]
-        self._items.append({"key": key, "value": value})
+    @capacity.setter
+    def capacity(self, value: int):
+        self._capacity = value
+        self._evict()
+
+    def put(self, key: str, value: Any, size: Optional[int] = None):
+        if size is None:
+            size = _estimate_size(value)
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        if size > self._capacity:
+            return
+        self._items[key] = (value, size)
+        self.size += size
+        self._evict()
 
     def get(self, key: str) -> Optional[Any]:
-        for item in self._items:
-            if item["key"] == key:
-                return item["value"]
-        return None
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[0]
 
     def clear(self) -> None:
         self._items.clear()
+        self.size = 0
 
     @property
     def full(self) -> bool:
-        return len(self._items) == self._capacity
+        return self.size >= self._capacity
+
+    def stats(self) -> dict:
+        return {
+            "items": len(self._items),
+            "size": self.size,
+            "capacity": self._capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def _evict(self):
+        while self.size > self._capacity and len(self._items) > 0:
+            _, (_, size) = self._items.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+
+def _estimate_size(value: Any) -> int:
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+file_cache = FileCacheIntoRAM(0)
+"""The RAM cache of this process, used by `FeaturesExtractor` (see the option
+`ram_cache_size`)"""
 
 
 def iscache(obj1):
@@ -83,6 +150,7 @@ def wrap_module_objects(
     parent: Optional[ObjectReference] = None,
     name: Tuple[str] = ("",),
     args: Tuple[Optional[Tuple]] = (None,),
+    kwargs: Tuple[Optional[Dict]] = (None,),
 ):
     """
     Returns the object wrapped with `SmartModuleCache` class if it was defined
@@ -109,6 +177,7 @@ def wrap_module_objects(
                 parent=parent,
                 name=name,
                 args=args,
+                kwargs=kwargs,
             )
 
     if isinstance(obj, (list, tuple)):
@@ -120,6 +189,7 @@ def wrap_module_objects(
                 parent,
                 (*name, "__getitem__"),
                 (*args, (i,)),
+                (*kwargs, None),
             )
             for i, v in enumerate(obj)
         ]
@@ -29,6 +29,32 @@ class SmartCacheModified(Exception):
 
 
 class FeatureError(RuntimeError):
-    """Exception raised when computing one of the features modules"""
+    """Exception raised when computing one of the features modules; `module` is the
+    name of the module"""
 
-    pass
+    def __init__(self, message: str, module: str = None):
+        super().__init__(message)
+        self.module = module
+
+
+class FastParserError(Exception):
+    """Exception raised when a file cannot be read by the fast MusicXML parser and has to be parsed with music21"""
+
+    def __init__(self, file_path: str, reason: str):
+        super().__init__(f"Fast parser cannot read '{file_path}': {reason}")
+
+
+class CacheHeaderMismatch(Exception):
+    """Raised when a cache file was written by other versions or with other options"""
+
+    def __init__(self, file_path, expected: dict, found):
+        if found is None:
+            reason = "it has no header"
+        else:
+            fields = sorted(
+                k
+                for k in set(expected) | set(found)
+                if expected.get(k) != found.get(k)
+            )
+            reason = f"these fields changed: {', '.join(fields)}"
+        super().__init__(f"Cache file '{file_path}' is outdated, {reason}")
@@ -2,7 +2,11 @@ from pathlib import PurePath
 
 from musif.common._logs import create_logger
 from musif.common._utils import read_object_from_yaml_file
-from musif.extract.constants import REQUIRE_MSCORE
+from musif.extract.constants import (
+    FAST_PARSER_BASIC_MODULES,
+    FAST_PARSER_FEATURES,
+    REQUIRE_MSCORE,
+)
 
 """Check config_extraction_example.yml file for the purpose of these variables, if needed."""
 LOGGER_NAME = "musif"
@@ -13,8 +17,20 @@ CONSOLE_LOG_LEVEL = "console_log_level"
 data_dir = "data_dir"
 MUSESCORE_DIR = "musescore_dir"
 CACHE_DIR = "cache_dir"
+CACHE_MAX_SIZE = "cache_max_size"
+RAM_CACHE_SIZE = "ram_cache_size"
+INCREMENTAL_DIR = "incremental_dir"
+FEATURES_CACHE_DIR = "features_cache_dir"
+MUSIC21_CACHE_DIR = "music21_cache_dir"
+MUSIC21_FEATURES = "music21_features"
+MUSIC21_PARALLEL = "music21_parallel"
 IGNORE_ERRORS = "ignore_errors"
+ERROR_JOURNAL = "error_journal"
 PARALLEL = "parallel"
+PARALLEL_CHUNKSIZE = "parallel_chunksize"
+WINDOW_CHUNKSIZE = "window_chunksize"
+STREAM_OUTPUT = "stream_output"
+MEASURE_STATISTICS = "measure_statistics"
 FEATURES = "features"
 BASIC_MODULES = "basic_modules"
 BASIC_MODULES_ADDRESSES = "basic_modules_addresses"
@@ -25,6 +41,7 @@ WINDOW_SIZE = "window_size"
 OVERLAP = "overlap"
 PRECACHE_HOOKS = "precache_hooks"
 REMOVE_UNPITCHED_OBJECTS = "remove_unpitched_objects"
+FAST_PARSER = "fast_parser"
 MSCORE_EXEC = "mscore_exec"
 SPLIT_KEYWORDS = "split_keywords"
 
@@ -56,10 +73,20 @@ _CONFIG_FALLBACK = {
     data_dir: None,
     MUSESCORE_DIR: None,
     CACHE_DIR: None,
+    CACHE_MAX_SIZE: None,
+    RAM_CACHE_SIZE: None,
+    INCREMENTAL_DIR: None,
+    FEATURES_CACHE_DIR: None,
+    MUSIC21_CACHE_DIR: None,
     PARALLEL: 1,
+    PARALLEL_CHUNKSIZE: 1,
+    WINDOW_CHUNKSIZE: None,
+    STREAM_OUTPUT: None,
+    MEASURE_STATISTICS: False,
     PRECACHE_HOOKS: [],
     BASIC_MODULES: [],
     IGNORE_ERRORS: False,
+    ERROR_JOURNAL: None,
     BASIC_MODULES_ADDRESSES: ["musif.extract.basic_modules"],
     FEATURE_MODULES_ADDRESSES: ["musif.extract.features"],
     FEATURES: ["core"],
@@ -71,6 +98,9 @@ _CONFIG_FALLBACK = {
     MSCORE_EXEC: None,
     DFS_DIR: None,
     REMOVE_UNPITCHED_OBJECTS: True,
+    FAST_PARSER: False,
+    MUSIC21_FEATURES: [],
+    MUSIC21_PARALLEL: 1,
 }
 
 _CONFIG_POST_FALLBACK = {
@@ -213,6 +243,27 @@ class ExtractConfiguration(GenericConfiguration):
             return True
         return feature in self.features
 
+    def can_use_fast_parser(self) -> bool:
+        """
+        Returns `True` if the fast parser is requested and all the requested features
+        and options can be computed from its arrays.
+        Returns `False` otherwise.
+        """
+
+        if not self.fast_parser or self.features is None:
+            return False
+        if any(feature not in FAST_PARSER_FEATURES for feature in self.features):
+            return False
+        if any(module not in FAST_PARSER_BASIC_MODULES for module in self.basic_modules):
+            return False
+        return (
+            not self.expand_repeats
+            and self.window_size is None
+            and not self.measure_statistics
+            and len(self.precache_hooks) == 0
+            and self.dfs_dir is None
+        )
+
 
 class PostProcessConfiguration(GenericConfiguration):
     """
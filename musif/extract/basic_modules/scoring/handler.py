@@ -12,6 +12,7 @@ from musif.extract.constants import (
     DATA_PART_ABBREVIATION,
     DATA_PART_NUMBER,
     DATA_SCORE,
+    DATA_SCORE_HEADER,
     DATA_SOUND,
     DATA_SOUND_ABBREVIATION,
 )
@@ -69,8 +70,9 @@ def update_score_objects(
     filtered_count_by_sound = {}
     filtered_count_by_family = {}
     score = score_data[DATA_SCORE]
+    header = score_data.get(DATA_SCORE_HEADER)
     for part in score.parts:
-        sound = extract_sound(part, cfg)
+        sound = extract_sound(part, cfg, header)
         part_abbreviation, sound_abbreviation, part_number = _extract_abbreviated_part(
             sound, part, score_data[DATA_FILTERED_PARTS], cfg)
         is_matching_part = _part_matches_filter(part_abbreviation, cfg.parts_filter)
@@ -13,6 +13,9 @@ DATA_MUSESCORE_SCORE = "MS3_score"
 DATA_FILE = "file"
 DATA_FILTERED_PARTS = "parts"
 DATA_NUMERIC_TEMPO = "numeric_tempo"
+DATA_SCORE_HEADER = "score_header"
+DATA_SCORE_KEY = "score_key"
+DATA_WINDOW = "window"
 
 HARMONY_FEATURES = "harmony"
 SCALE_RELATIVE_FEATURES = "scale_relative"
@@ -20,6 +23,21 @@ REQUIRE_MSCORE = [HARMONY_FEATURES, SCALE_RELATIVE_FEATURES]
 
 """Names of modules taht require harmonic analysis in a .mscx file"""
 
+FAST_PARSER_FEATURES = [
+    "core",
+    "ambitus",
+    "density",
+    "lyrics",
+    "melody",
+    "rhythm",
+    "scale",
+    "tempo",
+]
+"""Names of the features that can be computed from the arrays of the fast parser"""
+
+FAST_PARSER_BASIC_MODULES = ["scoring", "file_name_generic"]
+"""Names of the basic modules that can be computed from the arrays of the fast parser"""
+
 VOICES_LIST = ["sop", "ten", "alt", "bar", "bbar", "bass"]
 """List of prefixes of singers's names that might appear in the scores"""
 
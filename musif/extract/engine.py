@@ -0,0 +1,248 @@
+"""
+Engine running the extraction of a corpus in a pool of processes.
+
+Each worker receives the :class:`musif.extract.extract.FeaturesExtractor` once, when it
+starts, and imports the feature modules; then, only the index and the path of each
+score are sent to it. Scores are submitted from the most expensive to the cheapest one,
+so that a very large score does not keep a single worker busy when all the others have
+finished.
+"""
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from pathlib import PurePath
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from joblib import effective_n_jobs
+from tqdm import tqdm
+
+_worker_extractor = None
+"""The `FeaturesExtractor` of this worker process"""
+
+
+def estimate_cost(filename: PurePath) -> int:
+    """
+    Returns an estimate of the cost of extracting the features of `filename`: its size
+    in bytes, uncompressed for compressed MusicXML files.
+    """
+    if PurePath(filename).suffix == ".mxl":
+        try:
+            with zipfile.ZipFile(filename) as f:
+                return sum(info.file_size for info in f.infolist())
+        except (OSError, zipfile.BadZipFile):
+            pass
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
+
+
+def _init_worker(extractor) -> None:
+    global _worker_extractor
+    _worker_extractor = extractor
+    extractor._import_modules()
+
+
+def _run_tasks(tasks: List[Tuple[int, PurePath]]) -> List[Any]:
+    return [_worker_extractor._extract_file(idx, filename) for idx, filename in tasks]
+
+
+def _run_windows(
+    idx: int, filename: PurePath, first: int, last: int, load_cache: bool
+) -> Tuple:
+    return _worker_extractor._extract_windows(idx, filename, first, last, load_cache)
+
+
+class ExtractionEngine:
+    """
+    Runs `FeaturesExtractor._extract_file` on many scores.
+
+    With `n_jobs` 1, scores are extracted in this process, in the given order.
+    Otherwise, they are extracted by a pool of `n_jobs` processes (with the joblib
+    convention: -1 means all the available cores, -2 all but one, ...), longest first
+    according to :func:`estimate_cost`. `chunksize` scores are sent to a worker at a
+    time, which reduces the communication overhead for large corpora of small scores.
+
+    If `window_chunksize` is given, the windows of each score are extracted by tasks of
+    `window_chunksize` windows, so that the windows of a long score are distributed
+    among the processes, and the pool has `n_jobs` processes unless fewer tasks are
+    expected from the number of measures of the scores. Each process loads a score once
+    for all its tasks of that score: from the cache, if the score was there, and
+    otherwise by parsing it.
+    """
+
+    def __init__(
+        self,
+        extractor,
+        n_jobs: int = 1,
+        chunksize: int = 1,
+        window_chunksize: Optional[int] = None,
+    ):
+        self.extractor = extractor
+        self.n_jobs = effective_n_jobs(n_jobs)
+        self.chunksize = max(1, chunksize)
+        self.window_chunksize = window_chunksize
+
+    def run(self, tasks: List[Tuple[int, PurePath]]) -> List[Any]:
+        """
+        Extracts the scores of `tasks`, pairs of index and path, and returns their
+        results in the same order as `tasks`.
+        """
+        results = [None] * len(tasks)
+        for i, result in self.imap(tasks):
+            results[i] = result
+        return results
+
+    def imap(self, tasks: List[Tuple[int, PurePath]]) -> Iterator[Tuple[int, Any]]:
+        """
+        Extracts the scores of `tasks`, pairs of index and path, and yields the position
+        of each task in `tasks` and its result as soon as it is available, so that the
+        results can be consumed without keeping all of them in memory.
+        """
+        if self.n_jobs > 1 and self.window_chunksize is not None and len(tasks) > 0:
+            yield from self._imap_windows(tasks)
+            return
+        if self.n_jobs == 1 or len(tasks) <= 1:
+            for i, (idx, filename) in enumerate(tqdm(tasks)):
+                yield i, self.extractor._extract_file(idx, filename)
+            return
+
+        order = self._cost_order(tasks)
+        chunks = [
+            order[start : start + self.chunksize]
+            for start in range(0, len(order), self.chunksize)
+        ]
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.n_jobs, len(chunks)),
+            initializer=_init_worker,
+            initargs=(self.extractor,),
+        )
+        try:
+            # the pool runs the chunks in the order in which they are submitted
+            futures = {
+                executor.submit(_run_tasks, [tasks[i] for i in chunk]): chunk
+                for chunk in chunks
+            }
+            with tqdm(total=len(tasks)) as progress:
+                for future in as_completed(futures):
+                    chunk = futures.pop(future)
+                    for i, result in zip(chunk, future.result()):
+                        yield i, result
+                    progress.update(len(chunk))
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    def _imap_windows(self, tasks: List[Tuple[int, PurePath]]) -> Iterator[Tuple[int, Any]]:
+        # The windows of each score are split into tasks of `window_chunksize` windows
+        # according to the number of windows expected from its header, and all of them
+        # are queued before the first task of the next score, so that a long score is
+        # extracted by all the workers. Each task gives the actual number of windows:
+        # the tasks past it extract nothing, and the missing ones are queued when it is
+        # known. The results of a score are yielded when all its tasks are done.
+        chunk = max(1, self.window_chunksize)
+        expected = {}
+        executor = ProcessPoolExecutor(
+            max_workers=self._windows_workers(tasks, expected),
+            initializer=_init_worker,
+            initargs=(self.extractor,),
+        )
+        scores = deque(self._cost_order(tasks))
+        pending = deque()
+        submitted = {}
+        cached = {}
+        windows_features = {}
+        stats = {}
+        running = {}
+        try:
+            with tqdm(total=len(tasks)) as progress:
+                while len(scores) > 0 or len(pending) > 0 or len(running) > 0:
+                    # a few tasks are queued, so that new tasks can be run first
+                    while len(running) < 2 * self.n_jobs:
+                        if len(pending) == 0:
+                            if len(scores) == 0:
+                                break
+                            i = scores.popleft()
+                            pending.extend(self._split_windows(i, tasks, expected, chunk, cached))
+                            submitted[i] = {first for _, first, _ in pending}
+                            windows_features[i] = {}
+                        i, first, load_cache = pending.popleft()
+                        idx, filename = tasks[i]
+                        future = executor.submit(
+                            _run_windows, idx, filename, first, first + chunk, load_cache
+                        )
+                        running[future] = (i, first)
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i, first = running.pop(future)
+                        features, task_stats, number_windows = future.result()
+                        stats[i] = stats[i] + task_stats if i in stats else task_stats
+                        windows_features[i][first] = features
+                        missing = [
+                            start
+                            for start in range(0, number_windows, chunk)
+                            if start not in submitted[i]
+                        ]
+                        submitted[i].update(missing)
+                        pending.extendleft(
+                            (i, start, cached[i]) for start in reversed(missing)
+                        )
+                        if len(windows_features[i]) < len(submitted[i]):
+                            continue
+                        chunks = windows_features.pop(i)
+                        if any(isinstance(features, dict) for features in chunks.values()):
+                            # some windows failed, and `ignore_errors` is True
+                            score_features = {}
+                        else:
+                            score_features = [
+                                window for start in sorted(chunks) for window in chunks[start]
+                            ]
+                        yield i, (score_features, stats.pop(i))
+                        progress.update(1)
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    def _split_windows(
+        self,
+        i: int,
+        tasks: List[Tuple[int, PurePath]],
+        expected: Dict[int, Optional[int]],
+        chunk: int,
+        cached: Dict[int, bool],
+    ) -> List[Tuple[int, int, bool]]:
+        # the first task loads the score from the cache or writes it there; the other
+        # tasks only load it if it was already there, since resurrecting the objects
+        # that the first task did not use is slower than parsing the score again
+        filename = tasks[i][1]
+        if i not in expected:
+            expected[i] = self.extractor._estimate_windows(filename)
+        cached[i] = self.extractor._is_cached(filename)
+        starts = range(0, expected[i] or 1, chunk)
+        return [(i, start, start == 0 or cached[i]) for start in starts]
+
+    def _windows_workers(
+        self, tasks: List[Tuple[int, PurePath]], expected: Dict[int, Optional[int]]
+    ) -> int:
+        # a single long score must be extracted by all the processes, so the pool is
+        # only made smaller than `n_jobs` if fewer chunks of windows are expected; the
+        # expected numbers of windows are stored in `expected`, by position in `tasks`
+        if len(tasks) >= self.n_jobs:
+            return self.n_jobs
+        chunk = max(1, self.window_chunksize)
+        chunks = 0
+        for i, (_, filename) in enumerate(tasks):
+            expected[i] = self.extractor._estimate_windows(filename)
+            if expected[i] is None:
+                return self.n_jobs
+            chunks += max(1, -(-expected[i] // chunk))
+        return min(self.n_jobs, chunks)
+
+    @staticmethod
+    def _cost_order(tasks: List[Tuple[int, PurePath]]) -> List[int]:
+        return sorted(
+            range(len(tasks)), key=lambda i: estimate_cost(tasks[i][1]), reverse=True
+        )
@@ -1,45 +1,61 @@
 import os
-import pickle
 import subprocess
-import types
+import time
+import xml.etree.ElementTree as ET
+from copy import deepcopy
 from pathlib import Path, PurePath
 from subprocess import DEVNULL
 from tempfile import mkstemp
-from typing import List, Optional, Tuple, Union
+from typing import Any, List, Optional, Tuple, Union
 
 import ms3
 import pandas as pd
-from joblib import Parallel, delayed
-from music21.converter import parse, toData
+from music21.converter import parse
+from music21.musicxml.xmlToM21 import MusicXMLImportException, MusicXMLImporter
 from music21.stream import Measure, Part, Score
 from pandas import DataFrame
-from tqdm import tqdm
-from music21 import stream
 
 import musif.extract.constants as C
-from musif.cache import (CACHE_FILE_EXTENSION, FileCacheIntoRAM,
-                         SmartModuleCache, store_score_df)
+from musif.cache import (CACHE_FILE_EXTENSION, CacheStats, CacheStore,
+                         SmartModuleCache, cache_stats, file_cache, iscache,
+                         parse_size, store_score_df)
 from musif.common._constants import GENERAL_FAMILY
-from musif.common.exceptions import FeatureError, ParseFileError
+from musif.common.exceptions import (CacheHeaderMismatch, FastParserError,
+                                     FeatureError, ParseFileError)
 from musif.config import ExtractConfiguration
 from musif.extract.common import _filter_parts_data
+from musif.extract.engine import ExtractionEngine
+from musif.extract.incremental import (CACHE_HEADER_FIELDS, LOAD_CONFIG_FIELDS,
+                                       ExtractionManifest, FeaturesCache,
+                                       file_digest, settings_digest)
+from musif.extract.journal import ErrorJournal
+from musif.extract.measures import score_measure_rows
 from musif.extract.utils import (cast_mixed_dtypes,
                                  extract_global_time_signature,
                                  process_musescore_file)
+from musif.extract.windows import PartMeasureIndex, ScoreMeasureIndex, WindowData
+from musif.extract.writer import StreamingWriter
 from musif.logs import ldebug, lerr, linfo, lwarn, pdebug, perr, pinfo, pwarn
 from musif.musescore import constants as mscore_c
 from musif.musicxml import constants as musicxml_c
-from musif.musicxml import (extract_numeric_tempo, fix_repeats, name_parts,
+from musif.musicxml import (fix_repeats, insert_repeat_marks, name_parts,
                             split_layers)
+from musif.musicxml.arrays import (MUSICXML_FILE_EXTENSIONS, ScoreArrays,
+                                   parse_musicxml_arrays)
+from musif.musicxml.header import (ScoreHeader, open_musicxml,
+                                   read_musicxml, read_score_header)
 from musif.musicxml.scoring import (_extract_abbreviated_part, extract_sound,
                                     to_abbreviation)
-from music21 import converter
-import types
 
-# attach a method to convert it into bytestring
-# the first argument of toData is the object to be translated, so that could be the `self` of a class method, perfectly ok
-# this must be done before of start the caching, because we are modifying the object!
-stream.Stream.toData = toData
+
+_resurrected_parts = {}
+"""The parts of the last score resurrected in this process, by score and part id, so
+that a part is parsed at most once even if many cached objects refer to it"""
+
+_windows_score = {}
+"""The data of the last score whose windows were extracted by a task of some windows in
+this process, so that the next tasks of the same score do not load it again"""
+
 
 def parse_filename(
     file_path: str,
@@ -47,6 +63,8 @@ def parse_filename(
     expand_repeats: bool = False,
     export_dfs_to: Union[str, PurePath] = None,
     remove_unpitched_objects: bool = True,
+    repeat_marks: Optional[dict] = None,
+    data: Optional[bytes] = None,
 ) -> Score:
     """
     This function parses a musicxml file and returns a music21 Score object. If
@@ -65,6 +83,12 @@ def parse_filename(
     export_dfs_to: Union[str, PurePath]
      Path to a directory where dataframes containing the score data are exported. If
      None, no score is exported. Default value is None.
+    repeat_marks: Optional[dict]
+     If a dictionary, it is filled with the repeat signs inserted in each part to align
+     it with the other parts (see `fix_repeats`), by part id. Default value is None.
+    data: Optional[bytes]
+     The MusicXML document of the file, as returned by `read_musicxml`, if it was
+     already read; music21 parses it instead of reading the file. Default value is None.
     Returns
     -------
     resp : Score
@@ -75,7 +99,10 @@ def parse_filename(
        If the xml file can't be parsed for any reason.
     """
     try:
-        score = parse(file_path).makeRests()
+        if data is not None:
+            score = _parse_musicxml_data(file_path, data).makeRests()
+        else:
+            score = parse(file_path).makeRests()
         if export_dfs_to is not None:
             dest_path = Path(export_dfs_to)
             dest_path /= Path(file_path).with_suffix(".pkl").name
@@ -89,7 +116,12 @@ def parse_filename(
             )
             score.remove(unpitched_objs, recurse=True)
         split_layers(score, split_keywords)
-        fix_repeats(score)
+        inserted = [] if repeat_marks is not None else None
+        fix_repeats(score, inserted)
+        if repeat_marks is not None:
+            repeat_marks.update(
+                (part.id, marks) for part, marks in zip(score.parts, inserted)
+            )
         if expand_repeats:
             score = score.expandRepeats()
     except Exception as e:
@@ -98,6 +130,146 @@ def parse_filename(
     return score
 
 
+def _parse_musicxml_data(file_path: Union[str, PurePath], data: bytes) -> Score:
+    # as music21's `parse` does for a MusicXML file, without its pickled copy
+    root = ET.fromstring(data)
+    if root.tag != "score-partwise":
+        raise MusicXMLImportException(
+            f"Cannot parse MusicXML files not in score-partwise. Root tag was '{root.tag}'"
+        )
+    importer = MusicXMLImporter()
+    importer.xmlRootToScore(root, importer.stream)
+    score = importer.stream
+    if score.metadata.movementName is None:
+        score.metadata.movementName = Path(file_path).name
+    score.metadata.filePath = Path(file_path)
+    score.metadata.fileFormat = "musicxml"
+    return score
+
+
+def parse_part(
+    file_path: str,
+    part_index: int,
+    part_name: str,
+    part_abbreviation: str,
+    split_keywords: List[str],
+    expand_repeats: bool = False,
+    remove_unpitched_objects: bool = True,
+    repeat_marks: Optional[dict] = None,
+) -> Score:
+    """
+    This function parses a single part of a musicxml file and processes it as
+    `parse_filename` would do with the whole score, so that the returned score contains
+    the same part objects (more than one if the part is split in layers). It is used
+    to resurrect a single part of a cached score.
+
+    Parameters
+    ----------
+    file_path: str
+    A path to a music xml path.
+    part_index: int
+     The position of the part among the `<part>` elements of the file.
+    part_name: str
+     The name of the part, as given by `name_parts` when the whole score is parsed.
+    part_abbreviation: str
+     The abbreviation of the part, as given by `name_parts`.
+    split_keywords: List[str]
+     A lists of keywords based on music21 instrument sound names to split in different parts.
+    expand_repeats: bool
+     Determines whether to expand or not the repetitions. Default value is False.
+    remove_unpitched_objects: bool
+     Determines whether to remove unpitched objects. Default value is True.
+    repeat_marks: Optional[dict]
+     The repeat signs that `fix_repeats` inserted in each resulting part when the whole
+     score was parsed, by part id. Default value is None.
+    Returns
+    -------
+    resp : Score
+     A score with the resulting part(s).
+    Raises
+    ------
+     ParseFileError
+       If the xml file can't be parsed for any reason.
+    """
+    try:
+        with open_musicxml(file_path) as source:
+            root = ET.parse(source).getroot()
+        mx_parts = root.findall("part")
+        part_id = mx_parts[part_index].get("id")
+        for i, mx_part in enumerate(mx_parts):
+            if i != part_index:
+                root.remove(mx_part)
+        # groups of parts (e.g. staff groups) refer to the removed parts
+        mx_part_list = root.find("part-list")
+        if mx_part_list is not None:
+            for element in list(mx_part_list):
+                if element.tag != "score-part" or element.get("id") != part_id:
+                    mx_part_list.remove(element)
+        importer = MusicXMLImporter()
+        importer.xmlRootToScore(root, importer.stream)
+        score = importer.stream.makeRests()
+
+        part = score.parts[0]
+        part.partName = part_name
+        part.partAbbreviation = part_abbreviation
+        if remove_unpitched_objects:
+            unpitched_objs = list(
+                score.flatten().getElementsByClass(["PercussionChord", "Unpitched"])
+            )
+            score.remove(unpitched_objs, recurse=True)
+        split_layers(score, split_keywords)
+        if repeat_marks is not None:
+            for part in score.parts:
+                insert_repeat_marks(part, repeat_marks.get(part.id, []))
+        if expand_repeats:
+            score = score.expandRepeats()
+    except Exception as e:
+        raise ParseFileError(file_path) from e
+    return score
+
+
+def parse_arrays(
+    file_path: str,
+    split_keywords: List[str],
+    remove_unpitched_objects: bool = True,
+    data: Optional[bytes] = None,
+) -> Optional[ScoreArrays]:
+    """
+    This function parses a musicxml file with the fast parser and returns a
+    `ScoreArrays` object, or None if the file contains something that the fast parser
+    cannot represent (in which case the file should be parsed with `parse_filename`).
+
+    Parameters
+    ----------
+    file_path: str
+    A path to a music xml path.
+    split_keywords: List[str]
+     A lists of keywords based on music21 instrument sound names to split in different parts.
+    remove_unpitched_objects: bool
+     Determines whether to remove or not notes of percussion instruments. Default value is True.
+    data: Optional[bytes]
+     The MusicXML document of the file, as returned by `read_musicxml`, if it was
+     already read. Default value is None.
+    Returns
+    -------
+    resp : Optional[ScoreArrays]
+     The arrays of the score, or None.
+    Raises
+    ------
+     ParseFileError
+       If the xml file can't be parsed for any reason.
+    """
+    try:
+        return parse_musicxml_arrays(
+            file_path, split_keywords, remove_unpitched_objects, data=data
+        )
+    except FastParserError as e:
+        ldebug(f"{e}, falling back to music21")
+        return None
+    except Exception as e:
+        raise ParseFileError(file_path) from e
+
+
 def parse_musescore_file(file_path: str, expand_repeats: bool = False) -> pd.DataFrame:
     """
     This function parses a musescore file and returns a pandas dataframe. If the file
@@ -244,15 +416,44 @@ class FeaturesExtractor:
         self.exclude_files = kwargs.get("exclude_files") or getattr(
             self._cfg, "exclude_files", None
         )
-        if any(i in self._cfg.features for i in ("music21")) and self._cfg.cache_dir:
-            pwarn("\nmusic21's features were requested. musif's caching system is not compatible with these, so cache will be disabled. \n")
-            self._cfg.cache_dir = None
-            
+        if self._cfg.fast_parser and not self._cfg.can_use_fast_parser():
+            pwarn("\nThe fast parser was requested, but the requested features or options need music21 scores, so it will be disabled. \n")
+            self._cfg.fast_parser = False
+
         if self._cfg.cache_dir is not None:
             pinfo("Cache activated!")
             Path(self._cfg.cache_dir).mkdir(exist_ok=True)
+            self._cache_store = CacheStore(
+                self._cfg.cache_dir, max_size=self._cfg.cache_max_size
+            )
+        else:
+            self._cache_store = None
+        if self._cfg.features_cache_dir is not None:
+            self._features_cache = FeaturesCache(self._cfg.features_cache_dir)
+        else:
+            self._features_cache = None
+        self._ram_cache_size = parse_size(self._cfg.ram_cache_size)
+        self._load_settings = (
+            settings_digest(self._cfg, LOAD_CONFIG_FIELDS)
+            + str(self._cfg.is_requested_musescore_file())
+        )
+        # written in the header of each cache file, see `CacheStore`; the other
+        # options are only stored as a hash, to keep the header small
+        self._cache_header = {
+            field: getattr(self._cfg, field, None) for field in CACHE_HEADER_FIELDS
+        }
+        self._cache_header["musescore"] = self._cfg.is_requested_musescore_file()
+        self._cache_header["settings"] = settings_digest(
+            self._cfg,
+            [
+                field
+                for field in LOAD_CONFIG_FIELDS
+                if field not in CACHE_HEADER_FIELDS and field != "cache_dir"
+            ],
+        )
+        self.cache_stats = CacheStats()
 
-    def extract(self) -> DataFrame:
+    def extract(self) -> Optional[DataFrame]:
         """
         Extracts features given in the configuration data getting a file, directory or several file paths,
         returning a DataFrame containing musical features.
@@ -260,6 +461,7 @@ class FeaturesExtractor:
         Returns
         ------
         Score dataframe with the extracted features of given scores. For one score only, a DataFrem is returned with one row only.
+        If `stream_output` is set, the features are written to that file as soon as each score is extracted and None is returned.
 
         Raises
         ------
@@ -269,7 +471,65 @@ class FeaturesExtractor:
            If features aren't loaded in corrected order or dependencies
         """
         linfo("--- Analyzing scores ---\n".center(120, " "))
+        filenames = self._find_corpus_files()
+        score_df = self._process_corpus(filenames)
+        self._finish_extraction()
+        if score_df is None:
+            # written to `stream_output`
+            return None
+        return _fix_dtypes(score_df)
+
+    def retry(
+        self, previous: Union[DataFrame, str, PurePath, None] = None
+    ) -> DataFrame:
+        """
+        Extracts again the scores whose last record in the error journal (see the option
+        `error_journal`) is a failure, and merges their features into `previous`, the
+        result of a previous extraction of the same files. `previous` can be a
+        DataFrame or the path of a .csv, .parquet or .pkl file, which is overwritten with
+        the merged features; by default, it is `stream_output`.
 
+        The rows of the extracted scores replace those with the same `Id` in
+        `previous`, as well as the empty rows left by the failed scores.
+
+        Returns
+        ------
+        The merged DataFrame.
+        """
+        journal = self._get_error_journal()
+        if journal is None:
+            raise ValueError("No error journal is configured, set `error_journal`")
+        if previous is None:
+            previous = self._cfg.stream_output
+        failed = set(journal.failed_files())
+        filenames = self._find_corpus_files()
+        indices = [idx for idx, filename in enumerate(filenames) if str(filename) in failed]
+        pinfo(f"Retrying {len(indices)} failed scores")
+        if len(indices) > 0:
+            new_df = self._process_corpus(filenames, indices=indices, stream=False)
+            self._finish_extraction()
+        else:
+            new_df = DataFrame()
+
+        previous_df = previous
+        if not isinstance(previous, DataFrame):
+            previous_df = _read_features(previous)
+        previous_df = previous_df.reset_index(drop=True)
+        if C.ID in previous_df.columns:
+            previous_df = previous_df[
+                previous_df[C.ID].notna() & ~previous_df[C.ID].isin(indices)
+            ]
+        merged = pd.concat([previous_df, new_df.reset_index(drop=True)], ignore_index=True)
+        merged = merged.reindex(sorted(merged.columns), axis=1)
+        sort_by = [column for column in (C.ID, C.WINDOW_ID) if column in merged.columns]
+        if len(sort_by) > 0:
+            merged = merged.sort_values(sort_by, ignore_index=True, kind="stable")
+        merged = _fix_dtypes(merged)
+        if not isinstance(previous, DataFrame):
+            _write_features(merged, previous)
+        return merged
+
+    def _find_corpus_files(self) -> List[PurePath]:
         xml_filenames = find_files(
             C.MUSIC21_FILE_EXTENSIONS,
             self._cfg.data_dir,
@@ -301,142 +561,401 @@ class FeaturesExtractor:
             filenames = []
         if len(filenames) == 0:
             raise FileNotFoundError("No file found for extracting features! Use data_dir (or cache_dir) to point to your files directory.")
+        return filenames
 
-        score_df = self._process_corpus(filenames)
+    def _finish_extraction(self):
+        if self._cache_store is not None:
+            self._cache_store.prune()
+        if (
+            self._cache_store is not None
+            or self._features_cache is not None
+            or self._ram_cache_size
+        ):
+            pinfo(f"Cache usage: {self.cache_stats}")
 
-        # fix dtypes
-        score_df = score_df.convert_dtypes()
-        score_df = score_df.apply(cast_mixed_dtypes, axis=0)
+    def _get_error_journal(self) -> Optional[ErrorJournal]:
+        """
+        Returns the journal of the errors: `error_journal` or, if it is not set, the file
+        `error_files.jsonl` in `output_dir` (if given).
+        """
+        if self._cfg.error_journal is not None:
+            return ErrorJournal(self._cfg.error_journal)
+        output_dir = getattr(self._cfg, "output_dir", None)
+        if output_dir is not None:
+            return ErrorJournal(Path(output_dir) / "error_files.jsonl")
+        return None
+
+    def _extract_file(self, idx: int, filename: PurePath) -> Tuple[Any, CacheStats]:
+        """
+        Extracts the features of the score `filename` with index `idx`, and returns them
+        together with the cache counters of the extraction. Failures are recorded in the
+        error journal.
+        """
+        if self._cfg.measure_statistics:
+            process = self._process_score_measures
+        elif self._cfg.window_size is not None:
+            process = lambda idx, filename: self._process_score_windows(idx, filename)[0]
+        else:
+            process = self._process_score
+        return self._run_extraction(process, idx, filename)
 
-        return score_df
+    def _extract_windows(
+        self,
+        idx: int,
+        filename: PurePath,
+        first: int,
+        last: int,
+        load_cache: bool = True,
+    ) -> Tuple[Any, CacheStats, int]:
+        """
+        Extracts the windows of the score `filename` with ids from `first` to `last`
+        (excluded), and returns their features, the cache counters of the extraction and
+        the number of windows of the score (0 if the extraction failed). If `load_cache`
+        is False, the score is parsed even if it is in `cache_dir`, and the cache file is
+        not written.
+        """
+        result, stats = self._run_extraction(
+            self._process_score_windows, idx, filename, (first, last), load_cache
+        )
+        if isinstance(result, dict):
+            # failed, and `ignore_errors` is True
+            return result, stats, 0
+        windows_features, number_windows = result
+        return windows_features, stats, number_windows
+
+    def _is_cached(self, filename: PurePath) -> bool:
+        """
+        Returns whether the score `filename` is in `cache_dir`.
+        """
+        if PurePath(filename).suffix == CACHE_FILE_EXTENSION:
+            return True
+        if self._cache_store is None:
+            return False
+        return self._cache_store.path(self._score_digest(filename)).exists()
 
-    def _check_for_error_file(self):
-        # Check for error file
+    def _estimate_windows(self, filename: PurePath) -> Optional[int]:
+        """
+        Returns the number of windows of the score `filename` according to the number
+        of measures in its header, or None if it is unknown.
+        """
+        if PurePath(filename).suffix not in MUSICXML_FILE_EXTENSIONS:
+            return None
+        nmeasures = read_score_header(filename).measure_count
+        if nmeasures == 0:
+            return None
+        hopsize = self._cfg.window_size - self._cfg.overlap
+        return max(0, (nmeasures - self._cfg.overlap) // hopsize)
+
+    def _run_extraction(
+        self, process, idx: int, filename: PurePath, *args
+    ) -> Tuple[Any, CacheStats]:
+        # counters are collected per task, so that they survive the worker processes
+        stats_before = cache_stats.copy()
+        start = time.perf_counter()
         try:
-            df = pd.read_csv(f'{self._cfg.output_dir}/error_files.csv', low_memory=False)
-            df['ErrorFiles'] = df['ErrorFiles'].astype(str)
-            df['ErrorFiles'] = df['ErrorFiles'].str.rsplit('/', 1).str[-1]
-            errored_files = list(df['ErrorFiles'])
-            print(errored_files)
-            print("CSV loaded successfully.")
-        except Exception:
-            # Handle the case where the file is empty
-            print("There is no error_files.csv, it will be created and loaded error files are included manually in it.")
-            import os
-            if not os.path.exists(f'{self._cfg.output_dir}'):
-                os.makedirs(f'{self._cfg.output_dir}')
+            result = process(idx, filename, *args)
+        except Exception as e:
+            journal = self._get_error_journal()
+            if journal is not None:
+                journal.record_error(
+                    filename,
+                    e,
+                    idx=idx,
+                    module=getattr(e, "module", None),
+                    elapsed=time.perf_counter() - start,
+                )
+                lerr(f"Error found on {filename}, recorded in {journal.path}")
+            if self._cfg.ignore_errors:
+                lerr(
+                    f"Error while extracting features for file {filename}, skipping it because `ignore_errors` is True!"
+                )
+                return {}, cache_stats - stats_before
+            else:
+                raise e
+        return result, cache_stats - stats_before
+
+    def _import_modules(self) -> None:
+        """
+        Imports the basic and feature modules, so that worker processes do it once
+        before extracting the first score.
+        """
+        for package in self._cfg.basic_modules_addresses:
+            list(self._find_modules(package, basic=True))
+        for package in self._cfg.feature_modules_addresses:
+            list(self._find_modules(package, basic=False))
 
     def _process_corpus(
-        self, filenames: List[PurePath]
-    ) -> Tuple[List[dict], List[dict]]:
-        def process_corpus_par(idx, filename):
-            error_files = []
-            errors = []
-            try:
-                if self._cfg.window_size is not None:
-                    score_features = self._process_score_windows(idx, filename)
-                else:
-                    score_features = self._process_score(idx, filename)
-            except Exception as e:
-                self._check_for_error_file()
-                print(f"Error found on {filename}. Saving the filename and error print to {str(self._cfg.output_dir)}/error_files.csv for latter tracking")
-                error_files.append(filename)
-                errors.append(e)
-                df = pd.DataFrame({'ErrorFiles': error_files,
-                                   'Errors': errors})
-                df.to_csv(str(self._cfg.output_dir)+'/error_files.csv', mode='a', index=False)
-                if self._cfg.ignore_errors:
-                    lerr(
-                        f"Error while extracting features for file {filename}, skipping it because `ignore_errors` is True!"
-                    )
-                    return {}
-                else:
-                    raise e
-            return score_features
+        self,
+        filenames: List[PurePath],
+        indices: Optional[List[int]] = None,
+        stream: bool = True,
+    ) -> Optional[DataFrame]:
+        """
+        Extracts the scores of `filenames` (only those at `indices`, if given) and
+        returns their features, or None if they are written to `stream_output` (unless
+        `stream` is False).
+        """
+        if indices is None:
+            indices = range(len(filenames))
+        scores_features = [None] * len(filenames)
+        done = set(range(len(filenames))) - set(indices)
+        writer = None
+        journal = self._get_error_journal()
+        failed = set(journal.failed_files()) if journal is not None else set()
+        if stream and self._cfg.stream_output is not None:
+            # scores committed by a previous (interrupted) run are not extracted again
+            writer = StreamingWriter(self._cfg.stream_output)
+            committed = writer.committed()
+            done.update(
+                idx
+                for idx, filename in enumerate(filenames)
+                if committed.get(str(filename)) == idx
+            )
+            if len(done) > 0:
+                pinfo(f"Streamed output: resuming after {len(done)} committed scores")
+        digests = {}
+        manifest = None
+        if self._cfg.incremental_dir is not None:
+            manifest = ExtractionManifest(
+                self._cfg.incremental_dir, settings_digest(self._cfg)
+            )
+            n_reused = 0
+            for idx, filename in enumerate(filenames):
+                if idx in done:
+                    continue
+                digests[idx] = self._score_digest(filename)
+                score_features = manifest.get(filename, digests[idx])
+                if score_features is not None:
+                    score_features = _set_score_id(score_features, idx)
+                    if writer is not None:
+                        writer.write(idx, filename, _score_rows(score_features))
+                    else:
+                        scores_features[idx] = score_features
+                    done.add(idx)
+                    n_reused += 1
+            pinfo(
+                f"Incremental extraction: {n_reused} unchanged scores reused, {len(filenames) - len(done)} to extract"
+            )
 
-        scores_features = Parallel(n_jobs=self._cfg.parallel)(
-            delayed(process_corpus_par)(idx, fname)
-            for idx, fname in enumerate(tqdm(filenames))
+        to_extract = [
+            (idx, filename)
+            for idx, filename in enumerate(filenames)
+            if idx not in done
+        ]
+        window_chunksize = self._cfg.window_chunksize
+        if window_chunksize is not None and (
+            self._cfg.window_size is None or self._cfg.measure_statistics
+        ):
+            window_chunksize = None
+        engine = ExtractionEngine(
+            self,
+            n_jobs=self._cfg.parallel,
+            chunksize=self._cfg.parallel_chunksize,
+            window_chunksize=window_chunksize,
         )
+        for i, (score_features, stats) in engine.imap(to_extract):
+            idx, filename = to_extract[i]
+            self.cache_stats += stats
+            # scores that raised an error are not stored, so that they are retried
+            if manifest is not None and len(score_features) > 0:
+                manifest.put(filename, digests[idx], score_features)
+            if str(filename) in failed and len(score_features) > 0:
+                journal.record_success(filename)
+            if writer is None:
+                scores_features[idx] = score_features
+            elif len(score_features) > 0:
+                writer.write(idx, filename, _score_rows(score_features))
+        if manifest is not None:
+            manifest.save()
+        if writer is not None:
+            writer.close({str(filename): idx for idx, filename in enumerate(filenames)})
+            pinfo(f"Features written to {self._cfg.stream_output}")
+            return None
 
-        if self._cfg.window_size is not None:
+        if self._cfg.window_size is not None or self._cfg.measure_statistics:
             all_dfs = []
-            for score in scores_features:
-                df_score = DataFrame(score)
+            for idx in indices:
+                df_score = DataFrame(scores_features[idx])
                 df_score = df_score.reindex(sorted(df_score.columns), axis=1)
                 df_score.replace("NA", pd.NA, inplace=True)
                 all_dfs.append(df_score)
-            all_dfs = pd.concat(all_dfs, axis=0, keys=range(len(all_dfs)))
+            all_dfs = pd.concat(all_dfs, axis=0, keys=list(indices))
         else:
-            all_dfs = DataFrame(scores_features)
+            all_dfs = DataFrame([scores_features[idx] for idx in indices])
             all_dfs = all_dfs.reindex(sorted(all_dfs.columns), axis=1)
             all_dfs = all_dfs.replace("NA", pd.NA)
         return all_dfs
 
-    def _init_score_processing(self, idx: int, filename: PurePath):
-        if self._cfg.cache_dir is not None:
+    def _score_digest(self, filename: PurePath) -> str:
+        """
+        Returns the content hash of a score used by the incremental extraction,
+        including its MuseScore file if harmonic features are requested.
+        """
+        if (
+            self._cfg.is_requested_musescore_file()
+            and self._cfg.musescore_dir is not None
+        ):
+            filename_ms3 = (
+                Path(self._cfg.musescore_dir)
+                / filename.with_suffix(mscore_c.MUSESCORE_FILE_EXTENSION).name
+            )
+            return file_digest(filename, filename_ms3)
+        return file_digest(filename)
+
+    def _init_score_processing(
+        self, idx: int, filename: PurePath, load_cache: bool = True
+    ):
+        if filename.suffix == CACHE_FILE_EXTENSION:
+            # extracting directly from the files in `cache_dir`
+            score_key = None
+            cache_name = Path(filename)
+        elif (
+            self._cache_store is not None
+            or self._features_cache is not None
+            or self._ram_cache_size
+            or self._cfg.music21_cache_dir is not None
+        ):
+            score_key = self._score_digest(filename)
             cache_name = (
-                Path(self._cfg.cache_dir)
-                # / filename.parent
-                / (filename.name + CACHE_FILE_EXTENSION)
+                self._cache_store.path(score_key)
+                if self._cache_store is not None
+                else None
             )
-            cache_name.parent.mkdir(parents=True, exist_ok=True)
         else:
+            score_key = None
+            cache_name = None
+        if not load_cache and filename.suffix != CACHE_FILE_EXTENSION:
             cache_name = None
-        score_data = self._get_score_data(filename, load_cache=cache_name)
+        score_data = self._get_score_data(
+            filename, load_cache=cache_name, score_key=score_key
+        )
+        score_data[C.DATA_SCORE_KEY] = score_key
         parts_data = [
             self._get_part_data(score_data, part)
             for part in score_data[C.DATA_SCORE].parts
         ]
         parts_data = _filter_parts_data(parts_data, self._cfg.parts_filter)
+        # basic modules are always run, because feature modules use their data
         basic_features = self.extract_modules(
             self._cfg.basic_modules_addresses, score_data, parts_data, basic=True
         )
         basic_features[C.ID] = idx
-        return basic_features, cache_name, parts_data, score_data
+        if self._features_cache is None:
+            score_key = None
+        return basic_features, cache_name, parts_data, score_data, score_key
 
     def _process_score(self, idx: int, filename: PurePath) -> dict:
+        stats_before = cache_stats.copy()
         (
             basic_features,
             cache_name,
             parts_data,
             score_data,
+            score_key,
         ) = self._init_score_processing(idx, filename)
         extract_global_time_signature(score_data)
         score_features = self.extract_modules(
-            self._cfg.feature_modules_addresses, score_data, parts_data, basic=False
+            self._cfg.feature_modules_addresses,
+            score_data,
+            parts_data,
+            basic=False,
+            score_key=score_key,
         )
         score_features = {**basic_features, **score_features}
         score_features[C.WINDOW_ID] = 0
 
-        if self._cfg.cache_dir is not None:
-            pickle.dump(score_data, open(cache_name, "wb"))
+        self._store_cache(score_data, cache_name, stats_before)
         return score_features
 
-    def _process_score_windows(self, idx: int, filename: PurePath) -> List[dict]:
-        (
-            basic_features,
-            cache_name,
-            parts_data,
-            score_data,
-        ) = self._init_score_processing(idx, filename)
-
-        extract_global_time_signature(score_data)
-
-        window_features = {}
-        nmeasures = len(score_data[C.DATA_SCORE].parts[0].getElementsByClass(Measure))
-
+    def _process_score_windows(
+        self,
+        idx: int,
+        filename: PurePath,
+        windows: Optional[Tuple[int, int]] = None,
+        load_cache: bool = True,
+    ) -> Tuple[List[dict], int]:
+        """
+        Extracts the features of the windows of a score, only those with ids from
+        `windows[0]` to `windows[1]` (excluded) if given, and returns them with the
+        number of windows of the score. If `load_cache` is False, the score is parsed
+        even if it is in `cache_dir`, and the cache file is not written.
+        """
+        stats_before = cache_stats.copy()
         ws = self._cfg.window_size
         hopsize = ws - self._cfg.overlap
-        number_windows = (nmeasures - self._cfg.overlap) // hopsize
+        windows_key = (idx, str(filename), self._load_settings)
+        reused = windows is not None and _windows_score.get("key") == windows_key
+        if reused:
+            # the previous task of this process extracted other windows of the same
+            # score: its objects, which may be already resurrected, are used again
+            (
+                basic_features,
+                cache_name,
+                parts_data,
+                score_data,
+                score_key,
+                score_index,
+                measure_indices,
+                number_windows,
+            ) = _windows_score["data"]
+        else:
+            (
+                basic_features,
+                cache_name,
+                parts_data,
+                score_data,
+                score_key,
+            ) = self._init_score_processing(idx, filename, load_cache)
+
+            extract_global_time_signature(score_data)
+
+            nmeasures = len(
+                score_data[C.DATA_SCORE].parts[0].getElementsByClass(Measure)
+            )
+            number_windows = (nmeasures - self._cfg.overlap) // hopsize
+            # the measures of the score and of each part are indexed once, and each
+            # window takes its objects and mergeable features from the indices
+            score_index = ScoreMeasureIndex(score_data[C.DATA_SCORE])
+            measure_indices = [
+                PartMeasureIndex(part_data[C.DATA_PART]) for part_data in parts_data
+            ]
+            _windows_score.clear()
+            if windows is not None:
+                _windows_score["key"] = windows_key
+                _windows_score["data"] = (
+                    basic_features,
+                    cache_name,
+                    parts_data,
+                    score_data,
+                    score_key,
+                    score_index,
+                    measure_indices,
+                    number_windows,
+                )
+
+        window_ids = range(number_windows)
+        if windows is not None:
+            window_ids = range(windows[0], min(windows[1], number_windows))
 
         all_windows_features = []
-        for idx in range(number_windows):
+        for idx in window_ids:
             first_window_measure = idx * hopsize
             last_window_measure = first_window_measure + ws
             window_data, window_parts_data = self._select_window_data(
                 score_data, parts_data, first_window_measure, last_window_measure
             )
+            window_data[C.DATA_WINDOW] = score_index.window(
+                first_window_measure, last_window_measure
+            )
+            for part_data, measure_index in zip(window_parts_data, measure_indices):
+                part_data[C.DATA_WINDOW] = measure_index.window(
+                    first_window_measure, last_window_measure
+                )
+            if score_data[C.DATA_SCORE_KEY] is not None:
+                window_data[C.DATA_SCORE_KEY] = (
+                    f"{score_data[C.DATA_SCORE_KEY]}:"
+                    f"{first_window_measure}-{last_window_measure}"
+                )
             window_data.update(
                 {k: v for k, v in score_data.items() if k not in window_data}
             )
@@ -446,6 +965,9 @@ class FeaturesExtractor:
                 window_data,
                 window_parts_data,
                 basic=False,
+                score_key=None
+                if score_key is None
+                else f"{score_key}:{first_window_measure}-{last_window_measure}",
             )
 
             window_features[
@@ -459,20 +981,58 @@ class FeaturesExtractor:
             all_windows_features.append(window_features)
             first_window_measure = last_window_measure - self._cfg.overlap
 
-        if self._cfg.cache_dir is not None:
-            pickle.dump(score_data, open(cache_name, "wb"))
-        return all_windows_features
+        if reused and (cache_stats - stats_before).resurrections == 0:
+            # the cache file was written by the task that loaded the score
+            cache_name = None
+        self._store_cache(score_data, cache_name, stats_before)
+        return all_windows_features, number_windows
+
+    def _process_score_measures(self, idx: int, filename: PurePath) -> List[dict]:
+        stats_before = cache_stats.copy()
+        _, cache_name, parts_data, score_data, _ = self._init_score_processing(
+            idx, filename
+        )
+        extract_global_time_signature(score_data)
+        rows = score_measure_rows(score_data, parts_data)
+        for row in rows:
+            row[C.ID] = idx
+
+        self._store_cache(score_data, cache_name, stats_before)
+        return rows
+
+    def _store_cache(
+        self, score_data: dict, cache_name: Optional[Path], stats_before: CacheStats
+    ) -> None:
+        """
+        Pickles `score_data` into `cache_name`. If the score was loaded from the cache
+        and no cached object needed to be resurrected since `stats_before` was taken,
+        the cache file is already up-to-date and it is not written again.
+        """
+        if cache_name is None:
+            return
+        stats = cache_stats - stats_before
+        if (stats.hits > 0 or stats.ram_hits > 0) and stats.resurrections == 0:
+            return
+        self._cache_store.dump(cache_name, score_data, self._cache_header)
 
     def _select_window_data(
         self, score_data: dict, parts_data: list, first_measure: int, last_measure: int
-    ):
-        window_score = score_data[C.DATA_SCORE].measures(
-            first_measure, last_measure, indicesNotNumbers=True
-        )
-        filtered_partNames = [i.partName for i in score_data["parts"]]
-        window_parts = [
-            i for i in window_score.parts if i.partName in filtered_partNames
-        ]
+    ) -> Tuple[WindowData, List[WindowData]]:
+        """
+        Returns the score data and the parts data of the window from measure index
+        `first_measure` to `last_measure` (excluded). The window stream (`DATA_SCORE`,
+        `DATA_FILTERED_PARTS` and the `DATA_PART` of each part) is only built if a
+        module reads it.
+        """
+        stream = {}
+
+        def window_stream() -> dict:
+            if len(stream) == 0:
+                stream.update(
+                    self._build_window_stream(score_data, first_measure, last_measure)
+                )
+            return stream
+
         if (
             self._cfg.is_requested_musescore_file()
             and score_data[C.DATA_MUSESCORE_SCORE] is not None
@@ -484,34 +1044,154 @@ class FeaturesExtractor:
             window_mscore.reset_index(inplace=True, drop=True, level=0)
         else:
             window_mscore = None
-        window_score_data = {
-            C.DATA_SCORE: window_score,
-            C.DATA_FILTERED_PARTS: window_parts,
-            C.DATA_MUSESCORE_SCORE: window_mscore,
-            C.DATA_NUMERIC_TEMPO: score_data[C.DATA_NUMERIC_TEMPO],
-        }
+        window_score_data = WindowData(
+            {
+                C.DATA_MUSESCORE_SCORE: window_mscore,
+                C.DATA_NUMERIC_TEMPO: score_data[C.DATA_NUMERIC_TEMPO],
+            },
+            {
+                C.DATA_SCORE: lambda: window_stream()[C.DATA_SCORE],
+                C.DATA_FILTERED_PARTS: lambda: window_stream()[C.DATA_FILTERED_PARTS],
+            },
+        )
+        window_parts_data = [
+            WindowData(
+                {k: v for k, v in part_data.items() if k != C.DATA_PART},
+                {C.DATA_PART: lambda i=i: window_stream()[C.DATA_FILTERED_PARTS][i]},
+            )
+            for i, part_data in enumerate(parts_data)
+        ]
+        return window_score_data, window_parts_data
 
-        for i, p in enumerate(window_parts):
-            parts_data[i]["part"] = p
-        return window_score_data, parts_data
+    def _build_window_stream(
+        self, score_data: dict, first_measure: int, last_measure: int
+    ) -> dict:
+        window_score = score_data[C.DATA_SCORE].measures(
+            first_measure, last_measure, indicesNotNumbers=True
+        )
+        filtered_partNames = [i.partName for i in score_data["parts"]]
+        window_parts = [
+            i for i in window_score.parts if i.partName in filtered_partNames
+        ]
+
+        # a window of a cached part is resurrected from that part alone
+        resurrect_references = {
+            part.partName: part.get_resurrect_reference()
+            for part in score_data[C.DATA_FILTERED_PARTS]
+            if iscache(part)
+        }
+        for part in window_parts:
+            resurrect_reference = resurrect_references.get(part.partName)
+            if resurrect_reference is not None and iscache(part):
+                part.set_resurrect_reference(
+                    (*resurrect_reference, (first_measure, last_measure))
+                )
+        return {C.DATA_SCORE: window_score, C.DATA_FILTERED_PARTS: window_parts}
 
     def extract_modules(
-        self, packages: list, data: dict, parts_data: dict, basic: bool
+        self,
+        packages: list,
+        data: dict,
+        parts_data: dict,
+        basic: bool,
+        score_key: Optional[str] = None,
     ):
+        """
+        Runs the modules found in `packages` and returns the score features.
+
+        If the features cache is enabled (`features_cache_dir`) and `score_key` is
+        given, the features of the modules whose key did not change are loaded from the
+        cache instead of being computed (see
+        :class:`musif.extract.incremental.FeaturesCache`).
+        """
         score_features = {}
         parts_features = [{} for _ in range(len(parts_data))]
-        for package in packages:
-            for module in self._find_modules(package, basic):
-                self._update_parts_module_features(
-                    module, data, parts_data, parts_features
-                )
-                self._update_score_module_features(
-                    module, data, parts_data, parts_features, score_features
+        modules = [
+            module
+            for package in packages
+            for module in self._find_modules(package, basic)
+        ]
+        if self._features_cache is None or score_key is None:
+            for module in modules:
+                self._run_module(module, data, parts_data, parts_features, score_features)
+            return score_features
+
+        module_keys = {}
+        cached = []
+        for module in modules:
+            package = __import__(module.__name__.rpartition(".")[0], fromlist=[""])
+            name = package.__name__.rpartition(".")[2]
+            dependency_keys = [
+                module_keys[dependency]
+                for dependency in getattr(package, "musif_dependencies", [])
+                if dependency in module_keys
+            ]
+            module_keys[name] = self._features_cache.module_key(
+                score_key, package, self._cfg, dependency_keys
+            )
+            cached.append(self._features_cache.get(module_keys[name]))
+
+        # modules that add objects to `data` must run if any later module runs
+        last_miss = max((i for i, c in enumerate(cached) if c is None), default=-1)
+        for i, (module, key, result) in enumerate(
+            zip(modules, module_keys.values(), cached)
+        ):
+            if result is not None and (i > last_miss or not result["provides_data"]):
+                for part_features, part_result in zip(parts_features, result["parts"]):
+                    part_features.update(part_result)
+                score_features.update(result["score"])
+                cache_stats.module_hits += 1
+                continue
+            before = (
+                dict(data),
+                [dict(part_data) for part_data in parts_data],
+                [dict(part_features) for part_features in parts_features],
+                dict(score_features),
+            )
+            self._run_module(module, data, parts_data, parts_features, score_features)
+            if result is None:
+                cache_stats.module_misses += 1
+                self._features_cache.put(
+                    key,
+                    {
+                        "parts": [
+                            _added_items(part_before, part_features)
+                            for part_before, part_features in zip(
+                                before[2], parts_features
+                            )
+                        ],
+                        "score": _added_items(before[3], score_features),
+                        "provides_data": len(_added_items(before[0], data)) > 0
+                        or any(
+                            len(_added_items(part_before, part_data)) > 0
+                            for part_before, part_data in zip(before[1], parts_data)
+                        ),
+                    },
                 )
         return score_features
 
-    def _load_score_data(self, filename: Union[str, PurePath]):
+    def _run_module(
+        self,
+        module,
+        data: dict,
+        parts_data: List[dict],
+        parts_features: List[dict],
+        score_features: dict,
+    ):
+        self._update_parts_module_features(module, data, parts_data, parts_features)
+        self._update_score_module_features(
+            module, data, parts_data, parts_features, score_features
+        )
+
+    def _load_score_data(
+        self,
+        filename: Union[str, PurePath],
+        fast_parser: Optional[bool] = None,
+        repeat_marks: Optional[dict] = None,
+    ):
         filename = Path(filename)
+        if fast_parser is None:
+            fast_parser = self._cfg.fast_parser
         # if filename.suffix == mscore_c.MUSESCORE_FILE_EXTENSION:
         #     # convert to xml in a temporary file
         #     mscore = self._cfg.mscore_exec
@@ -535,48 +1215,101 @@ class FeaturesExtractor:
         #         )
         # else:
             # tmp_path = filename
-        score = parse_filename(
-            filename,
-            self._cfg.split_keywords,
-            expand_repeats=self._cfg.expand_repeats,
-            export_dfs_to=self._cfg.dfs_dir,
-            remove_unpitched_objects=self._cfg.remove_unpitched_objects,
-        )
-        numeric_tempo = extract_numeric_tempo(filename)
+        score = None
+        data = None
+        if filename.suffix in MUSICXML_FILE_EXTENSIONS:
+            # the file is read once: the fast parser, music21 (if the fast parser
+            # cannot represent the score) and the header pass parse it from memory
+            try:
+                data = read_musicxml(filename)
+            except Exception as e:
+                raise ParseFileError(filename) from e
+        if fast_parser and data is not None:
+            score = parse_arrays(
+                filename,
+                self._cfg.split_keywords,
+                remove_unpitched_objects=self._cfg.remove_unpitched_objects,
+                data=data,
+            )
+        if score is None:
+            score = parse_filename(
+                filename,
+                self._cfg.split_keywords,
+                expand_repeats=self._cfg.expand_repeats,
+                export_dfs_to=self._cfg.dfs_dir,
+                remove_unpitched_objects=self._cfg.remove_unpitched_objects,
+                repeat_marks=repeat_marks,
+                data=data,
+            )
+        if isinstance(score, ScoreArrays):
+            # the header was read by the fast parser in the same pass
+            header = score.header
+        else:
+            header = read_score_header(filename, data)
         # if filename.suffix == mscore_c.MUSESCORE_FILE_EXTENSION:
         #     os.close(tmp_d)
         #     os.remove(tmp_path)
-        filtered_parts = self._filter_parts(score)
-        return score, tuple(filtered_parts), numeric_tempo
+        filtered_parts = self._filter_parts(score, header)
+        return score, tuple(filtered_parts), header
 
     def _get_score_data(
-        self, filename: PurePath, load_cache: Optional[Path] = None
+        self,
+        filename: PurePath,
+        load_cache: Optional[Path] = None,
+        score_key: Optional[str] = None,
     ) -> dict:
 
-        data = None 
+        data = None
         info_load_str = ""
-        
+        cache_size = None
+
+        ram_key = None
+        if self._ram_cache_size and score_key is not None:
+            file_cache.capacity = self._ram_cache_size
+            ram_key = f"{score_key}:{self._load_settings}"
+            data = file_cache.get(ram_key)
+            if data is not None:
+                cache_stats.ram_hits += 1
+                # features may add objects to `data`, so the RAM copy is never shared
+                data = dict(data)
+                data[C.DATA_FILE] = str(filename)
+                pdebug(f"\nProcessing score {filename}. File was loaded from RAM.")
+                return data
+            cache_stats.ram_misses += 1
+
         if load_cache is not None and load_cache.exists():
-            s = converter.parse(filename)
-            s.toData = types.MethodType(converter.toData, converter)
-            cached_object = SmartModuleCache(s)
+            # the pickled object contains everything needed by the features; music21
+            # is only used again if an object must be resurrected
+            # files given directly as input cannot be parsed again, so their header
+            # is not checked
+            header = (
+                self._cache_header
+                if filename.suffix != CACHE_FILE_EXTENSION
+                else None
+            )
             try:
-                data = pickle.load(open(load_cache, "rb"))
+                data = self._cache_store.load(load_cache, header)
+            except CacheHeaderMismatch as e:
+                cache_stats.invalidations += 1
+                info_load_str += f" {e}, parsing it again."
             except Exception as e:
                 info_load_str += f" Error while loading pickled object, continuing with extraction from scratch: {e}"
             else:
+                cache_stats.hits += 1
+                cache_size = load_cache.stat().st_size
                 info_load_str += " File was loaded from cache."
-            # get bytes
-            bytes = cached_object.toData('midi')
-            # write to file
-            with open('output.mid', 'wb') as f:
-                f.write(bytes)
-            # save cached object
-            pickle.dump(cached_object, open(load_cache, 'wb'))
-        
+                if filename.suffix != CACHE_FILE_EXTENSION:
+                    # the same content may have been cached from another path
+                    data[C.DATA_FILE] = str(filename)
+
         if data is None:
+            if load_cache is not None:
+                cache_stats.misses += 1
+            repeat_marks = {} if self._cfg.cache_dir is not None else None
             try:
-                score, filtered_parts, numeric_tempo = self._load_score_data(filename)
+                score, filtered_parts, header = self._load_score_data(
+                    filename, repeat_marks=repeat_marks
+                )
             except ParseFileError as e:
                 perr(f"Error while parsing file {filename}")
                 raise e
@@ -608,28 +1341,173 @@ class FeaturesExtractor:
                 C.DATA_FILE: str(filename),
                 C.DATA_FILTERED_PARTS: filtered_parts,
                 C.DATA_MUSESCORE_SCORE: data_musescore,
-                C.DATA_NUMERIC_TEMPO: numeric_tempo,
+                C.DATA_NUMERIC_TEMPO: header.numeric_tempo,
+                C.DATA_SCORE_HEADER: header,
             }
             if len(self._cfg.precache_hooks) > 0:
                 for hook in self._cfg.precache_hooks:
                     if isinstance(hook, str):
                         hook = __import__(hook, fromlist=[""])
                     hook.execute(self._cfg, data)
-            if self._cfg.cache_dir is not None:
+            if self._cfg.cache_dir is not None and not isinstance(score, ScoreArrays):
                 m21_objects = SmartModuleCache(
                     (data[C.DATA_SCORE], data[C.DATA_FILTERED_PARTS]),
                     resurrect_reference=(
-                        self._load_score_data,
+                        self._resurrect_score_data,
                         # filename.relative_to("."),
                         filename,
                     ),
                 )
                 data[C.DATA_SCORE] = m21_objects[0]
                 data[C.DATA_FILTERED_PARTS] = m21_objects[1]
+                self._set_parts_resurrect_reference(
+                    filename, data, header, repeat_marks
+                )
+
+        if ram_key is not None:
+            if cache_size is None:
+                cache_size = _files_size(filename, data)
+            file_cache.put(ram_key, dict(data), cache_size)
 
         pdebug(f"\nProcessing score {filename}." + info_load_str)
         return data
 
+    def _resurrect_score_data(self, filename: Union[str, PurePath]):
+        # the music21 objects of a cached score are parsed at most once per process
+        ram_key = None
+        if self._ram_cache_size:
+            file_cache.capacity = self._ram_cache_size
+            stat = os.stat(filename)
+            ram_key = f"{filename}:{stat.st_mtime_ns}:{stat.st_size}:{self._load_settings}"
+            loaded = file_cache.get(ram_key)
+            if loaded is not None:
+                cache_stats.ram_hits += 1
+                return loaded
+            cache_stats.ram_misses += 1
+        # cached objects are always music21 objects
+        loaded = self._load_score_data(filename, False)
+        if ram_key is not None:
+            file_cache.put(ram_key, loaded, stat.st_size)
+        _remember_resurrected_parts(f"{filename}:{self._load_settings}", loaded[0].parts)
+        return loaded
+
+    def _set_parts_resurrect_reference(
+        self,
+        filename: PurePath,
+        data: dict,
+        header: ScoreHeader,
+        repeat_marks: dict,
+    ):
+        """
+        Lets each cached part of the score be resurrected alone (see `parse_part`),
+        so that a feature accessing a property that was never cached only parses that
+        part again. Parts that cannot be matched to a single part of the file keep
+        resurrecting the whole score.
+        """
+        part_indices = {}
+        for i, part_header in enumerate(header.parts):
+            # ids shared by more than one part cannot be resurrected alone
+            part_indices[part_header.id] = None if part_header.id in part_indices else i
+        # the signs are copied (once, they may be shared by many parts) so that the
+        # cache file does not contain the whole score
+        copies = {}
+        for marks in repeat_marks.values():
+            for _, _, sign in marks:
+                if id(sign) not in copies:
+                    copies[id(sign)] = deepcopy(sign)
+                    copies[id(sign)].derivation.origin = None
+        repeat_marks = {
+            part_id: [(i, offset, copies[id(sign)]) for i, offset, sign in marks]
+            for part_id, marks in repeat_marks.items()
+        }
+        score_parts = data[C.DATA_SCORE].parts
+        # `score.parts[i]` and `for part in score.parts` give different cached objects
+        indexed_parts = [score_parts[i] for i in range(len(score_parts))]
+        for parts in (score_parts, indexed_parts, data[C.DATA_FILTERED_PARTS]):
+            for part in parts:
+                part_id, part_name = part.id, part.partName
+                part_index = part_indices.get(part_id)
+                if part_index is None and " " in part_id:
+                    # a layer of a part split by `split_layers`, e.g. 'Oboe II'
+                    original_id, layer = part_id.rsplit(" ", 1)
+                    part_index = part_indices.get(original_id)
+                    if not part_name.endswith(f" {layer}"):
+                        part_index = None
+                    part_name = part_name[: -len(layer) - 1]
+                if part_index is None:
+                    continue
+                part.set_resurrect_reference(
+                    (
+                        self._resurrect_part_data,
+                        filename,
+                        part_index,
+                        part_id,
+                        part_name,
+                        part.partAbbreviation,
+                        repeat_marks,
+                    )
+                )
+
+    def _resurrect_part_data(
+        self,
+        filename: PurePath,
+        part_index: int,
+        part_id: str,
+        part_name: str,
+        part_abbreviation: str,
+        repeat_marks: dict,
+        measure_range: Optional[Tuple[int, int]] = None,
+    ) -> Part:
+        score_key = f"{filename}:{self._load_settings}"
+        part = _resurrected_parts.get((score_key, part_id))
+        if part is None:
+            score = self._resurrect_part_score(
+                filename, part_index, part_name, part_abbreviation, repeat_marks
+            )
+            _remember_resurrected_parts(score_key, score.parts)
+            part = _resurrected_parts.get((score_key, part_id))
+            if part is None:
+                raise ParseFileError(filename)
+        if measure_range is not None:
+            # as `Score.measures` does for each part
+            part = part.measures(*measure_range, indicesNotNumbers=True)
+        return part
+
+    def _resurrect_part_score(
+        self,
+        filename: PurePath,
+        part_index: int,
+        part_name: str,
+        part_abbreviation: str,
+        repeat_marks: dict,
+    ) -> Score:
+        # with the RAM cache, a part is not parsed again by other extractors
+        score = None
+        ram_key = None
+        if self._ram_cache_size:
+            file_cache.capacity = self._ram_cache_size
+            stat = os.stat(filename)
+            ram_key = f"{filename}:{stat.st_mtime_ns}:{stat.st_size}:{self._load_settings}:{part_index}"
+            score = file_cache.get(ram_key)
+            if score is not None:
+                cache_stats.ram_hits += 1
+            else:
+                cache_stats.ram_misses += 1
+        if score is None:
+            score = parse_part(
+                filename,
+                part_index,
+                part_name,
+                part_abbreviation,
+                self._cfg.split_keywords,
+                expand_repeats=self._cfg.expand_repeats,
+                remove_unpitched_objects=self._cfg.remove_unpitched_objects,
+                repeat_marks=repeat_marks,
+            )
+            if ram_key is not None:
+                file_cache.put(ram_key, score, stat.st_size)
+        return score
+
     def _get_harmony_data(self, filename: PurePath) -> pd.DataFrame:
         if not filename.exists():
             lerr(f"Musescore file was not found for {filename} file!")
@@ -648,7 +1526,9 @@ class FeaturesExtractor:
                 lerr(str(e))
                 return None
 
-    def _filter_parts(self, score: Score) -> List[Part]:
+    def _filter_parts(
+        self, score: Score, header: Optional[ScoreHeader] = None
+    ) -> List[Part]:
         parts = list(score.parts)
         # self._deal_with_dupicated_parts(parts)
         if self._cfg.parts_filter is None or len(self._cfg.parts_filter) == 0:
@@ -657,7 +1537,7 @@ class FeaturesExtractor:
         return (
             part
             for part in parts
-            if to_abbreviation(part, parts, self._cfg) in filter_set
+            if to_abbreviation(part, parts, self._cfg, header) in filter_set
         )
 
     def _deal_with_dupicated_parts(self, parts):
@@ -669,7 +1549,7 @@ class FeaturesExtractor:
                 parts.remove(part)
 
     def _get_part_data(self, score_data: dict, part: Part) -> dict:
-        sound = extract_sound(part, self._cfg)
+        sound = extract_sound(part, self._cfg, score_data.get(C.DATA_SCORE_HEADER))
         part_abbreviation, sound_abbreviation, part_number = _extract_abbreviated_part(
             sound, part, score_data[C.DATA_FILTERED_PARTS], self._cfg
         )
@@ -749,7 +1629,8 @@ class FeaturesExtractor:
                     f"An error occurred while extracting module {module.__name__} in {score_name}!!.\nError: {e}\n"
                 )
                 raise FeatureError(
-                    f"In {score_name} while computing {module.__name__}"
+                    f"In {score_name} while computing {module.__name__}",
+                    module.__name__,
                 ) from e
 
     def _update_score_module_features(
@@ -773,5 +1654,67 @@ class FeaturesExtractor:
                 f"An error occurred while extracting module {module.__name__} in {score_name}!!.\nError: {e}\n"
             )
             raise FeatureError(
-                f"In {score_name} while computing {module.__name__}"
+                f"In {score_name} while computing {module.__name__}",
+                module.__name__,
             ) from e
+
+
+def _set_score_id(
+    score_features: Union[dict, List[dict]], idx: int
+) -> Union[dict, List[dict]]:
+    # rows reused by the incremental extraction get the `Id` of the current run
+    if isinstance(score_features, list):
+        for window_features in score_features:
+            window_features[C.ID] = idx
+    else:
+        score_features[C.ID] = idx
+    return score_features
+
+
+def _added_items(before: dict, after: dict) -> dict:
+    # the items of `after` that were added or replaced since `before` was copied
+    return {k: v for k, v in after.items() if k not in before or before[k] is not v}
+
+
+def _fix_dtypes(score_df: DataFrame) -> DataFrame:
+    score_df = score_df.convert_dtypes()
+    return score_df.apply(cast_mixed_dtypes, axis=0)
+
+
+def _read_features(path: Union[str, PurePath]) -> DataFrame:
+    suffix = PurePath(path).suffix
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    if suffix == ".pkl":
+        return pd.read_pickle(path)
+    return pd.read_csv(path, low_memory=False)
+
+
+def _write_features(df: DataFrame, path: Union[str, PurePath]) -> None:
+    suffix = PurePath(path).suffix
+    if suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    elif suffix == ".pkl":
+        df.to_pickle(path)
+    else:
+        df.to_csv(path, index=False)
+
+
+def _score_rows(score_features: Union[dict, List[dict]]) -> List[dict]:
+    # the features of a score are a list of rows, one per window, with `window_size`
+    return score_features if isinstance(score_features, list) else [score_features]
+
+
+def _remember_resurrected_parts(score_key: str, parts) -> None:
+    if any(key != score_key for key, _ in _resurrected_parts):
+        _resurrected_parts.clear()
+    for part in parts:
+        _resurrected_parts[(score_key, part.id)] = part
+
+
+def _files_size(filename: PurePath, score_data: dict) -> int:
+    # the size of a parsed score in RAM is estimated from the size of its files
+    size = os.path.getsize(filename)
+    if score_data.get(C.DATA_MUSESCORE_SCORE) is not None:
+        size += int(score_data[C.DATA_MUSESCORE_SCORE].memory_usage(deep=True).sum())
+    return size
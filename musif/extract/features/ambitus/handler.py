@@ -1,6 +1,7 @@
 from statistics import mean
 from typing import List, Optional, Tuple
 
+import numpy as np
 from music21.chord import Chord
 from music21.harmony import ChordSymbol
 
@@ -8,9 +9,10 @@ from music21.note import Note
 
 from musif.config import ExtractConfiguration
 from musif.extract.common import _filter_parts_data
-from musif.extract.constants import DATA_PART_ABBREVIATION
+from musif.extract.constants import DATA_PART_ABBREVIATION, DATA_WINDOW
 from musif.extract.features.core.constants import DATA_NOTES
 from musif.cache import isinstance
+from musif.musicxml.arrays import NoteArrays
 
 from ..prefix import get_part_feature
 from .constants import *
@@ -22,11 +24,22 @@ def update_part_objects(
     notes = part_data[DATA_NOTES]
     if notes is None or len(notes) == 0:
         return
-    lowest_note, highest_note = _get_notes_ambitus(notes)
-    lowest_note_text = lowest_note.nameWithOctave.replace("-", "b")
-    highest_note_text = highest_note.nameWithOctave.replace("-", "b")
-    lowest_note_index = int(lowest_note.pitch.midi)
-    highest_note_index = int(highest_note.pitch.midi)
+    if isinstance(notes, NoteArrays):
+        lowest_note, highest_note = np.argmin(notes.midi), np.argmax(notes.midi)
+        lowest_note_text = notes.name[lowest_note].replace("-", "b")
+        highest_note_text = notes.name[highest_note].replace("-", "b")
+        lowest_note_index = int(notes.midi[lowest_note])
+        highest_note_index = int(notes.midi[highest_note])
+    else:
+        window = part_data.get(DATA_WINDOW)
+        if window is not None:
+            lowest_note, highest_note = window.ambitus()
+        else:
+            lowest_note, highest_note = _get_notes_ambitus(notes)
+        lowest_note_text = lowest_note.nameWithOctave.replace("-", "b")
+        highest_note_text = highest_note.nameWithOctave.replace("-", "b")
+        lowest_note_index = int(lowest_note.pitch.midi)
+        highest_note_index = int(highest_note.pitch.midi)
     total_ambitus = highest_note_index - lowest_note_index
     ambitus_features = {
         LOWEST_NOTE: lowest_note_text,
@@ -4,6 +4,7 @@ DATA_LYRICS = "lyrics"
 DATA_SOUNDING_MEASURES = "sounding_measures"
 DATA_MEASURES = "measures"
 DATA_INTERVALS = "intervals"
+DATA_EVENTS = "events"
 DATA_KEY = "key"
 DATA_KEY_NAME = "key_name"
 DATA_MODE = "mode"
@@ -2,7 +2,6 @@ from os import path
 from typing import List
 import pandas as pd
 from music21 import *
-from music21.stream import Measure
 from musif.extract.constants import DATA_FILTERED_PARTS
 from musif.extract.features.tempo.constants import TIME_SIGNATURE
 
@@ -20,6 +19,7 @@ from musif.extract.constants import (
     DATA_PART_ABBREVIATION,
     DATA_SCORE,
     DATA_SOUND_ABBREVIATION,
+    DATA_WINDOW,
     GLOBAL_TIME_SIGNATURE,
 )
 from musif.extract.features.prefix import (
@@ -31,8 +31,11 @@ from musif.extract.features.prefix import (
 from musif.musicxml.common import (
     _get_intervals,
     _get_lyrics_in_notes,
+    get_measures,
     get_notes_and_measures,
 )
+from musif.musicxml.arrays import PartArrays
+from musif.musicxml.events import PartEvents
 from musif.musicxml.key import get_key_and_mode, _get_key_signature, get_name_from_key
 
 from .constants import *
@@ -41,17 +44,40 @@ from .constants import *
 def update_part_objects(
     score_data: dict, part_data: dict, cfg: ExtractConfiguration, part_features: dict
 ):
-    part = part_data[DATA_PART]
-    (
-        notes,
-        measures,
-        sounding_measures,
-        notes_and_rests,
-    ) = get_notes_and_measures(part)
-    lyrics = _get_lyrics_in_notes(notes)
-    intervals = _get_intervals(notes)
+    window = part_data.get(DATA_WINDOW)
+    if window is not None:
+        # the objects of a window are slices of those of the whole part
+        notes = window.notes
+        measures = window.measures
+        sounding_measures = window.sounding_measures
+        notes_and_rests = window.notes_and_rests
+        lyrics = window.lyrics
+        intervals = window.intervals
+        events = window.events
+    else:
+        part = part_data[DATA_PART]
+        events = PartEvents(part)
+        if isinstance(part, PartArrays):
+            (
+                notes,
+                measures,
+                sounding_measures,
+                notes_and_rests,
+            ) = get_notes_and_measures(part)
+        else:
+            # the elements of the measures are read once, and the other modules
+            # look them up in `events`
+            (
+                notes,
+                measures,
+                sounding_measures,
+                notes_and_rests,
+            ) = events.notes_and_measures()
+        lyrics = _get_lyrics_in_notes(notes)
+        intervals = _get_intervals(notes)
     part_data.update(
         {
+            DATA_EVENTS: events,
             DATA_NOTES: notes,
             DATA_LYRICS: lyrics,
             DATA_SOUNDING_MEASURES: sounding_measures,
@@ -76,8 +102,17 @@ def update_score_objects(
     parts_features: List[dict],
     score_features: dict,
 ):
-    score = score_data[DATA_SCORE]
-    score_key, key_name, mode = get_key_and_mode(score)
+    window = score_data.get(DATA_WINDOW)
+    if window is not None:
+        # the key of a window is estimated from the index of the whole score, so
+        # that the window stream is not built
+        score_key = window.key()
+        mode, key_name = get_name_from_key(score_key)
+        num_measures = len(window.first_part_measures)
+    else:
+        score = score_data[DATA_SCORE]
+        score_key, key_name, mode = get_key_and_mode(score)
+        num_measures = len(get_measures(score.parts[0]))
     if (
         cfg.is_requested_musescore_file()
         and (score_data[DATA_MUSESCORE_SCORE] is not None)
@@ -89,10 +124,8 @@ def update_score_objects(
             mode, key_name = get_name_from_key(score_key)
 
     score_features[FILE_NAME] = path.basename(score_data[DATA_FILE])
-    num_measures = len(score.parts[0].getElementsByClass(Measure))
     key_signature = _get_key_signature(score_key)
 
-    part = score.parts[0]
     time_signature = _get_time_signature(score_data)
 
     score_data.update(
@@ -191,9 +224,7 @@ def _get_time_signature(score_data: dict) -> str:
     if hasattr(score_data.get(GLOBAL_TIME_SIGNATURE), 'ratioString'):
         time_signature = score_data[GLOBAL_TIME_SIGNATURE].ratioString
     else:
-        first_measure = score_data[DATA_FILTERED_PARTS][0].getElementsByClass(Measure)[
-            0
-        ]
+        first_measure = get_measures(score_data[DATA_FILTERED_PARTS][0])[0]
         if hasattr(first_measure.timeSignature, 'ratioString'):
             time_signature = first_measure.timeSignature.ratioString
         else:
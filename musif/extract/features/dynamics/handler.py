@@ -3,12 +3,14 @@ from statistics import mean
 from typing import List
 from xml.dom.minidom import Element
 
+import numpy as np
+
 from musif.config import ExtractConfiguration
 from musif.extract.features.prefix import get_part_feature, get_score_feature
 from musif.extract.utils import _get_beat_position
 from musif.logs import lwarn, pwarn
 
-from musif.extract.features.core.constants import DATA_SOUNDING_MEASURES
+from musif.extract.features.core.constants import DATA_EVENTS, DATA_SOUNDING_MEASURES
 from musif.musicxml.tempo import get_number_of_beats
 
 from ...constants import DATA_PART_ABBREVIATION
@@ -32,9 +34,14 @@ def update_part_objects(
     first_silence = False
     beats_timesignature = get_number_of_beats("4/4")
 
-    for measure in part_data["measures"]:
-        measure_elements = list(measure.elements)
-        for element in measure_elements:
+    # only the dynamics, text expressions, time signatures and rests of the measures
+    # change the dynamics, so the other elements are skipped
+    events = part_data[DATA_EVENTS]
+    positions = events.positions(DYNAMIC, TEXTEXPRESSION, TIMESIGNATURE, REST)
+    measure_bounds = np.searchsorted(positions, events.measure_starts).tolist()
+    for i, measure in enumerate(events.measures):
+        measure_positions = positions[measure_bounds[i] : measure_bounds[i + 1]]
+        for element in [events.elements[j] for j in measure_positions.tolist()]:
             if (
                 element.classes[0] == DYNAMIC
                 and not element.value == "sf"
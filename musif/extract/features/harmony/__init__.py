@@ -0,0 +1 @@
+musif_dependencies = ['core']
@@ -18,6 +18,8 @@ from musif.extract.features.core.handler import DATA_LYRICS, DATA_NOTES
 
 from musif.extract.features.prefix import get_part_feature, get_score_feature
 
+from musif.musicxml.arrays import NoteArrays
+
 from .constants import *
 
 from musif.extract.features.core.constants import (
@@ -96,9 +98,14 @@ def update_score_objects(
                 part_data[DATA_NOTES], part_data[DATA_LYRICS]
             )
 
-        notes = [
-            note for part_data in voice_parts_data for note in part_data[DATA_NOTES]
-        ]
+        if isinstance(voice_parts_data[0][DATA_NOTES], NoteArrays):
+            notes = NoteArrays.concatenate(
+                [part_data[DATA_NOTES] for part_data in voice_parts_data]
+            )
+        else:
+            notes = [
+                note for part_data in voice_parts_data for note in part_data[DATA_NOTES]
+            ]
 
         lyrics = [
             lyrics
@@ -126,6 +133,10 @@ def get_syllabic_ratio(notes: List[Note], lyrics: List[str]) -> float:
 
 def get_voice_reg(notes: List[Note]) -> float:
 
+    if isinstance(notes, NoteArrays):
+
+        return mean(notes.midi - notes.midi[-1]) if len(notes) > 0 else "NA"
+
     if notes:
 
         last_note = (
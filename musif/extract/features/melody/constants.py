@@ -1,3 +1,5 @@
+DATA_INTERVALS_SUMMARY = "intervals_summary"
+
 MEAN_INTERVAL = "MeanInterval"
 INTERVALLIC_MEAN = "IntervallicMean"
 INTERVALLIC_STD = "IntervallicStd"
@@ -1,15 +1,10 @@
-from collections import Counter
-from itertools import groupby
-from statistics import mean, stdev
+from statistics import mean
 from typing import List, Tuple, Dict, Union
 
 import numpy as np
-import pandas as pd
-from music21.interval import Interval
-from scipy.stats import kurtosis, skew
-from scipy.stats.mstats import trimmed_mean, trimmed_std
+from music21.note import Note
 
-from musif.cache import hasattr
+from musif.cache import isinstance
 from musif.common._utils import extract_digits
 from musif.config import ExtractConfiguration
 from musif.extract.common import _mix_data_with_precedent_data
@@ -21,20 +16,43 @@ from musif.extract.features.prefix import (
     get_score_prefix,
     get_sound_prefix,
 )
+from musif.musicxml.arrays import CHORD_NONE, KIND_NOTE, NoteArrays
+from musif.musicxml.intervals import (
+    QUALITY_AUGMENTED,
+    QUALITY_DIMINISHED,
+    QUALITY_DOUBLE_AUGMENTED,
+    QUALITY_DOUBLE_DIMINISHED,
+    QUALITY_MAJOR,
+    QUALITY_MINOR,
+    QUALITY_PERFECT,
+    QUALITY_UNKNOWN,
+    semitones_directed_name,
+)
 
 from .constants import *
+from .utils import (
+    IntervalSummary,
+    weighted_kurtosis,
+    weighted_mean,
+    weighted_skew,
+    weighted_stdev,
+    weighted_sum,
+    weighted_trimmed_mean,
+    weighted_trimmed_std,
+)
 
 
 def update_part_objects(
     score_data: dict, part_data: dict, cfg: ExtractConfiguration, part_features: dict
 ):
-    intervals = part_data[DATA_INTERVALS]
+    summary = IntervalSummary.from_intervals(part_data[DATA_INTERVALS])
+    part_data[DATA_INTERVALS_SUMMARY] = summary
 
     part_features.update(get_motion_features(part_data))
-    part_features.update(get_interval_features(intervals))
-    part_features.update(get_interval_count_features(intervals))
-    part_features.update(get_interval_type_features(intervals))
-    part_features.update(get_interval_stats_features(intervals))
+    part_features.update(get_interval_features(summary))
+    part_features.update(get_interval_count_features(summary))
+    part_features.update(get_interval_type_features(summary))
+    part_features.update(get_interval_stats_features(summary))
 
 
 def update_score_objects(
@@ -47,8 +65,14 @@ def update_score_objects(
     if len(parts_data) == 0:
         return
 
+    # the intervals of each part are summarized once, and the summaries are merged
+    # for sounds and for the score
+    summaries = [_get_intervals_summary(part_data) for part_data in parts_data]
+
     features = {}
-    for part_data, part_features in zip(parts_data, parts_features):
+    for part_data, part_features, summary in zip(
+        parts_data, parts_features, summaries
+    ):
         part = part_data[DATA_PART_ABBREVIATION]
         for step in MOTION_STEPS:
             for win in MOTION_WINS:
@@ -75,11 +99,10 @@ def update_score_objects(
                 ] = part_features[DESCENDENT_PROPORTION + key_postfix]
 
         part_prefix = get_part_prefix(part_data[DATA_PART_ABBREVIATION])
-        intervals = part_data[DATA_INTERVALS]
-        interval_features = get_interval_features(intervals, part_prefix)
-        interval_count_features = get_interval_count_features(intervals, part_prefix)
-        interval_type_features = get_interval_type_features(intervals, part_prefix)
-        interval_stats_features = get_interval_stats_features(intervals, part_prefix)
+        interval_features = get_interval_features(summary, part_prefix)
+        interval_count_features = get_interval_count_features(summary, part_prefix)
+        interval_type_features = get_interval_type_features(summary, part_prefix)
+        interval_stats_features = get_interval_stats_features(summary, part_prefix)
 
         if all([i in features for i in interval_features.keys()]):
             _mix_data_with_precedent_data(features, interval_features)
@@ -98,92 +121,96 @@ def update_score_objects(
         else:
             features.update(interval_stats_features)
 
-    parts_data_per_sound = {
+    summaries_per_sound = {
         part_data[DATA_SOUND_ABBREVIATION]: [] for part_data in parts_data
     }
-    for part_data in parts_data:
-        sound = part_data[DATA_SOUND_ABBREVIATION]
-        parts_data_per_sound[sound].append(part_data)
+    for part_data, summary in zip(parts_data, summaries):
+        summaries_per_sound[part_data[DATA_SOUND_ABBREVIATION]].append(summary)
 
-    for sound, sound_parts_data in parts_data_per_sound.items():
+    for sound, sound_summaries in summaries_per_sound.items():
         sound_prefix = get_sound_prefix(sound)
-        intervals = [
-            interval
-            for part_data in sound_parts_data
-            for interval in part_data[DATA_INTERVALS]
-        ]
-        features.update(get_interval_features(intervals, sound_prefix))
-        features.update(get_interval_count_features(intervals, sound_prefix))
-        features.update(get_interval_type_features(intervals, sound_prefix))
-        features.update(get_interval_stats_features(intervals, sound_prefix))
-
-    score_intervals = [
-        interval for part_data in parts_data for interval in part_data[DATA_INTERVALS]
-    ]
+        summary = IntervalSummary.merge(sound_summaries)
+        features.update(get_interval_features(summary, sound_prefix))
+        features.update(get_interval_count_features(summary, sound_prefix))
+        features.update(get_interval_type_features(summary, sound_prefix))
+        features.update(get_interval_stats_features(summary, sound_prefix))
+
+    score_summary = IntervalSummary.merge(summaries)
     score_prefix = get_score_prefix()
 
-    features.update(get_interval_features(score_intervals, score_prefix))
-    features.update(get_interval_count_features(score_intervals, score_prefix))
-    features.update(get_interval_type_features(score_intervals, score_prefix))
-    features.update(get_interval_stats_features(score_intervals, score_prefix))
+    features.update(get_interval_features(score_summary, score_prefix))
+    features.update(get_interval_count_features(score_summary, score_prefix))
+    features.update(get_interval_type_features(score_summary, score_prefix))
+    features.update(get_interval_stats_features(score_summary, score_prefix))
 
     score_features.update(features)
 
 
-def get_interval_features(intervals: List[Interval], prefix: str = ""):
-    numeric_intervals = [interval.semitones for interval in intervals]
-    absolute_numeric_intervals = [
-        abs(numeric_interval) for numeric_interval in numeric_intervals
-    ]
-    ascending_intervals = [
-        numeric_interval
-        for numeric_interval in numeric_intervals
-        if numeric_interval > 0
-    ]
-    descending_intervals = [
-        numeric_interval
-        for numeric_interval in numeric_intervals
-        if numeric_interval < 0
-    ]
+def _get_intervals_summary(part_data: dict) -> IntervalSummary:
+    summary = part_data.get(DATA_INTERVALS_SUMMARY)
+    if summary is None:
+        summary = IntervalSummary.from_intervals(part_data[DATA_INTERVALS])
+    return summary
+
+
+def get_interval_features(intervals: IntervalSummary, prefix: str = ""):
+    values, counts, first = intervals.semitones_histogram()
+    absolute_values, absolute_counts, _ = intervals.semitones_histogram(absolute=True)
+    ascending = values > 0
+    descending = values < 0
+    ascending_values, ascending_counts = values[ascending], counts[ascending]
+    descending_values, descending_counts = values[descending], counts[descending]
+    num_intervals = len(intervals)
+    num_ascending_intervals = int(ascending_counts.sum())
+    num_descending_intervals = int(descending_counts.sum())
 
     absolute_intervallic_mean = (
-        mean(absolute_numeric_intervals) if len(intervals) > 0 else 0
+        weighted_mean(absolute_values, absolute_counts) if num_intervals > 0 else 0
     )
-    intervallic_mean = mean(numeric_intervals) if len(intervals) > 0 else 0
+    intervallic_mean = weighted_mean(values, counts) if num_intervals > 0 else 0
     ascending_intervallic_mean = (
-        mean(ascending_intervals) if len(ascending_intervals) > 0 else 0
+        weighted_mean(ascending_values, ascending_counts)
+        if num_ascending_intervals > 0
+        else 0
     )
     descending_intervallic_mean = (
-        mean(descending_intervals) if len(descending_intervals) > 0 else 0
+        weighted_mean(descending_values, descending_counts)
+        if num_descending_intervals > 0
+        else 0
     )
-    with np.errstate(invalid="ignore"):
-        absolute_intervallic_std = (
-            stdev(absolute_numeric_intervals) if len(intervals) > 1 else 0
-        )
-        intervallic_std = stdev(numeric_intervals) if len(intervals) > 1 else 0
-        ascending_intervallic_std = (
-            stdev(ascending_intervals) if len(ascending_intervals) > 1 else 0
-        )
-        descending_intervallic_std = (
-            stdev(descending_intervals) if len(descending_intervals) > 1 else 0
-        )
-    mean_interval = Interval(int(round(absolute_intervallic_mean))).directedName
+    absolute_intervallic_std = (
+        weighted_stdev(absolute_values, absolute_counts) if num_intervals > 1 else 0
+    )
+    intervallic_std = weighted_stdev(values, counts) if num_intervals > 1 else 0
+    ascending_intervallic_std = (
+        weighted_stdev(ascending_values, ascending_counts)
+        if num_ascending_intervals > 1
+        else 0
+    )
+    descending_intervallic_std = (
+        weighted_stdev(descending_values, descending_counts)
+        if num_descending_intervals > 1
+        else 0
+    )
+    mean_interval = semitones_directed_name(int(round(absolute_intervallic_mean)))
 
     cutoff = 0.1
-    limits = (cutoff, cutoff)
     trimmed_intervallic_mean = (
-        trimmed_mean(numeric_intervals, limits) if len(intervals) > 0 else 0
+        weighted_trimmed_mean(values, counts, cutoff) if num_intervals > 0 else 0
     )
     trimmed_absolute_intervallic_mean = (
-        trimmed_mean(absolute_numeric_intervals, limits) if len(intervals) > 0 else 0
+        weighted_trimmed_mean(absolute_values, absolute_counts, cutoff)
+        if num_intervals > 0
+        else 0
+    )
+    trimmed_intervallic_std = (
+        weighted_trimmed_std(values, counts, cutoff) if num_intervals > 1 else 0
+    )
+    trimmed_absolute_intervallic_std = (
+        weighted_trimmed_std(absolute_values, absolute_counts, cutoff)
+        if num_intervals > 1
+        else 0
     )
-    with np.errstate(invalid="ignore"):
-        trimmed_intervallic_std = (
-            trimmed_std(numeric_intervals, limits) if len(intervals) > 1 else 0
-        )
-        trimmed_absolute_intervallic_std = (
-            trimmed_std(absolute_numeric_intervals, limits) if len(intervals) > 1 else 0
-        )
     trim_diff = intervallic_mean - trimmed_intervallic_mean
     trim_ratio = trim_diff / intervallic_mean if intervallic_mean != 0 else 0
     absolute_trim_diff = absolute_intervallic_mean - trimmed_absolute_intervallic_mean
@@ -192,63 +219,61 @@ def get_interval_features(intervals: List[Interval], prefix: str = ""):
         if absolute_intervallic_mean != 0
         else 0
     )
-    num_ascending_intervals = (
-        len(ascending_intervals) if len(ascending_intervals) > 0 else 0
-    )
-    num_descending_intervals = (
-        len(descending_intervals) if len(descending_intervals) > 0 else 0
-    )
-    num_ascending_semitones = (
-        sum(ascending_intervals) if len(ascending_intervals) > 0 else 0
-    )
-    num_descending_semitones = (
-        sum(descending_intervals) if len(descending_intervals) > 0 else 0
-    )
+    num_ascending_semitones = weighted_sum(ascending_values, ascending_counts)
+    num_descending_semitones = weighted_sum(descending_values, descending_counts)
     ascending_intervals_percentage = (
-        num_ascending_intervals / len(intervals) if len(intervals) > 0 else 0
+        num_ascending_intervals / num_intervals if num_intervals > 0 else 0
     )
     descending_intervals_percentage = (
-        num_descending_intervals / len(intervals) if len(intervals) > 0 else 0
+        num_descending_intervals / num_intervals if num_intervals > 0 else 0
     )
 
-    largest_semitones = max(numeric_intervals) if len(numeric_intervals) > 0 else None
+    values = values.tolist()
+    ascending_values = ascending_values.tolist()
+    descending_values = descending_values.tolist()
+    largest_semitones = values[-1] if num_intervals > 0 else None
     largest = (
-        Interval(largest_semitones).directedName if len(numeric_intervals) > 0 else None
+        semitones_directed_name(largest_semitones) if num_intervals > 0 else None
     )
+    # of the intervals with the fewest semitones (e.g. -1 and 1), the first one
     smallest_semitones = (
-        sorted(numeric_intervals, key=abs)[0] if len(numeric_intervals) > 0 else None
+        values[int(np.lexsort((first, np.abs(values)))[0])]
+        if num_intervals > 0
+        else None
+    )
+    smallest = (
+        semitones_directed_name(smallest_semitones) if num_intervals > 0 else None
     )
-    smallest = Interval(smallest_semitones).directedName if len(intervals) > 0 else None
     largest_ascending_semitones = (
-        max(ascending_intervals) if len(ascending_intervals) > 0 else None
+        ascending_values[-1] if num_ascending_intervals > 0 else None
     )
     largest_ascending = (
-        Interval(largest_ascending_semitones).directedName
-        if len(ascending_intervals) > 0
+        semitones_directed_name(largest_ascending_semitones)
+        if num_ascending_intervals > 0
         else None
     )
     largest_descending_semitones = (
-        min(descending_intervals) if len(descending_intervals) > 0 else None
+        descending_values[0] if num_descending_intervals > 0 else None
     )
     largest_descending = (
-        Interval(largest_descending_semitones).directedName
-        if len(descending_intervals) > 0
+        semitones_directed_name(largest_descending_semitones)
+        if num_descending_intervals > 0
         else None
     )
     smallest_ascending_semitones = (
-        min(ascending_intervals) if len(ascending_intervals) > 0 else None
+        ascending_values[0] if num_ascending_intervals > 0 else None
     )
     smallest_ascending = (
-        Interval(smallest_ascending_semitones).directedName
-        if len(ascending_intervals) > 0
+        semitones_directed_name(smallest_ascending_semitones)
+        if num_ascending_intervals > 0
         else None
     )
     smallest_descending_semitones = (
-        max(descending_intervals) if len(descending_intervals) > 0 else None
+        descending_values[-1] if num_descending_intervals > 0 else None
     )
     smallest_descending = (
-        Interval(smallest_descending_semitones).directedName
-        if len(descending_intervals) > 0
+        semitones_directed_name(smallest_descending_semitones)
+        if num_descending_intervals > 0
         else None
     )
 
@@ -312,8 +337,12 @@ def get_interval_features(intervals: List[Interval], prefix: str = ""):
     return features
 
 
-def get_interval_count_features(intervals: List[Interval], prefix: str = "") -> dict:
-    interval_counts = Counter([interval.directedName for interval in intervals])
+def get_interval_count_features(intervals: IntervalSummary, prefix: str = "") -> dict:
+    interval_counts = {}
+    for name, count in zip(
+        intervals.intervals.directed_names().tolist(), intervals.counts.tolist()
+    ):
+        interval_counts[name] = interval_counts.get(name, 0) + count
     total_count = len(intervals)
     interval_features = {}
     for interval, count in interval_counts.items():
@@ -326,89 +355,81 @@ def get_interval_count_features(intervals: List[Interval], prefix: str = "") ->
     return interval_features
 
 
-def get_interval_type_features(intervals_list: List[Interval], prefix: str = ""):
-    repeated_notes_list = []
-    stepwise_list = []
-    leaps_list = []
-    within_octave_list = []
-    beyond_octave_list = []
-    perfect_list = []
-    major_list = []
-    minor_list = []
-    double_augmented_list = []
-    augmented_list = []
-    double_diminished_list = []
-    diminished_list = []
-    for interval in intervals_list:
-        name = interval.directedName
-        interval_number = int(extract_digits(name))
-        if interval_number == 1:
-            repeated_notes_list.append(interval)
-        elif interval_number == 2:
-            stepwise_list.append(interval)
-        elif interval_number >= 3:
-            leaps_list.append(interval)
-
-        if abs(interval.semitones) <= 12:
-            within_octave_list.append(interval)
-        else:
-            beyond_octave_list.append(interval)
-
-        if name.startswith("AA"):
-            double_augmented_list.append(interval)
-        elif name.startswith("A"):
-            augmented_list.append(interval)
-        elif name.startswith("M"):
-            major_list.append(interval)
-        elif name.lower().startswith("p"):
-            perfect_list.append(interval)
-        elif name.startswith("m"):
-            minor_list.append(interval)
-        elif name.startswith("dd"):
-            double_diminished_list.append(interval)
-        elif name.startswith("d"):
-            diminished_list.append(interval)
-        else:
-            raise ValueError(f"Unexpected interval name: {name}")
+def get_interval_type_features(intervals_list: IntervalSummary, prefix: str = ""):
+    distinct = intervals_list.intervals
+    qualities = distinct.qualities()
+    if np.any(qualities == QUALITY_UNKNOWN):
+        name = distinct.directed_names()[qualities == QUALITY_UNKNOWN][0]
+        raise ValueError(f"Unexpected interval name: {name}")
+    interval_numbers = np.abs(distinct.generic)
+    absolute_semitones = np.abs(distinct.semitones)
+    repeated_notes = interval_numbers == 1
+    stepwise = interval_numbers == 2
+    leaps = interval_numbers >= 3
+    within_octave = absolute_semitones <= 12
+    beyond_octave = absolute_semitones > 12
+    perfect = qualities == QUALITY_PERFECT
+    major = qualities == QUALITY_MAJOR
+    minor = qualities == QUALITY_MINOR
+    double_augmented = qualities == QUALITY_DOUBLE_AUGMENTED
+    augmented = qualities == QUALITY_AUGMENTED
+    double_diminished = qualities == QUALITY_DOUBLE_DIMINISHED
+    diminished = qualities == QUALITY_DIMINISHED
     all_intervals = len(intervals_list)
-    all_repeated = len(repeated_notes_list)
+    all_repeated = int(intervals_list.counts[repeated_notes].sum())
     all_stepwise, ascending_stepwise, descending_stepwise = get_all_asc_desc_count(
-        stepwise_list
+        intervals_list, stepwise
+    )
+    all_leaps, ascending_leaps, descending_leaps = get_all_asc_desc_count(
+        intervals_list, leaps
     )
-    all_leaps, ascending_leaps, descending_leaps = get_all_asc_desc_count(leaps_list)
     (
         all_within_octave,
         ascending_within_octave,
         descending_within_octave,
-    ) = get_all_asc_desc_count(within_octave_list)
+    ) = get_all_asc_desc_count(
+        intervals_list, within_octave
+    )
     (
         all_beyond_octave,
         ascending_beyond_octave,
         descending_beyond_octave,
-    ) = get_all_asc_desc_count(beyond_octave_list)
+    ) = get_all_asc_desc_count(
+        intervals_list, beyond_octave
+    )
     (
         all_double_augmented,
         ascending_double_augmented,
         descending_double_augmented,
-    ) = get_all_asc_desc_count(double_augmented_list)
+    ) = get_all_asc_desc_count(
+        intervals_list, double_augmented
+    )
     all_augmented, ascending_augmented, descending_augmented = get_all_asc_desc_count(
-        augmented_list
+        intervals_list, augmented
+    )
+    all_major, ascending_major, descending_major = get_all_asc_desc_count(
+        intervals_list, major
     )
-    all_major, ascending_major, descending_major = get_all_asc_desc_count(major_list)
     all_perfect, ascending_perfect, descending_perfect = get_all_asc_desc_count(
-        perfect_list
+        intervals_list, perfect
+    )
+    all_minor, ascending_minor, descending_minor = get_all_asc_desc_count(
+        intervals_list, minor
     )
-    all_minor, ascending_minor, descending_minor = get_all_asc_desc_count(minor_list)
     (
         all_diminished,
         ascending_diminished,
         descending_diminished,
-    ) = get_all_asc_desc_count(diminished_list)
+    ) = get_all_asc_desc_count(
+        intervals_list, diminished
+    )
     (
         all_double_diminished,
         ascending_double_diminished,
         descending_double_diminished,
-    ) = get_all_asc_desc_count(double_diminished_list)
+    ) = get_all_asc_desc_count(
+        intervals_list, double_diminished
+    )
 
     return {
         f"{prefix}{REPEATED_NOTES_COUNT}": all_repeated,
@@ -561,43 +582,32 @@ def get_interval_type_features(intervals_list: List[Interval], prefix: str = "")
     }
 
 
-def get_ascending_descending(
-    intervals: List[Interval],
-) -> Tuple[List[Interval], List[Interval]]:
-    ascending = [interval for interval in intervals if interval.semitones > 0]
-    descending = [interval for interval in intervals if interval.semitones < 0]
-    return ascending, descending
-
-
-def get_all_asc_desc_count(intervals: List[Interval]) -> Tuple[int, int, int]:
-    ascending, descending = get_ascending_descending(intervals)
-    return len(intervals), len(ascending), len(descending)
+def get_all_asc_desc_count(
+    intervals: IntervalSummary, mask: np.ndarray
+) -> Tuple[int, int, int]:
+    semitones = intervals.intervals.semitones
+    counts = intervals.counts
+    return (
+        int(counts[mask].sum()),
+        int(counts[mask & (semitones > 0)].sum()),
+        int(counts[mask & (semitones < 0)].sum()),
+    )
 
 
-def get_interval_stats_features(intervals: List[Interval], prefix: str = ""):
-    numeric_intervals = np.array([interval.semitones for interval in intervals])
-    absolute_numeric_intervals = abs(numeric_intervals)
-    with np.errstate(invalid="ignore"):
-        intervals_skewness = (
-            skew(numeric_intervals, bias=False)
-            if [i for i in numeric_intervals if i != 0]
-            else None
-        )
-        intervals_kurtosis = (
-            kurtosis(numeric_intervals, bias=False)
-            if [i for i in numeric_intervals if i != 0]
-            else None
-        )
-        absolute_intervals_skewness = (
-            skew(absolute_numeric_intervals, bias=False)
-            if [i for i in absolute_numeric_intervals if i != 0]
-            else None
-        )
-        absolute_intervals_kurtosis = (
-            kurtosis(absolute_numeric_intervals, bias=False)
-            if [i for i in absolute_numeric_intervals if i != 0]
-            else None
-        )
+def get_interval_stats_features(intervals: IntervalSummary, prefix: str = ""):
+    values, counts, _ = intervals.semitones_histogram()
+    absolute_values, absolute_counts, _ = intervals.semitones_histogram(absolute=True)
+    not_all_unisons = np.any(values != 0)
+    intervals_skewness = weighted_skew(values, counts) if not_all_unisons else None
+    intervals_kurtosis = weighted_kurtosis(values, counts) if not_all_unisons else None
+    absolute_intervals_skewness = (
+        weighted_skew(absolute_values, absolute_counts) if not_all_unisons else None
+    )
+    absolute_intervals_kurtosis = (
+        weighted_kurtosis(absolute_values, absolute_counts)
+        if not_all_unisons
+        else None
+    )
 
     return {
         f"{prefix}{INTERVALLIC_SKEWNESS}": intervals_skewness,
@@ -612,20 +622,32 @@ def _motion_postfix(step, win):
     return key_postfix
 
 
-def _motion_features_single_window_step(
-    notes_duration: List[float], notes_midi: List[int], step: float, win: int
+def _run_lengths(mask: np.ndarray) -> np.ndarray:
+    """
+    Returns the lengths of the runs of consecutive True values of a boolean array.
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+
+def _motion_features_single_step(
+    notes_duration: np.ndarray, notes_midi: np.ndarray, step: float, wins: List[int]
 ) -> Dict[str, Union[float, np.ndarray]]:
     """
-    Calculates motion features for a single window step of an aria.
+    Calculates motion features for a step and several window sizes of an aria.
+
+    The midis are sampled every `step` once, and smoothed for every window size with
+    cumulative sums.
 
     Parameters:
-    notes_duration (List[float]): List of note durations in seconds.
-    notes_midi (List[int]): List of MIDI note numbers.
-    step (float): Step size in seconds.
-    win (int): Window size in compasses.
+    notes_duration (np.ndarray): Note durations in quarter lengths.
+    notes_midi (np.ndarray): MIDI note numbers.
+    step (float): Step size in quarter lengths.
+    wins (List[int]): Window sizes, in steps on each side of the smoothed sample.
 
     Returns:
-    Dict[str, Union[float, np.ndarray]]: Dictionary containing the following motion features:
+    Dict[str, Union[float, np.ndarray]]: Dictionary containing the following motion
+    features, for each `win` in `wins`:
         - SPEED_AVG_ABS_{step}_{win} Average absolute speed.
         - ACCELERATION_AVG_ABS_{step}_{win} Average absolute acceleration.
         - ASCENDENT_AVERAGE_{step}_{win} Average length of prolonged ascent chunks in the smoothed midis of the aria.
@@ -633,16 +655,20 @@ def _motion_features_single_window_step(
         - ASCENDENT_PROPORTION_{step}_{win} Proportion of prolonged ascent chunks over the total of the aria.
         - DESCENDENT_PROPORTION_{step}_{win} Proportion of prolonged descent chunks over the total of the aria.
     """
-    key_postfix = _motion_postfix(step, win)
-    default_dict = {
-        SPEED_AVG_ABS + key_postfix: 0,
-        ACCELERATION_AVG_ABS + key_postfix: 0,
-        ASCENDENT_AVERAGE + key_postfix: 0,
-        DESCENDENT_AVERAGE + key_postfix: 0,
-        ASCENDENT_PROPORTION + key_postfix: 0,
-        DESCENDENT_PROPORTION + key_postfix: 0,
-    }
-    
+    default_dict = {}
+    for win in wins:
+        key_postfix = _motion_postfix(step, win)
+        default_dict.update(
+            {
+                SPEED_AVG_ABS + key_postfix: 0,
+                ACCELERATION_AVG_ABS + key_postfix: 0,
+                ASCENDENT_AVERAGE + key_postfix: 0,
+                DESCENDENT_AVERAGE + key_postfix: 0,
+                ASCENDENT_PROPORTION + key_postfix: 0,
+                DESCENDENT_PROPORTION + key_postfix: 0,
+            }
+        )
+
     if len(notes_midi) == 0:
         return default_dict
     midis_raw = np.repeat(notes_midi, np.divide(notes_duration, step).astype(int), axis=0)
@@ -661,41 +687,46 @@ def _motion_features_single_window_step(
     else:
         acc_avg_abs = 0
 
-    # Rolling mean to smooth the midis by +-1 compasses -- not required for
-    # statistics based on means but important for detecting increasing sequences
-    # with a tolerance.
-    midis_smo_series = pd.Series(midis_raw)
-    midis_smo = [
-        np.mean(i.to_list()) for i in midis_smo_series.rolling(2 * win + 1, center=True)
-    ]
-
-    # Prolonged ascent/descent chunks in smoothed midis of the aria (allows for
-    # small violations in the form of decrements/increments that do not
-    # decrease/increase the rolling mean).
-    dife = np.diff(midis_smo)
-
-    asc = [(k, sum(1 for i in g)) for k, g in groupby(dife > 0)]
-    dsc = [(k, sum(1 for i in g)) for k, g in groupby(dife < 0)]
+    # Rolling mean over +-win samples (fewer at the ends) to smooth the midis -- not
+    # required for statistics based on means but important for detecting increasing
+    # sequences with a tolerance.
+    size = midis_raw.size
+    cumsum = np.concatenate(([0], np.cumsum(midis_raw)))
+    positions = np.arange(size)
 
-    asc = [i for b, i in asc if b]
-    dsc = [i for b, i in dsc if b]
-
-    # Average length of ascent/descent chunks of the aria
-    asc_avg = mean(asc) if asc else 0 #np.nan
-    dsc_avg = mean(dsc) if dsc else 0 #np.nan
-
-    # Proportion of ascent/descent chunks over the total of the aria
-    asc_prp = sum(asc) / (len(dife) - 1) if asc else 0 #np.nan
-    dsc_prp = sum(dsc) / (len(dife) - 1) if dsc else 0 #np.nan
-
-    return {
-        SPEED_AVG_ABS + key_postfix: spe_avg_abs,
-        ACCELERATION_AVG_ABS + key_postfix: acc_avg_abs,
-        ASCENDENT_AVERAGE + key_postfix: asc_avg,
-        DESCENDENT_AVERAGE + key_postfix: dsc_avg,
-        ASCENDENT_PROPORTION + key_postfix: asc_prp,
-        DESCENDENT_PROPORTION + key_postfix: dsc_prp,
-    }
+    features = {}
+    for win in wins:
+        key_postfix = _motion_postfix(step, win)
+        starts = np.maximum(positions - win, 0)
+        ends = np.minimum(positions + win + 1, size)
+        midis_smo = (cumsum[ends] - cumsum[starts]) / (ends - starts)
+
+        # Prolonged ascent/descent chunks in smoothed midis of the aria (allows for
+        # small violations in the form of decrements/increments that do not
+        # decrease/increase the rolling mean).
+        dife = np.diff(midis_smo)
+        asc = _run_lengths(dife > 0).tolist()
+        dsc = _run_lengths(dife < 0).tolist()
+
+        # Average length of ascent/descent chunks of the aria
+        asc_avg = mean(asc) if asc else 0  # np.nan
+        dsc_avg = mean(dsc) if dsc else 0  # np.nan
+
+        # Proportion of ascent/descent chunks over the total of the aria
+        asc_prp = sum(asc) / (len(dife) - 1) if asc else 0  # np.nan
+        dsc_prp = sum(dsc) / (len(dife) - 1) if dsc else 0  # np.nan
+
+        features.update(
+            {
+                SPEED_AVG_ABS + key_postfix: spe_avg_abs,
+                ACCELERATION_AVG_ABS + key_postfix: acc_avg_abs,
+                ASCENDENT_AVERAGE + key_postfix: asc_avg,
+                DESCENDENT_AVERAGE + key_postfix: dsc_avg,
+                ASCENDENT_PROPORTION + key_postfix: asc_prp,
+                DESCENDENT_PROPORTION + key_postfix: dsc_prp,
+            }
+        )
+    return features
 
 
 def get_motion_features(part_data) -> dict:
@@ -711,22 +742,30 @@ def get_motion_features(part_data) -> dict:
     Raises:
     This function does not raise any exceptions.
     """
-    notes_midi = []
-    notes_duration = []
-    for note in part_data["notes_and_rests"]:
-        if hasattr(note, "pitch"):
-            notes_midi.append(note.pitch.midi)
-            notes_duration.append(note.duration.quarterLength)
-
-    notes_midi = np.asarray(notes_midi)
-    notes_duration = np.asarray(notes_duration)
+    notes_and_rests = part_data["notes_and_rests"]
+    if isinstance(notes_and_rests, NoteArrays):
+        # only single notes have a `pitch` attribute
+        pitched = (notes_and_rests.kind == KIND_NOTE) & (
+            notes_and_rests.chord == CHORD_NONE
+        )
+        notes_midi = notes_and_rests.midi[pitched].astype(np.int64)
+        notes_duration = notes_and_rests.duration[pitched]
+    else:
+        notes_midi = []
+        notes_duration = []
+        for note in notes_and_rests:
+            # the type of cached objects is always known, while their attributes may
+            # not have been cached yet
+            if isinstance(note, Note):
+                notes_midi.append(note.pitch.midi)
+                notes_duration.append(note.duration.quarterLength)
+
+        notes_midi = np.asarray(notes_midi)
+        notes_duration = np.asarray(notes_duration)
 
     return_dict = {}
     for step in MOTION_STEPS:
-        for win in MOTION_WINS:
-            return_dict.update(
-                _motion_features_single_window_step(
-                    notes_duration, notes_midi, step, win
-                )
-            )
+        return_dict.update(
+            _motion_features_single_step(notes_duration, notes_midi, step, MOTION_WINS)
+        )
     return return_dict
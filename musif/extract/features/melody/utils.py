@@ -0,0 +1,241 @@
+"""
+Mergeable summaries of the intervals of the parts, used to compute the melody features of
+parts, sounds and of the whole score.
+
+The features only depend on how many times each interval appears and on the order in
+which the intervals appear for the first time, so the intervals of each part are reduced
+once to an :class:`IntervalSummary`, and the summaries of the parts of a sound (or of the
+score) are merged instead of concatenating and traversing their intervals again. The
+statistics below compute, from values and their counts, the same values as
+`statistics.mean`, `statistics.stdev`, `scipy.stats.mstats.trimmed_mean`,
+`scipy.stats.mstats.trimmed_std`, `scipy.stats.skew` and `scipy.stats.kurtosis` on the
+list of all the values.
+"""
+from fractions import Fraction
+from math import isqrt
+from sys import float_info
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from musif.musicxml.intervals import IntervalArray
+
+
+class IntervalSummary:
+    """
+    The distinct intervals of a sequence of intervals, in order of first appearance,
+    with the number of times (`counts`) and the position (`first`) where each of them
+    appears for the first time.
+    """
+
+    __slots__ = ("intervals", "counts", "first", "total")
+
+    def __init__(
+        self, intervals: IntervalArray, counts: np.ndarray, first: np.ndarray, total: int
+    ):
+        self.intervals = intervals
+        self.counts = counts
+        self.first = first
+        self.total = total
+
+    @classmethod
+    def from_intervals(cls, intervals: IntervalArray) -> "IntervalSummary":
+        distinct, inverse = intervals.distinct()
+        counts = np.bincount(inverse, minlength=len(distinct)).astype(np.int64)
+        first = np.full(len(distinct), len(intervals), dtype=np.int64)
+        np.minimum.at(first, inverse, np.arange(len(intervals)))
+        return cls(distinct, counts, first, len(intervals))
+
+    @classmethod
+    def merge(cls, summaries: List["IntervalSummary"]) -> "IntervalSummary":
+        """
+        Returns the summary of the concatenation of the sequences summarized by
+        `summaries`, in that order.
+        """
+        if len(summaries) == 1:
+            return summaries[0]
+        offsets = np.cumsum([0] + [summary.total for summary in summaries[:-1]])
+        distinct, inverse = IntervalArray.concatenate(
+            [summary.intervals for summary in summaries]
+        ).distinct()
+        counts = np.bincount(
+            inverse,
+            weights=np.concatenate([summary.counts for summary in summaries]),
+            minlength=len(distinct),
+        ).astype(np.int64)
+        first = np.full(len(distinct), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(
+            first,
+            inverse,
+            np.concatenate(
+                [summary.first + offset for summary, offset in zip(summaries, offsets)]
+            ),
+        )
+        return cls(distinct, counts, first, int(sum(s.total for s in summaries)))
+
+    def __len__(self) -> int:
+        return self.total
+
+    @property
+    def integral(self) -> bool:
+        """
+        Whether all the intervals are a whole number of semitones.
+        """
+        return self.intervals.semitones.dtype.kind != "f"
+
+    def semitones_histogram(
+        self, absolute: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the distinct numbers of semitones of the intervals (or their absolute
+        values) in ascending order, how many times and where each of them first appears.
+        """
+        semitones = self.intervals.semitones
+        if absolute:
+            semitones = np.abs(semitones)
+        values, inverse = np.unique(semitones, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        counts = np.bincount(
+            inverse, weights=self.counts, minlength=len(values)
+        ).astype(np.int64)
+        first = np.full(len(values), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first, inverse, self.first)
+        return values, counts, first
+
+
+Number = Union[int, float]
+
+
+def _exact_sum(values: np.ndarray, counts: np.ndarray) -> Fraction:
+    return sum(
+        (Fraction(value) * count for value, count in zip(values.tolist(), counts.tolist())),
+        Fraction(0),
+    )
+
+
+def _convert(value: Fraction, integral: bool) -> Number:
+    # as `statistics.mean`, integers are returned when the data and the result are
+    # integers
+    if integral and value.denominator == 1:
+        return int(value)
+    return float(value)
+
+
+def weighted_sum(values: np.ndarray, counts: np.ndarray) -> Number:
+    return _convert(_exact_sum(values, counts), values.dtype.kind != "f")
+
+
+def weighted_mean(values: np.ndarray, counts: np.ndarray) -> Number:
+    """
+    `statistics.mean` of the data containing each of `values` `counts` times.
+    """
+    total = _exact_sum(values, counts) / int(counts.sum())
+    return _convert(total, values.dtype.kind != "f")
+
+
+def _sum_of_squares(values: np.ndarray, counts: np.ndarray) -> Fraction:
+    mean = _exact_sum(values, counts) / int(counts.sum())
+    return sum(
+        (
+            (Fraction(value) - mean) ** 2 * count
+            for value, count in zip(values.tolist(), counts.tolist())
+        ),
+        Fraction(0),
+    )
+
+
+def _sqrt(value: Fraction) -> float:
+    # correctly rounded square root of a fraction, as computed by `statistics.stdev`
+    n, m = value.numerator, value.denominator
+    q = (n.bit_length() - m.bit_length() - 2 * float_info.mant_dig - 3) // 2
+    if q >= 0:
+        m <<= 2 * q
+        denominator = 1
+    else:
+        n <<= -2 * q
+        denominator = 1 << -q
+    root = isqrt(n // m)
+    root |= root * root * m != n
+    if q >= 0:
+        root <<= q
+    return root / denominator
+
+
+def weighted_stdev(values: np.ndarray, counts: np.ndarray) -> float:
+    """
+    `statistics.stdev` (sample standard deviation) of the data containing each of
+    `values` `counts` times.
+    """
+    return _sqrt(_sum_of_squares(values, counts) / (int(counts.sum()) - 1))
+
+
+def _trimmed_counts(counts: np.ndarray, cutoff: float) -> np.ndarray:
+    # the counts left after removing the lowest and highest `cutoff` proportions of
+    # the data, given the counts of the values in ascending order
+    n = int(counts.sum())
+    low = int(cutoff * n)
+    high = n - int(n * cutoff)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    return np.clip(np.minimum(ends, high) - np.maximum(starts, low), 0, None)
+
+
+def weighted_trimmed_mean(
+    values: np.ndarray, counts: np.ndarray, cutoff: float
+) -> float:
+    """
+    `scipy.stats.mstats.trimmed_mean` with limits `(cutoff, cutoff)` of the data
+    containing each of `values` (in ascending order) `counts` times.
+    """
+    kept = _trimmed_counts(counts, cutoff)
+    return float(_exact_sum(values, kept) / int(kept.sum()))
+
+
+def weighted_trimmed_std(values: np.ndarray, counts: np.ndarray, cutoff: float) -> float:
+    """
+    `scipy.stats.mstats.trimmed_std` with limits `(cutoff, cutoff)` of the data
+    containing each of `values` (in ascending order) `counts` times.
+    """
+    kept = _trimmed_counts(counts, cutoff)
+    return _sqrt(_sum_of_squares(values, kept) / int(kept.sum()))
+
+
+def _central_moments(
+    values: np.ndarray, counts: np.ndarray, orders: Tuple[int, ...]
+) -> Tuple[float, List[float]]:
+    values = values.astype(np.float64)
+    n = counts.sum()
+    mean = np.dot(values, counts) / n
+    deviations = values - mean
+    return mean, [np.dot(deviations**order, counts) / n for order in orders]
+
+
+def weighted_skew(values: np.ndarray, counts: np.ndarray) -> float:
+    """
+    `scipy.stats.skew` with `bias=False` of the data containing each of `values`
+    `counts` times.
+    """
+    n = int(counts.sum())
+    mean, (m2, m3) = _central_moments(values, counts, (2, 3))
+    if m2 <= (np.finfo(np.float64).eps * mean) ** 2:
+        return np.nan
+    if n > 2:
+        return float(((n - 1.0) * n) ** 0.5 / (n - 2.0) * m3 / m2**1.5)
+    return float(m3 / m2**1.5)
+
+
+def weighted_kurtosis(values: np.ndarray, counts: np.ndarray) -> float:
+    """
+    `scipy.stats.kurtosis` (Fisher's definition) with `bias=False` of the data
+    containing each of `values` `counts` times.
+    """
+    n = int(counts.sum())
+    mean, (m2, m4) = _central_moments(values, counts, (2, 4))
+    if m2 <= (np.finfo(np.float64).eps * mean) ** 2:
+        return np.nan
+    if n > 3:
+        corrected = (
+            1.0 / (n - 2) / (n - 3) * ((n**2 - 1.0) * m4 / m2**2.0 - 3 * (n - 1) ** 2.0)
+        )
+        return float(corrected + 3.0 - 3)
+    return float(m4 / m2**2.0 - 3)
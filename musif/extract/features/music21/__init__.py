@@ -1 +1,4 @@
 # musif_dependencies = ["rhythm"]  # here to avoid some issue with the cache (?!)
+from musif.extract.incremental import MODULE_CONFIG_FIELDS
+
+musif_config_fields = MODULE_CONFIG_FIELDS + ["music21_features"]
@@ -39,4 +39,14 @@ ERRORED_FEATURES_IDS = {
 'P20',
 'P21',
 'P22'
-}
\ No newline at end of file
+}
+
+FEATURE_FORMS = {
+    "CS": "chordify",
+    "QL": "flat.notes.quarterLengthHistogram",
+    "K": "flat.analyzedKey",
+    "P": "flat.analyzedKey",
+}
+"""Most expensive stream form used by the native extractors of music21, by prefix of
+their id. When the extractors are run in parallel, those using the same form are run
+in the same process, so that each form is computed once."""
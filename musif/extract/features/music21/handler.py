@@ -1,39 +1,109 @@
-from typing import List
+import re
+from typing import Dict, List
 
 import music21 as m21
+from joblib import Parallel, delayed
 from music21.features import native
-from music21.features.base import extractorsById
+from music21.features.base import DataInstance
 
 from musif import cache
+from musif.cache import iscache
 from musif.config import ExtractConfiguration
-from musif.extract.constants import DATA_SCORE
-from musif.logs import pwarn
+from musif.extract.constants import DATA_SCORE, DATA_SCORE_KEY
+from musif.logs import lwarn
 
-from .constants import ERRORED_FEATURES_IDS
+from .constants import ERRORED_FEATURES_IDS, FEATURE_FORMS
+from .utils import NativeFeaturesStore
 
 
-def allFeaturesAsList(cfg, streamInput):
+def get_extractors(cfg: ExtractConfiguration) -> list:
     """
-    only a little change around m21.features.base.allFeaturesAsList: no Parallel
-    processing
+    Returns the native extractors of music21 whose ids are in `cfg.music21_features`,
+    in the order of `music21.features.native.featureExtractors`. All of them are
+    returned if `cfg.music21_features` is empty.
+
+    Raises
+    ------
+    ValueError
+        If one of the ids does not correspond to any native extractor.
     """
+    extractors = list(native.featureExtractors)
+    if not cfg.music21_features:
+        return extractors
+    unknown = set(cfg.music21_features) - {feature.id for feature in extractors}
+    if len(unknown) > 0:
+        raise ValueError(
+            f"Unknown music21 native feature extractors: {', '.join(sorted(unknown))}"
+        )
+    return [feature for feature in extractors if feature.id in cfg.music21_features]
 
-    ds = m21.features.base.DataSet(classLabel="")
-    ds.runParallel = False  # this is the only difference with the m21 original code
-    all_features = list(native.featureExtractors)
-    if cfg.cache_dir:
-        pwarn('\nCache is activated! Some music21 features will NOT be computed.')
-        final_features = [feature for feature in all_features if feature.id not in
-            ERRORED_FEATURES_IDS]
-    else:
-        final_features = all_features
-    ds.addFeatureExtractors(final_features)
-    ds.addData(streamInput)
-    ds.process()
-    allData = ds.getFeaturesAsList(
-        includeClassLabel=False, includeId=False, concatenateLists=False
+
+def _run_extractors(streamInput, extractors: list) -> Dict[str, list]:
+    # all the extractors share the forms (flat notes, chordified stream, ...) that
+    # the data instance computes and caches
+    data = DataInstance(streamInput)
+    vectors = {}
+    for extractor_class in extractors:
+        extractor = extractor_class()
+        extractor.setData(data)
+        try:
+            feature = extractor.extract()
+        except Exception as e:
+            lwarn(f"music21 feature extractor {extractor_class.__name__} failed: {e}")
+            feature = extractor.getBlankFeature()
+        vectors[extractor_class.id] = feature.vector
+    return vectors
+
+
+def allFeaturesAsList(cfg, streamInput, extractors: list) -> Dict[str, list]:
+    """
+    Computes the native `extractors` of music21 on `streamInput` and returns their
+    vectors by extractor id, like `m21.features.base.allFeaturesAsList`.
+
+    The extractors in `ERRORED_FEATURES_IDS` do not work on cached objects, so, if
+    `streamInput` is cached and one of them is requested, they are all computed on the
+    music21 object, which is resurrected if needed.
+
+    If `cfg.music21_parallel` is not 1, the extractors are distributed among that
+    number of processes, keeping together those that use the same stream form (see
+    `FEATURE_FORMS`); this is only worth for very large scores.
+    """
+    if iscache(streamInput) and (
+        cfg.music21_parallel != 1
+        or any(feature.id in ERRORED_FEATURES_IDS for feature in extractors)
+    ):
+        streamInput = streamInput.get_reference()
+    if cfg.music21_parallel == 1:
+        return _run_extractors(streamInput, extractors)
+
+    groups = {}
+    for feature in extractors:
+        prefix = re.match(r"[A-Z]*", feature.id).group()
+        groups.setdefault(FEATURE_FORMS.get(prefix, feature.id), []).append(feature)
+    results = Parallel(n_jobs=cfg.music21_parallel)(
+        delayed(_run_extractors)(streamInput, group) for group in groups.values()
     )
-    return allData, [c.__name__ for c in final_features]
+    vectors = {}
+    for result in results:
+        vectors.update(result)
+    return vectors
+
+
+def _get_vectors(score_data: dict, cfg: ExtractConfiguration) -> Dict[str, List]:
+    extractors = get_extractors(cfg)
+    score_key = score_data.get(DATA_SCORE_KEY)
+    if cfg.music21_cache_dir is not None and score_key is not None:
+        store = NativeFeaturesStore(cfg.music21_cache_dir)
+        vectors = store.get(score_key, cfg)
+    else:
+        store = None
+        vectors = {}
+    missing = [feature for feature in extractors if feature.id not in vectors]
+    if len(missing) > 0:
+        vectors.update(allFeaturesAsList(cfg, score_data[DATA_SCORE], missing))
+        if store is not None:
+            store.put(score_key, cfg, vectors)
+    return {feature.__name__: vectors[feature.id] for feature in extractors}
 
 
 def update_score_objects(
@@ -43,16 +113,15 @@ def update_score_objects(
     parts_features: List[dict],
     score_features: dict,
 ):
-    score = score_data[DATA_SCORE]
     # Override the isinstance and hasattr definitions for the caching system
     m21.features.base.isinstance = cache.isinstance
     m21.features.base.hasattr = cache.hasattr
-    features, columns = allFeaturesAsList(cfg, score)
+    vectors = _get_vectors(score_data, cfg)
     score_features.update(
         {
-            'm21_' + columns[outer] + f"_{i}": f
-            for outer in range(len(features))
-            for i, f in enumerate(features[outer])
+            'm21_' + name + f"_{i}": f
+            for name, vector in vectors.items()
+            for i, f in enumerate(vector)
         }
     )
 
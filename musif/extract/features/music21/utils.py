@@ -0,0 +1,49 @@
+from pathlib import PurePath
+from typing import Dict, List, Optional, Union
+
+from musif.cache.store import CacheStore
+from musif.extract.incremental import settings_digest
+
+MUSIC21_CONFIG_FIELDS = [
+    "split_keywords",
+    "expand_repeats",
+    "remove_unpitched_objects",
+    "precache_hooks",
+]
+"""Fields of `ExtractConfiguration` that change the score given to the music21
+feature extractors"""
+
+
+class NativeFeaturesStore:
+    """
+    On-disk store of the vectors computed by the native feature extractors of music21.
+
+    Each score (or window) has one file, named after its key (the content hash of the
+    score and, for windows, the range of measures), which contains a dictionary from
+    the id of each extractor (e.g. `'R15'`) to its vector. Thus, a run only computes
+    the extractors that are not stored yet. The header of the file contains the versions
+    of musif and music21 and a hash of the `MUSIC21_CONFIG_FIELDS` of the
+    configuration; if they change, all the vectors of the score are computed again.
+    """
+
+    def __init__(self, directory: Union[str, PurePath]):
+        self.store = CacheStore(directory)
+
+    def header(self, cfg) -> dict:
+        """
+        Returns the header of the files written with the configuration `cfg`.
+        """
+        return {"settings": settings_digest(cfg, MUSIC21_CONFIG_FIELDS)}
+
+    def get(self, score_key: str, cfg) -> Dict[str, List]:
+        """
+        Returns the vectors stored for `score_key`, by extractor id.
+        """
+        vectors: Optional[dict] = self.store.get(score_key, self.header(cfg))
+        return {} if vectors is None else vectors
+
+    def put(self, score_key: str, cfg, vectors: Dict[str, List]):
+        """
+        Stores the vectors of `score_key`, by extractor id.
+        """
+        self.store.put(score_key, vectors, self.header(cfg))
@@ -1,89 +1,174 @@
-from collections import Counter, defaultdict
+from itertools import accumulate
 from statistics import mean
 from typing import List
 
 import numpy as np
 
 from musif.config import ExtractConfiguration
-from musif.extract.constants import DATA_PART_ABBREVIATION, GLOBAL_TIME_SIGNATURE
-from musif.extract.features.core.constants import DATA_NOTES, DATA_SOUNDING_MEASURES
+from musif.extract.constants import DATA_PART_ABBREVIATION
+from musif.extract.features.core.constants import (
+    DATA_EVENTS,
+    DATA_NOTES,
+    DATA_SOUNDING_MEASURES,
+)
 from musif.extract.features.prefix import get_part_feature, get_score_feature
-from musif.extract.utils import _get_beat_position
+from musif.musicxml.arrays import NoteArrays, PartArrays
+from musif.musicxml.events import PartEvents
 from musif.musicxml.tempo import get_number_of_beats
 
 from .constants import *
 
 
+class _RhythmElements:
+    """
+    The notes and time signatures of a part, taken from its
+    :class:`musif.musicxml.events.PartEvents`, as arrays: the positions (in
+    `events.elements`) of the notes and of the time signatures, the duration and dots
+    of the notes, and for the time signatures the number of beats and the beat
+    strength, which is used as the beat unit of the following notes.
+
+    Beats of the elements (`beat_str`) are only computed when needed.
+    """
+
+    def __init__(self, events: PartEvents):
+        self.events = events
+        part = events.part
+        self.notes = events.positions("Note")
+        self.time_signatures = events.positions("TimeSignature")
+        notes = [events.elements[i] for i in self.notes.tolist()]
+        time_signatures = [events.elements[i] for i in self.time_signatures.tolist()]
+        if isinstance(part, PartArrays):
+            # same as below, using the arrays of the fast parser
+            self.measure_numbers = [
+                int(part.measure_numbers[measure]) for measure in events.measures
+            ]
+            self.durations = [note.duration for note in notes]
+            dots = [note.dots for note in notes]
+            self.beats = [
+                get_number_of_beats(element.payload.ratioString)
+                for element in time_signatures
+            ]
+            self.beat_units = [
+                part.beat_strength(self._measure(i), element.offset)
+                for i, element in zip(self.time_signatures.tolist(), time_signatures)
+            ]
+            self._beat_str = lambda i: part.beat_str(
+                self._measure(i), events.elements[i].offset
+            )
+            self._duration = lambda i: events.elements[i].duration
+        else:
+            self.measure_numbers = [measure.measureNumber for measure in events.measures]
+            self.durations = [note.duration.quarterLength for note in notes]
+            dots = [note.duration.dots for note in notes]
+            self.beats = [
+                get_number_of_beats(element.ratioString) for element in time_signatures
+            ]
+            self.beat_units = [element.beatStrength for element in time_signatures]
+            self._beat_str = lambda i: events.elements[i].beatStr
+            self._duration = lambda i: events.elements[i].duration.quarterLength
+        self.dots = np.array(dots, dtype=np.int64)
+        self.measures = events.element_measures
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def _measure(self, i: int):
+        return self.events.measures[self.events.element_measures[i]]
+
+    def beat(self, i: int) -> str:
+        """
+        The number of the beat of the `i`-th element, as the first word of `beatStr`.
+        """
+        return self._beat_str(i).split()[0]
+
+    def duration(self, i: int):
+        return self._duration(i)
+
+
 def update_part_objects(
     score_data: dict, part_data: dict, cfg: ExtractConfiguration, part_features: dict
 ):
 
-    notes_duration = [note.duration.quarterLength for note in part_data["notes"]]
-    beats = 1
-    beat_unit = 1
-    total_number_notes = 0
-    number_notes = 0
-    notes_dict = defaultdict(int)
-    rhythm_intensity_period = []
-    rhythm_dot = 0
-    rhythm_double_dot = 0
-    total_beats = 0
-    total_sounding_beats = 0
-    beat_count = (
-        score_data[GLOBAL_TIME_SIGNATURE].beatCount
-        if hasattr(score_data.get(GLOBAL_TIME_SIGNATURE), 'beatCount')
-        else 1
+    if isinstance(part_data["notes"], NoteArrays):
+        notes_duration = part_data["notes"].duration.tolist()
+    else:
+        notes_duration = [note.duration.quarterLength for note in part_data["notes"]]
+    elements = _RhythmElements(part_data[DATA_EVENTS])
+    time_signatures = elements.time_signatures
+
+    # the beats of each measure are those of the last time signature up to it
+    last_time_signature = (
+        np.searchsorted(
+            elements.measures[time_signatures],
+            np.arange(len(elements.measure_numbers)),
+            side="right",
+        )
+        - 1
     )
-    # motion_features = get_motion_features(part_data)
-    # part_features.update(motion_features)
-
-    for measure in part_data["measures"]:
-        for i, element in enumerate(measure.elements):
-            if element.classes[0] == "Note":
-                number_notes += 1
-                notes_dict[element.duration.quarterLength] += 1
-                total_number_notes += 1
-                pos = _get_beat_position(beat_count, beats, element.beat)
-                if (
-                    element.duration.dots > 0
-                    and element.duration.quarterLength < beat_unit
-                ):
-                    if i + 1 < len(measure.elements):  # check next item
-                        if (
-                            measure.elements[i + 1].beatStr.split()[0]
-                            == element.beatStr.split()[0]
-                        ):
-                            if (
-                                measure.elements[i + 1].duration.quarterLength
-                                < element.duration.quarterLength
-                            ):
-
-                                rhythm_dot += 1
-
-                    if element.duration.dots == 2:
-                        rhythm_double_dot += 1
-            elif element.classes[0] == "TimeSignature":
-                rhythm_intensity_period.append(
-                    sum([float(i) * j for i, j in Counter(notes_dict).items()])
-                    / total_sounding_beats
-                    if total_sounding_beats != 0
-                    else 0
-                )
-                number_notes = 0
-                beat_count = element.beatCount
-                beats = get_number_of_beats(element.ratioString)
-                beat_unit = element.beatStrength
-        total_beats += beats
-
-        if measure.measureNumber in part_data[DATA_SOUNDING_MEASURES]:
-            total_sounding_beats += beats
-
+    measure_beats = [
+        elements.beats[i] if i >= 0 else 1 for i in last_time_signature.tolist()
+    ]
+    sounding_measures = set(part_data[DATA_SOUNDING_MEASURES])
+    sounding_beats = [
+        beats if number in sounding_measures else 0
+        for number, beats in zip(elements.measure_numbers, measure_beats)
+    ]
+    # beats of the sounding measures before each measure
+    sounding_beats_before = [0] + list(accumulate(sounding_beats))
+    total_beats = sum(measure_beats)
+    total_sounding_beats = sounding_beats_before[-1]
+
+    # the notes are counted by duration, in order of first appearance
+    notes = elements.notes
+    note_durations = np.array(
+        [float(duration) for duration in elements.durations], dtype=np.float64
+    )
+    _, first, codes = np.unique(note_durations, return_index=True, return_inverse=True)
+    codes = codes.reshape(-1)
+    order = np.argsort(first)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    codes = rank[codes]
+    keys = [elements.durations[i] for i in np.sort(first).tolist()]
+
+    # the rhythm intensity is accumulated at every time signature change
+    rhythm_intensity_period = []
+    counts = np.zeros(len(keys), dtype=np.int64)
+    counted = 0
+    for position in time_signatures.tolist():
+        notes_before = int(np.searchsorted(notes, position))
+        counts += np.bincount(codes[counted:notes_before], minlength=len(keys))
+        counted = notes_before
+        beats_before = sounding_beats_before[elements.measures[position]]
+        rhythm_intensity_period.append(
+            sum([float(i) * j for i, j in zip(keys, counts.tolist()) if j > 0])
+            / beats_before
+            if beats_before != 0
+            else 0
+        )
+    counts = np.bincount(codes, minlength=len(keys))
     rhythm_intensity_period.append(
-        sum([j / i if i != 0.0 else 0 for i, j in Counter(notes_dict).items()])
+        sum([j / i if i != 0.0 else 0 for i, j in zip(keys, counts.tolist())])
         / total_sounding_beats
         if total_sounding_beats
         else 0
     )
+
+    # dotted notes shorter than the beat unit of their time signature
+    beat_units = np.array([1] + elements.beat_units, dtype=np.float64)
+    note_beat_units = beat_units[np.searchsorted(time_signatures, notes)]
+    dotted = np.flatnonzero((elements.dots > 0) & (note_durations < note_beat_units))
+    rhythm_double_dot = int(np.count_nonzero(elements.dots[dotted] == 2))
+    rhythm_dot = 0
+    for note in dotted.tolist():
+        i = int(notes[note])
+        # a dotted rhythm is followed by a shorter element in the same beat
+        if i + 1 < len(elements) and elements.measures[i + 1] == elements.measures[i]:
+            if elements.duration(i + 1) < elements.durations[note] and elements.beat(
+                i + 1
+            ) == elements.beat(i):
+                rhythm_dot += 1
+
     notes_duration = [
         i for i in notes_duration if i != 0.0
     ]  # remove notes with duration equal to 0
@@ -123,9 +208,12 @@ def update_score_objects(
         features[get_part_feature(part, AVERAGE_DURATION)] = part_features[
             AVERAGE_DURATION
         ]
-        total_notes_duration.append(
-            [i.duration.quarterLength for i in part_data[DATA_NOTES] if i != 0]
-        )
+        if isinstance(part_data[DATA_NOTES], NoteArrays):
+            total_notes_duration.append(part_data[DATA_NOTES].duration.tolist())
+        else:
+            total_notes_duration.append(
+                [i.duration.quarterLength for i in part_data[DATA_NOTES] if i != 0]
+            )
 
         features[get_part_feature(part, RHYTHMINT)] = part_features[RHYTHMINT]
         # rhythm_intensities.append([1/i.duration.quarterLength for i in part_data[DATA_NOTES] if i !=0])
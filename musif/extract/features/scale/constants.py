@@ -10,3 +10,5 @@ ACCIDENTAL_ABBREVIATION = {
 DEGREE_PREFIX = "Degree"
 DEGREE_COUNT = "Degree{key}_Count"
 DEGREE_PER = "Degree{key}_Per"
+
+DATA_DEGREE_HISTOGRAM = "degree_histogram"
@@ -4,6 +4,7 @@ from statistics import mean
 from typing import Dict, List, Union
 
 
+import numpy as np
 from music21.note import Note
 
 
@@ -11,11 +12,15 @@ from musif.config import ExtractConfiguration
 
 from musif.extract.common import _filter_parts_data
 
+from musif.extract.constants import DATA_WINDOW
+
 from musif.extract.features.core.handler import DATA_KEY, DATA_NOTES
 
 from musif.extract.features.prefix import get_part_feature, get_score_feature
 
-from musif.musicxml.common import _get_degrees_and_accidentals
+from musif.musicxml.common import _get_degree_histogram
+
+from musif.musicxml.key import DEGREE_ACCIDENTALS
 
 from .constants import *
 
@@ -26,11 +31,13 @@ def update_part_objects(
     score_data: dict, part_data: dict, cfg: ExtractConfiguration, part_features: dict
 ):
 
-    notes = part_data[DATA_NOTES]
-
     key = score_data[DATA_KEY]
 
-    notes_per_degree = get_notes_per_degree(str(key), notes)
+    histogram = _get_part_degree_histogram(str(key), part_data)
+    # the histograms of the parts are summed in `update_score_objects`
+    part_data[DATA_DEGREE_HISTOGRAM] = histogram
+
+    notes_per_degree = _count_notes_per_degree(histogram)
 
     all_degrees = sum(value for value in notes_per_degree.values())
 
@@ -57,21 +64,14 @@ def update_score_objects(
 
     key = score_data[DATA_KEY]
 
-    score_notes_per_degree = {}
-
-    for part_data in parts_data:
-
-        notes = part_data[DATA_NOTES]
-
-        part_notes_per_degree = get_notes_per_degree(str(key), notes)
-
-        for degree, notes in part_notes_per_degree.items():
-
-            if degree not in score_notes_per_degree:
-
-                score_notes_per_degree[degree] = 0
-
-            score_notes_per_degree[degree] += notes
+    score_notes_per_degree = _count_notes_per_degree(
+        sum(
+            part_data[DATA_DEGREE_HISTOGRAM]
+            if DATA_DEGREE_HISTOGRAM in part_data
+            else _get_part_degree_histogram(str(key), part_data)
+            for part_data in parts_data
+        )
+    )
 
     all_score_degrees = sum(value for value in score_notes_per_degree.values())
 
@@ -112,23 +112,27 @@ def update_score_objects(
 
 def get_notes_per_degree(key: str, notes: List[Note]) -> Dict[str, int]:
 
-    notes_per_degree = {
-        to_full_degree(degree, accidental): 0
-        for accidental in ["", "sharp", "flat"]
-        for degree in [1, 2, 3, 4, 5, 6, 7]
-    }
+    return _count_notes_per_degree(_get_degree_histogram(key, notes))
+
 
-    all_degrees = 0
+def _get_part_degree_histogram(key: str, part_data: dict) -> np.ndarray:
 
-    for degree, accidental in _get_degrees_and_accidentals(key, notes):
+    window = part_data.get(DATA_WINDOW)
 
-        if to_full_degree(degree, accidental) not in notes_per_degree:
-            continue
+    if window is None:
+        return _get_degree_histogram(key, part_data[DATA_NOTES])
 
-        notes_per_degree[to_full_degree(degree, accidental)] += 1
+    # the degrees of the notes of the part are looked up once for every window
+    return window.degrees(key)
 
-        all_degrees += 1
-    return notes_per_degree
+
+def _count_notes_per_degree(histogram: np.ndarray) -> Dict[str, int]:
+
+    return {
+        to_full_degree(degree, accidental): int(histogram[row, degree - 1])
+        for row, accidental in enumerate(DEGREE_ACCIDENTALS)
+        for degree in [1, 2, 3, 4, 5, 6, 7]
+    }
 
 
 def to_full_degree(degree: Union[int, str], accidental: str) -> str:
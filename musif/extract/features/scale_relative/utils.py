@@ -4,17 +4,18 @@ from math import ceil, floor
 from typing import List, Tuple, Union
 from musif.logs import perr
 
+import numpy as np
 import pandas as pd
 import roman
-from music21 import pitch, scale
+from music21 import scale
 from music21.note import Note
 from music21.stream import Measure
 from pandas.core.frame import DataFrame
 
 import musif.extract.constants as C
-from musif.common.sort import sort_dict
 from musif.extract.features.core.handler import DATA_KEY
 from musif.extract.features.harmony.utils import get_function_first, get_function_second
+from musif.musicxml.key import get_degree_and_accidental
 
 accidental_abbreviation = {
     "": "",
@@ -44,32 +45,91 @@ def IsAnacrusis(harmonic_analysis):
     return harmonic_analysis.mn.dropna().tolist()[0] == 0
 
 
-def get_tonality_per_beat(
-    harmonic_analysis: DataFrame, tonality: str, start_beat: float, end_beat: float
-):
-    tonality_map = {}
-    for index, degree in enumerate(harmonic_analysis.localkey):
-        beat = harmonic_analysis.beats[index]
-        tonality_map[beat] = get_localTonalty(tonality, degree.strip())
-
-    _fill_gaps_in_tonality_map(tonality_map, start_beat, end_beat)
-
-    tonality_map = sort_dict(tonality_map, sorted(tonality_map.keys()))
-    return tonality_map
-
+class LocalKeyMap:
+    """
+    The local key in effect at each beat of a score, from the `localkey` column of its
+    harmonic analysis.
+
+    The annotated beats are kept sorted in `beats`, with the index in `keys` of their
+    local key in `codes`, and the local key of each distinct annotation is computed
+    once. As in `get_tonality_per_beat`, the beats from `start_beat` to `end_beat`
+    without annotation take the local key of the previous beat, beat 0 takes the
+    local key of the first annotation and the beats after the last one take the local
+    key of the last beat.
+    """
+
+    def __init__(
+        self,
+        harmonic_analysis: DataFrame,
+        tonality: str,
+        start_beat: float,
+        end_beat: float,
+    ):
+        annotations, annotation_codes = np.unique(
+            [degree.strip() for degree in harmonic_analysis.localkey],
+            return_inverse=True,
+        )
+        local_keys = [get_localTonalty(tonality, degree) for degree in annotations]
+        self.keys = list(dict.fromkeys(local_keys))
+        key_codes = np.array([self.keys.index(key) for key in local_keys], dtype=np.int64)
+        row_codes = key_codes[annotation_codes.reshape(-1)]
+
+        # the last annotation of a beat is the one in effect
+        row_beats = harmonic_analysis.beats.to_numpy(dtype=np.int64)
+        order = np.argsort(row_beats, kind="stable")
+        sorted_beats = row_beats[order]
+        last = np.append(sorted_beats[1:] != sorted_beats[:-1], True)
+        beats = sorted_beats[last]
+        codes = row_codes[order][last]
+        self.first_code = int(codes[np.searchsorted(beats, row_beats[0])])
+        if 0 not in beats:
+            position = np.searchsorted(beats, 0)
+            beats = np.insert(beats, position, 0)
+            codes = np.insert(codes, position, self.first_code)
+        self.beats = beats
+        self.codes = codes
+        self.start_beat = floor(start_beat)
+        self.end_beat = ceil(end_beat)
+
+        # local key of the beats after the last beat of the map
+        if self.start_beat <= self.end_beat and self.end_beat > self.beats[-1]:
+            self.last_code = int(self._gap_codes(np.array([self.end_beat]))[0])
+        else:
+            self.last_code = int(self.codes[-1])
+
+    def _gap_codes(self, beats: np.ndarray) -> np.ndarray:
+        # local keys of beats without annotation from `start_beat` to `end_beat`: the
+        # one of the previous annotation, if it is not before `start_beat - 1`
+        previous = np.searchsorted(self.beats, beats, side="left") - 1
+        found = previous >= 0
+        found[found] = self.beats[previous[found]] >= self.start_beat - 1
+        return np.where(found, self.codes[np.maximum(previous, 0)], self.first_code)
+
+    def codes_at(self, beats: np.ndarray) -> np.ndarray:
+        """
+        Returns the index in `keys` of the local key at each of `beats` (integers).
+        """
+        beats = np.asarray(beats, dtype=np.int64)
+        positions = np.searchsorted(self.beats, beats)
+        exact = positions < len(self.beats)
+        exact[exact] = self.beats[positions[exact]] == beats[exact]
+        in_range = (beats >= self.start_beat) & (beats <= self.end_beat)
+        codes = np.full(len(beats), self.last_code, dtype=np.int64)
+        codes[in_range] = self._gap_codes(beats[in_range])
+        codes[exact] = self.codes[positions[exact]]
+        return codes
 
-def _fill_gaps_in_tonality_map(tonality_map, start_beat, end_beat):
-    if 0 not in tonality_map:
-        tonality_map[0] = tonality_map[list(tonality_map.keys())[0]]
 
-    for beat in range(floor(start_beat), ceil(end_beat) + 1):
-        if beat not in tonality_map:
-            if beat-1 in tonality_map:
-            # If tonality is not found 
-                tonality_map[beat] = tonality_map[beat - 1]
-            # In case there is no tonality for first beats, we assume the first one we can find.
-            else:
-                tonality_map[beat] = tonality_map[list(tonality_map.keys())[0]]
+def get_tonality_per_beat(
+    harmonic_analysis: DataFrame, tonality: str, start_beat: float, end_beat: float
+) -> dict:
+    local_keys = LocalKeyMap(harmonic_analysis, tonality, start_beat, end_beat)
+    beats = sorted(
+        set(local_keys.beats.tolist())
+        | set(range(local_keys.start_beat, local_keys.end_beat + 1))
+    )
+    codes = local_keys.codes_at(np.array(beats, dtype=np.int64))
+    return {beat: local_keys.keys[code] for beat, code in zip(beats, codes.tolist())}
 
 
 def get_emphasised_scale_degrees_relative(
@@ -85,11 +145,9 @@ def get_emphasised_scale_degrees_relative(
     ]
     min_beat = min(m.offset for m in measures)
     max_beat = max(m.offset + m.quarterLength for m in measures)
-    tonality_map = get_tonality_per_beat(
-        harmonic_analysis, tonality, min_beat, max_beat
-    )
+    local_keys = LocalKeyMap(harmonic_analysis, tonality, min_beat, max_beat)
     try:
-        emph_degrees = get_emphasized_degrees(notes_list, tonality_map, harmonic_analysis)
+        emph_degrees = get_emphasized_degrees(notes_list, local_keys, harmonic_analysis)
     except Exception:
         file_name = score_data['file']
         perr(f'Check the relative degrees on {file_name}')
@@ -98,39 +156,37 @@ def get_emphasised_scale_degrees_relative(
 
 
 def get_emphasized_degrees(
-    notes_list: List[Note], tonality_map: dict, harmonic_analysis
+    notes_list: List[Note], local_keys: LocalKeyMap, harmonic_analysis
 ) -> dict:
-    local_tonality = ""
     notes_per_degree_relative = {
         to_full_degree(degree, accidental): 0
         for accidental in ["", "sharp", "flat"]
         for degree in [1, 2, 3, 4, 5, 6, 7]
     }
-    for j, note in enumerate(notes_list):
+    # beat of the first annotation of each measure
+    first_annotations = harmonic_analysis.drop_duplicates(C.PLAYTHROUGH)
+    measure_beats = dict(
+        zip(first_annotations[C.PLAYTHROUGH].tolist(), first_annotations.beats.tolist())
+    )
+    note_beats, note_names = [], []
+    for note in notes_list:
         note = note[0] if note.isChord else note
-        if note.measureNumber in list(harmonic_analysis["playthrough"]) and str(note.beat) != 'nan':
-            note_offset = round(
-                list(harmonic_analysis[harmonic_analysis["playthrough"] == note.measureNumber].beats)[0]
-                - 1
-                + note.beat
-            )
-        else:
-            note_offset = round(note.offset)
-
-        if note_offset is None:
-            note_offset = notes_list[j - 1].offset
-
-        if note_offset in tonality_map:
-            local_tonality = tonality_map[round(note_offset)]
+        measure_beat = measure_beats.get(note.measureNumber)
+        if measure_beat is not None and str(note.beat) != 'nan':
+            note_beats.append(round(measure_beat - 1 + note.beat))
         else:
-            local_tonality = tonality_map[list(tonality_map.keys())[-1]]
+            note_beats.append(round(note.offset))
+        note_names.append(note.name)
 
-        degree_value = get_note_degree(local_tonality, note.name)
-
-        if str(degree_value) not in notes_per_degree_relative:
-            notes_per_degree_relative[str(degree_value)] = 1
-        else:
-            notes_per_degree_relative[str(degree_value)] += 1
+    codes = local_keys.codes_at(np.array(note_beats, dtype=np.int64))
+    degrees = Counter(
+        get_note_degree(local_keys.keys[code], name)
+        for code, name in zip(codes.tolist(), note_names)
+    )
+    for degree_value, count in degrees.items():
+        notes_per_degree_relative[degree_value] = (
+            notes_per_degree_relative.get(degree_value, 0) + count
+        )
 
     return notes_per_degree_relative
 
@@ -167,25 +223,9 @@ def extract_harmony(score_data):
 
 
 def get_note_degree(key, note):
-    if key[0].isupper():
-        scl = scale.MajorScale(key.split(" ")[0])
-    else:
-        scl = scale.MinorScale(key.split(" ")[0])
-
-    degree = scl.getScaleDegreeAndAccidentalFromPitch(pitch.Pitch(note))
-    accidental = degree[1].fullName if degree[1] != None else ""
-
-    acc = ""
-    if accidental == "sharp":
-        acc = "#"
-    elif accidental == "flat":
-        acc = "b"
-    elif accidental == "double-sharp":
-        acc = "x"
-    elif accidental == "double-flat":
-        acc = "bb"
-
-    return acc + str(degree[0])
+    mode = "major" if key[0].isupper() else "minor"
+    degree, accidental = get_degree_and_accidental(f"{key.split(' ')[0]} {mode}", note)
+    return accidental_abbreviation.get(accidental, "") + str(degree)
 
 
 def get_localTonalty(globalkey, degree):
@@ -10,8 +10,11 @@ from musif.extract.constants import (
     DATA_NUMERIC_TEMPO,
     DATA_PART,
     DATA_SCORE,
+    DATA_WINDOW,
     GLOBAL_TIME_SIGNATURE,
 )
+from musif.musicxml.arrays import PartArrays
+from musif.musicxml.common import get_measures
 from musif.musicxml.tempo import (
     get_number_of_beats,
     get_tempo_grouped_1,
@@ -32,7 +35,11 @@ class TempoGroup2(Enum):
 def update_part_objects(
     score_data: dict, part_data: dict, cfg: ExtractConfiguration, part_features: dict
 ):
-    part = part_data[DATA_PART]
+    window = part_data.get(DATA_WINDOW)
+    if window is not None:
+        part_measures = window.measures
+    else:
+        part_measures = list(get_measures(part_data[DATA_PART]))
 
     (
         time_signature,
@@ -40,7 +47,7 @@ def update_part_objects(
         time_signatures,
         time_signature_grouped,
         number_of_beats,
-    ) = extract_time_signatures(list(part.getElementsByClass(Measure)), score_data)
+    ) = extract_time_signatures(part_measures, score_data)
     part_data.update(
         {
             C.TIME_SIGNATURES: time_signatures,
@@ -64,9 +71,14 @@ def update_score_objects(
     score_features: dict,
 ):
 
-    score = score_data[DATA_SCORE]
+    window = score_data.get(DATA_WINDOW)
     # for the features, we use the first part as reference!
-    part = score.parts[0]
+    if window is not None:
+        part = window.first_part_measures
+        part_measures = part
+    else:
+        part = score_data[DATA_SCORE].parts[0]
+        part_measures = list(get_measures(part))
     numeric_tempo, tempo_mark = extract_tempo(score_data, part)
     tempo_grouped_1 = get_tempo_grouped_1(tempo_mark)
     tempo_grouped_2 = get_tempo_grouped_2(tempo_grouped_1)
@@ -77,7 +89,7 @@ def update_score_objects(
         time_signatures,
         time_signature_grouped,
         number_of_beats,
-    ) = extract_time_signatures(list(part.getElementsByClass(Measure)), score_data)
+    ) = extract_time_signatures(part_measures, score_data)
 
     score_features.update(
         {
@@ -153,6 +165,11 @@ def extract_time_signatures(measures: list, score_data: dict) -> tuple:
 def extract_tempo(score_data, part):
     numeric_tempo = score_data[DATA_NUMERIC_TEMPO]
     tempo_mark = TempoGroup2.NA.value
+    if isinstance(part, PartArrays):
+        for content in part.text_expressions(0):
+            if get_tempo_grouped_1(content) != "NA":
+                tempo_mark = content
+        return numeric_tempo, tempo_mark
     for measure in part:
         if isinstance(measure, Measure):
             for element in measure:
@@ -0,0 +1,263 @@
+"""
+Incremental extraction: avoid computing again what previous runs already computed.
+
+Two levels are available:
+
+- :class:`ExtractionManifest` (option `incremental_dir`) is a manifest of the scores
+  already extracted, so that only new or modified scores are processed again. The
+  manifest is a JSON file kept in `incremental_dir` together with the features extracted
+  for each score (one pickle file per score). An entry is valid if both the content hash
+  of the score (and of its MuseScore file, if harmonic features are requested) and the
+  hash of the extraction settings are unchanged; the settings include the relevant
+  fields of the configuration, the requested features and the versions of musif and
+  music21.
+- :class:`FeaturesCache` (option `features_cache_dir`) stores the features computed by
+  each feature module for each score, so that adding a module to `features` does not
+  compute again the other ones.
+"""
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path, PurePath
+from typing import Any, Dict, List, Optional, Union
+
+from musif.cache.store import CacheStore, atomic_write, get_versions
+from musif.logs import lwarn
+
+MANIFEST_FILE_NAME = "manifest.json"
+"""Name of the manifest file in `incremental_dir`"""
+
+MANIFEST_FORMAT = 1
+"""Version of the manifest format; manifests with a different format are discarded"""
+
+INCREMENTAL_CONFIG_FIELDS = [
+    "features",
+    "basic_modules",
+    "basic_modules_addresses",
+    "feature_modules_addresses",
+    "parts_filter",
+    "split_keywords",
+    "expand_repeats",
+    "window_size",
+    "overlap",
+    "remove_unpitched_objects",
+    "precache_hooks",
+    "scoring_family_order",
+    "scoring_order",
+    "sound_to_family",
+    "family_to_abbreviation",
+    "sound_to_abbreviation",
+    "music21_features",
+    "measure_statistics",
+]
+"""Fields of `ExtractConfiguration` that can change the extracted features"""
+
+MODULE_CONFIG_FIELDS = [
+    field
+    for field in INCREMENTAL_CONFIG_FIELDS
+    if field not in ("features", "basic_modules", "music21_features", "measure_statistics")
+    and not field.endswith("_modules_addresses")
+]
+"""Fields of `ExtractConfiguration` that a feature module is assumed to read, if it
+does not declare them in `musif_config_fields`"""
+
+LOAD_CONFIG_FIELDS = [
+    "split_keywords",
+    "expand_repeats",
+    "remove_unpitched_objects",
+    "parts_filter",
+    "precache_hooks",
+    "fast_parser",
+    "cache_dir",
+    "musescore_dir",
+    "sound_to_family",
+    "family_to_abbreviation",
+    "sound_to_abbreviation",
+]
+"""Fields of `ExtractConfiguration` that change the data loaded from a score"""
+
+CACHE_HEADER_FIELDS = [
+    "split_keywords",
+    "expand_repeats",
+    "remove_unpitched_objects",
+    "parts_filter",
+    "fast_parser",
+]
+"""Fields of `ExtractConfiguration` written as they are in the header of cache files"""
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(*file_paths: Union[str, PurePath]) -> str:
+    """
+    Returns the SHA-256 hex digest of the content of one or more files. Files that do
+    not exist are skipped.
+    """
+    digest = hashlib.sha256()
+    for file_path in file_paths:
+        if not os.path.isfile(file_path):
+            continue
+        digest.update(Path(file_path).name.encode("utf-8"))
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_digest(cfg, fields: List[str] = INCREMENTAL_CONFIG_FIELDS) -> str:
+    """
+    Returns a hash of the extraction settings: the values of `fields` in the
+    configuration `cfg` and the versions of musif and music21.
+    """
+    settings = {field: getattr(cfg, field, None) for field in fields}
+    settings["versions"] = get_versions()
+    encoded = json.dumps(settings, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ExtractionManifest:
+    """
+    Manifest of the scores extracted in previous runs and of their features.
+
+    Usage:
+
+    ..  code-block:: python
+
+        manifest = ExtractionManifest(incremental_dir, settings_digest(cfg))
+        features = manifest.get(filename, digest)
+        if features is None:
+            features = extract(filename)
+            manifest.put(filename, digest, features)
+        manifest.save()
+    """
+
+    def __init__(self, directory: Union[str, PurePath], settings: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / MANIFEST_FILE_NAME
+        self.settings = settings
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            lwarn(f"Cannot read the manifest {self.path}, starting from scratch: {e}")
+            return {}
+        if manifest.get("format") != MANIFEST_FORMAT:
+            return {}
+        return manifest.get("entries", {})
+
+    def get(self, filename: Union[str, PurePath], digest: str) -> Optional[Any]:
+        """
+        Returns the features stored for `filename`, or None if the file was never
+        extracted, if its content (`digest`) or the extraction settings have changed, or
+        if the stored features cannot be loaded.
+        """
+        entry = self.entries.get(str(filename))
+        if entry is None or entry["digest"] != digest or entry["settings"] != self.settings:
+            return None
+        try:
+            with open(self.directory / entry["features"], "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            lwarn(f"Cannot load the stored features of {filename}, extracting them again: {e}")
+            return None
+
+    def put(self, filename: Union[str, PurePath], digest: str, features: Any):
+        """
+        Stores the features extracted from `filename` and records them in the manifest.
+        The manifest file itself is only written by `save`.
+        """
+        features_name = f"{digest}-{self.settings[:16]}.pkl"
+        atomic_write(self.directory / features_name, pickle.dumps(features))
+        old_entry = self.entries.get(str(filename))
+        self.entries[str(filename)] = {
+            "digest": digest,
+            "settings": self.settings,
+            "features": features_name,
+        }
+        if old_entry is not None and old_entry["features"] != features_name:
+            self._remove_unused(old_entry["features"])
+
+    def save(self):
+        """
+        Writes the manifest file.
+        """
+        manifest = {"format": MANIFEST_FORMAT, "entries": self.entries}
+        atomic_write(
+            self.path, json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8")
+        )
+
+    def _remove_unused(self, features_name: str):
+        if any(entry["features"] == features_name for entry in self.entries.values()):
+            return
+        try:
+            os.remove(self.directory / features_name)
+        except OSError:
+            pass
+
+
+class FeaturesCache:
+    """
+    On-disk cache of the features computed by each feature module for each score.
+
+    The result of a module is stored in a :class:`musif.cache.CacheStore` with a key
+    which is a hash of:
+
+    - the key of the score (the content hash of its files, see :func:`file_digest`, and
+      the range of measures for windows)
+    - the name of the module and its version, i.e. the `musif_version` attribute of the
+      module package (the versions of musif and music21 by default)
+    - the fields of the configuration read by the module, i.e. the `musif_config_fields`
+      attribute of the module package (`MODULE_CONFIG_FIELDS` by default), and whether
+      MuseScore files are requested
+    - the keys of the modules listed in `musif_dependencies`, so that a change in a
+      module invalidates all the modules that depend on it
+
+    A result is a dictionary with the features added by the module to each part
+    (`'parts'`), to the score (`'score'`), and a flag telling if the module also added
+    objects to `score_data` or `parts_data` (`'provides_data'`), in which case it must be
+    run anyway if any of the following modules is run.
+    """
+
+    def __init__(self, directory: Union[str, PurePath]):
+        self.store = CacheStore(directory)
+
+    def module_key(
+        self, score_key: str, package, cfg, dependency_keys: List[str]
+    ) -> str:
+        """
+        Returns the key of the result of the module `package` for the score
+        `score_key`. `dependency_keys` are the keys of its dependencies.
+        """
+        fields = getattr(package, "musif_config_fields", MODULE_CONFIG_FIELDS)
+        key = {
+            "score": score_key,
+            "module": package.__name__,
+            "version": getattr(package, "musif_version", get_versions()),
+            "config": {field: getattr(cfg, field, None) for field in fields},
+            "musescore": cfg.is_requested_musescore_file(),
+            "dependencies": dependency_keys,
+        }
+        encoded = json.dumps(key, sort_keys=True, default=repr).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the result stored with `key`, or None.
+        """
+        return self.store.get(key)
+
+    def put(self, key: str, result: dict):
+        """
+        Stores `result` with `key`. Results that cannot be pickled are not stored.
+        """
+        try:
+            self.store.put(key, result)
+        except Exception as e:
+            lwarn(f"Cannot store the features of module with key {key}: {e}")
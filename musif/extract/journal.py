@@ -0,0 +1,103 @@
+"""
+Journal of the errors raised while extracting the features of a corpus.
+"""
+import json
+import os
+import time
+import traceback
+from pathlib import Path, PurePath
+from typing import List, Optional, Union
+
+from musif.logs import lwarn
+
+
+class ErrorJournal:
+    """
+    Append-only journal of the scores that could not be extracted, in JSON Lines format.
+
+    Each failure is recorded with the file, the index of the score, the feature module
+    that raised the error (None if the score could not be loaded), the type, message,
+    cause and traceback of the exception, the time spent on the score and the time of the
+    error. When a score that had failed is extracted successfully, a record with status `'ok'`
+    is appended, so that the journal keeps the whole history of a corpus.
+
+    Each record is written with a single `write` on a file opened in append mode, so
+    that many worker processes can write to the same journal without locks and records
+    are never interleaved.
+    """
+
+    def __init__(self, path: Union[str, PurePath]):
+        self.path = Path(path)
+
+    def record_error(
+        self,
+        filename: Union[str, PurePath],
+        exception: BaseException,
+        idx: Optional[int] = None,
+        module: Optional[str] = None,
+        elapsed: Optional[float] = None,
+    ):
+        """
+        Records that `exception` was raised while extracting `filename`.
+        """
+        cause = exception.__cause__
+        self._append(
+            {
+                "file": str(filename),
+                "status": "error",
+                "idx": idx,
+                "module": module,
+                "exception": type(exception).__qualname__,
+                "message": str(exception),
+                "cause": None if cause is None else f"{type(cause).__qualname__}: {cause}",
+                "traceback": "".join(traceback.format_exception(exception)),
+                "elapsed": elapsed,
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "pid": os.getpid(),
+            }
+        )
+
+    def record_success(self, filename: Union[str, PurePath]):
+        """
+        Records that `filename`, which had failed, was extracted successfully.
+        """
+        self._append(
+            {
+                "file": str(filename),
+                "status": "ok",
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+        )
+
+    def records(self) -> List[dict]:
+        """
+        Returns all the records of the journal, in the order in which they were written.
+        """
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    lwarn(f"Skipping a malformed line of the error journal {self.path}")
+        return records
+
+    def failed_files(self) -> List[str]:
+        """
+        Returns the files whose last record is a failure.
+        """
+        status = {}
+        for record in self.records():
+            status[record["file"]] = record["status"]
+        return [filename for filename, s in status.items() if s == "error"]
+
+    def _append(self, record: dict):
+        data = (json.dumps(record) + "\n").encode("utf-8")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
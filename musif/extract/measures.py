@@ -0,0 +1,267 @@
+"""
+Per-measure statistics of the parts of a score, extracted with the option
+`measure_statistics`.
+
+Each row of the output describes one measure of one part: the number and duration of its
+notes and rests, its lowest and highest notes, the intervals that end in it, its
+syllables and its beats. Part, score and window statistics are reductions over these
+rows (see :func:`reduce_measures`), so that a corpus can be analyzed at any granularity,
+and windowed again with different sizes, without loading the scores again.
+"""
+from os import path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from musif.extract.constants import (
+    DATA_FAMILY_ABBREVIATION,
+    DATA_FILE,
+    DATA_PART,
+    DATA_PART_ABBREVIATION,
+    DATA_SOUND_ABBREVIATION,
+    ID,
+    WINDOW_ID,
+    WINDOW_RANGE,
+)
+from musif.extract.features.core.constants import FILE_NAME
+from musif.extract.features.tempo.handler import extract_time_signatures
+from musif.extract.windows import PartMeasureIndex
+from musif.musicxml.tempo import get_number_of_beats
+
+PART = "Part"
+SOUND = "Sound"
+FAMILY = "Family"
+MEASURE_INDEX = "MeasureIndex"
+MEASURE_NUMBER = "MeasureNumber"
+TIME_SIGNATURE = "TimeSignature"
+
+NOTES = "Notes"
+RESTS = "Rests"
+SOUNDING = "Sounding"
+NOTES_DURATION = "NotesDuration"
+RESTS_DURATION = "RestsDuration"
+INTERVALS = "Intervals"
+ABSOLUTE_SEMITONES = "AbsoluteSemitones"
+ASCENDING_INTERVALS = "AscendingIntervals"
+DESCENDING_INTERVALS = "DescendingIntervals"
+SYLLABLES = "Syllables"
+BEATS = "Beats"
+LOWEST_NOTE_INDEX = "LowestNoteIndex"
+HIGHEST_NOTE_INDEX = "HighestNoteIndex"
+
+SUM_STATISTICS = [
+    NOTES,
+    RESTS,
+    SOUNDING,
+    NOTES_DURATION,
+    RESTS_DURATION,
+    INTERVALS,
+    ABSOLUTE_SEMITONES,
+    ASCENDING_INTERVALS,
+    DESCENDING_INTERVALS,
+    SYLLABLES,
+    BEATS,
+]
+"""Statistics that are summed over measures"""
+
+MIN_STATISTICS = [LOWEST_NOTE_INDEX]
+"""Statistics whose minimum over measures is taken"""
+
+MAX_STATISTICS = [HIGHEST_NOTE_INDEX]
+"""Statistics whose maximum over measures is taken"""
+
+STATISTICS = SUM_STATISTICS + MIN_STATISTICS + MAX_STATISTICS
+"""All the numeric statistics of a measure, in the order of the columns of the tensor"""
+
+
+def measure_statistics(
+    index: PartMeasureIndex, time_signatures: List[str]
+) -> Dict[str, np.ndarray]:
+    """
+    Computes the statistics of every measure of a part in one pass over its notes, and
+    returns them as arrays with one value per measure, by statistic name.
+
+    The interval between two consecutive notes is counted in the measure of its second
+    note. `time_signatures` are the time signatures of the measures, as returned by
+    `musif.extract.features.tempo.handler.extract_time_signatures`. Lowest and highest
+    notes of measures without notes are NaN.
+    """
+    n_measures = len(index)
+    stats = {name: np.zeros(n_measures) for name in SUM_STATISTICS}
+    stats[LOWEST_NOTE_INDEX] = np.full(n_measures, np.nan)
+    stats[HIGHEST_NOTE_INDEX] = np.full(n_measures, np.nan)
+
+    note_measures = np.repeat(np.arange(n_measures), np.diff(index.note_starts))
+    midi = np.array([note.pitch.midi for note in index.notes], dtype=float)
+    durations = np.array(
+        [float(note.duration.quarterLength) for note in index.notes], dtype=float
+    )
+    syllables = np.array(
+        [len(index.lyrics(i, i + 1)) for i in range(len(index.notes))], dtype=float
+    )
+    np.add.at(stats[NOTES], note_measures, 1)
+    np.add.at(stats[NOTES_DURATION], note_measures, durations)
+    np.add.at(stats[SYLLABLES], note_measures, syllables)
+    np.fmin.at(stats[LOWEST_NOTE_INDEX], note_measures, midi)
+    np.fmax.at(stats[HIGHEST_NOTE_INDEX], note_measures, midi)
+
+    if len(index.notes) > 1:
+        semitones = index.intervals.semitones.astype(float)
+        interval_measures = note_measures[1:]
+        np.add.at(stats[INTERVALS], interval_measures, 1)
+        np.add.at(stats[ABSOLUTE_SEMITONES], interval_measures, np.abs(semitones))
+        np.add.at(stats[ASCENDING_INTERVALS], interval_measures, semitones > 0)
+        np.add.at(stats[DESCENDING_INTERVALS], interval_measures, semitones < 0)
+
+    rest_measures = np.repeat(
+        np.arange(n_measures), np.diff(index.notes_and_rests_starts)
+    )
+    for measure, element in zip(rest_measures, index.notes_and_rests):
+        if element.isRest:
+            stats[RESTS][measure] += 1
+            stats[RESTS_DURATION][measure] += float(element.duration.quarterLength)
+
+    stats[SOUNDING] = index.sounding.astype(float)
+    stats[BEATS] = np.array(
+        [
+            np.nan if pd.isna(beats) else beats
+            for beats in map(get_number_of_beats, time_signatures)
+        ],
+        dtype=float,
+    )
+    return stats
+
+
+def measure_rows(
+    part_data: dict, index: PartMeasureIndex, time_signatures: List[str]
+) -> List[dict]:
+    """
+    Returns the rows of the measures of a part, with the part, its sound and family,
+    the index, number and time signature of each measure and its statistics.
+    """
+    stats = measure_statistics(index, time_signatures)
+    rows = []
+    for i, measure in enumerate(index.measures):
+        row = {
+            PART: part_data[DATA_PART_ABBREVIATION],
+            SOUND: part_data[DATA_SOUND_ABBREVIATION],
+            FAMILY: part_data[DATA_FAMILY_ABBREVIATION],
+            MEASURE_INDEX: i,
+            MEASURE_NUMBER: measure.measureNumber,
+            TIME_SIGNATURE: time_signatures[i],
+        }
+        row.update({name: stats[name][i] for name in STATISTICS})
+        rows.append(row)
+    return rows
+
+
+def score_measure_rows(score_data: dict, parts_data: List[dict]) -> List[dict]:
+    """
+    Returns the rows of the measures of all the parts in `parts_data`, with the name of
+    the file of the score.
+    """
+    file_name = path.basename(score_data[DATA_FILE])
+    rows = []
+    for part_data in parts_data:
+        index = PartMeasureIndex(part_data[DATA_PART])
+        time_signatures = extract_time_signatures(index.measures, score_data)[2]
+        for row in measure_rows(part_data, index, time_signatures):
+            row[FILE_NAME] = file_name
+            rows.append(row)
+    return rows
+
+
+def reduce_measures(
+    df: DataFrame,
+    window_size: Optional[int] = None,
+    overlap: int = 0,
+    by: Optional[List[str]] = None,
+) -> DataFrame:
+    """
+    Reduces the per-measure statistics of `df`, as returned by
+    `FeaturesExtractor.extract` with `measure_statistics`, to statistics of groups of
+    measures: statistics in `SUM_STATISTICS` are summed, `LowestNoteIndex` is the
+    minimum and `HighestNoteIndex` the maximum.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The per-measure statistics.
+    window_size : int, optional
+        If given, the measures of each score are grouped in windows of this size, with
+        `overlap` measures in common, and numbered as in the extraction with the options
+        `window_size` and `overlap` (columns `WindowId` and `WindowRange`). Otherwise,
+        all the measures of each score are reduced together.
+    overlap : int
+        Number of measures shared by consecutive windows.
+    by : list of str, optional
+        Columns identifying the groups reduced separately in each score (or window).
+        Defaults to `["Part"]`; use `[]` for statistics of the whole score, or
+        `["Sound"]` and `["Family"]` for sounds and families.
+
+    Returns
+    -------
+    A DataFrame with a row for each score (and window), and each group in `by`.
+    """
+    if by is None:
+        by = [PART]
+    aggregations = {name: "sum" for name in SUM_STATISTICS}
+    aggregations.update({name: "min" for name in MIN_STATISTICS})
+    aggregations.update({name: "max" for name in MAX_STATISTICS})
+    if window_size is None:
+        return df.groupby([ID] + by, sort=False).agg(aggregations).reset_index()
+
+    hopsize = window_size - overlap
+    if hopsize <= 0:
+        raise ValueError("overlap must be less than window_size")
+    reduced = []
+    for score_id, score_df in df.groupby(ID, sort=False):
+        n_measures = int(score_df[MEASURE_INDEX].max()) + 1
+        number_windows = (n_measures - overlap) // hopsize
+        for window_id in range(number_windows):
+            first = window_id * hopsize
+            last = first + window_size
+            window_df = score_df[
+                (score_df[MEASURE_INDEX] >= first) & (score_df[MEASURE_INDEX] < last)
+            ]
+            window_df = (
+                window_df.groupby(by, sort=False).agg(aggregations).reset_index()
+                if len(by) > 0
+                else DataFrame([window_df.agg(aggregations)])
+            )
+            window_df.insert(0, ID, score_id)
+            window_df.insert(1, WINDOW_ID, window_id)
+            window_df.insert(2, WINDOW_RANGE, f"{first} - {last}")
+            reduced.append(window_df)
+    if len(reduced) == 0:
+        return DataFrame(columns=[ID, WINDOW_ID, WINDOW_RANGE] + by + STATISTICS)
+    return pd.concat(reduced, ignore_index=True)
+
+
+def measures_tensor(
+    df: DataFrame, statistics: Optional[List[str]] = None
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Returns the per-measure statistics of one score as a dense array of shape
+    (parts, measures, statistics), and the parts in the order of the first axis.
+    Measures that a part does not have are NaN.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The rows of one score of the per-measure statistics (e.g. `df[df.Id == 0]`).
+    statistics : list of str, optional
+        The statistics in the order of the last axis; defaults to `STATISTICS`.
+    """
+    if statistics is None:
+        statistics = STATISTICS
+    parts = list(dict.fromkeys(df[PART]))
+    n_measures = int(df[MEASURE_INDEX].max()) + 1 if len(df) > 0 else 0
+    tensor = np.full((len(parts), n_measures, len(statistics)), np.nan)
+    part_positions = df[PART].map({part: i for i, part in enumerate(parts)}).to_numpy()
+    tensor[part_positions, df[MEASURE_INDEX].to_numpy(dtype=int)] = df[
+        statistics
+    ].to_numpy(dtype=float)
+    return tensor, parts
@@ -11,6 +11,7 @@ import musif.extract.constants as C
 from musif.cache import isinstance
 from musif.extract.constants import PLAYTHROUGH
 from musif.logs import pwarn
+from musif.musicxml.common import get_measures
 from musif.musicxml.tempo import get_number_of_beats
 
 file_names = []
@@ -594,11 +595,7 @@ def extract_global_time_signature(score_data):
     Extracts a global time signature for the score for cases where is not possibel to get measure-by-measure TS
     """
     try:
-        global_ts = (
-            score_data[C.DATA_FILTERED_PARTS][0]
-            .getElementsByClass(Measure)[0]
-            .timeSignature
-        )
+        global_ts = get_measures(score_data[C.DATA_FILTERED_PARTS][0])[0].timeSignature
     except IndexError:
         global_ts = None
         
@@ -0,0 +1,335 @@
+"""
+Per-measure indices of the parts of a score, used to extract the features of windows
+(options `window_size` and `overlap`).
+
+The notes of each part are indexed by measure once per score; the objects of each window
+(notes, intervals, lyrics, ...) are then slices of the objects of the whole part, and the
+features that can be merged across measures (ambitus, notes per scale degree) are
+computed from range queries and per-note lookups, instead of traversing the measures
+of every window.
+
+The window streams returned by `score.measures(first, last, indicesNotNumbers=True)`
+are only built if a module reads them (see :class:`WindowData`).
+"""
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from music21.analysis.discrete import DiscreteAnalysisException
+from music21.key import Key
+from music21.note import Note, Unpitched
+from music21.stream.base import Measure, Part, Score
+
+from musif.musicxml.common import (
+    _get_intervals,
+    _get_lyrics_in_notes,
+    _get_pitch_names,
+)
+from musif.musicxml.events import PartEvents
+from musif.musicxml.intervals import IntervalArray
+from musif.musicxml.key import count_degree_indices, estimate_key, get_degree_indices
+
+
+class _RangeExtremes:
+    """
+    Sparse table answering the minimum of `values[first:last]` in constant time.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.levels = [values]
+        width = 1
+        while 2 * width <= len(values):
+            previous = self.levels[-1]
+            self.levels.append(np.minimum(previous[:-width], previous[width:]))
+            width *= 2
+
+    def min(self, first: int, last: int):
+        level = (last - first).bit_length() - 1
+        table = self.levels[level]
+        return min(table[first], table[last - (1 << level)])
+
+
+class PartMeasureIndex:
+    """
+    Index of the notes of a music21 part by measure.
+
+    The measures, notes and notes and rests are the same objects returned by
+    `musif.musicxml.common.get_notes_and_measures` for the whole part, taken from a
+    :class:`musif.musicxml.events.PartEvents` of the part (`events`), and a window
+    from measure index `first` to `last` (excluded) contains the same objects as the
+    part returned by `score.measures(first, last, indicesNotNumbers=True)`.
+    """
+
+    def __init__(self, part: Part):
+        self.events = PartEvents(part)
+        self.measures = self.events.measures
+        events = self.events
+        self.notes = [
+            events.elements[i] for i in np.flatnonzero(events.is_note).tolist()
+        ]
+        self.notes_and_rests = [
+            events.elements[i] for i in np.flatnonzero(events.is_general_note).tolist()
+        ]
+        n_measures = len(self.measures)
+        note_counts = np.bincount(
+            events.element_measures[events.is_note], minlength=n_measures
+        )
+        notes_and_rests_counts = np.bincount(
+            events.element_measures[events.is_general_note], minlength=n_measures
+        )
+        self.note_starts = np.concatenate(([0], np.cumsum(note_counts))).astype(int)
+        self.notes_and_rests_starts = np.concatenate(
+            ([0], np.cumsum(notes_and_rests_counts))
+        ).astype(int)
+        self.sounding = (
+            np.bincount(
+                events.element_measures[events.is_not_rest], minlength=n_measures
+            )
+            > 0
+        )
+
+        self._intervals = None
+        self._lyrics = None
+        self._lyrics_starts = None
+        self._lowest = None
+        self._highest = None
+        self._degrees = {}
+
+    def __len__(self) -> int:
+        return len(self.measures)
+
+    def window(self, first: int, last: int) -> "PartWindow":
+        """
+        Returns the window from measure index `first` to `last` (excluded).
+        """
+        last = min(last, len(self.measures))
+        return PartWindow(self, min(first, last), last)
+
+    @property
+    def intervals(self) -> IntervalArray:
+        """
+        Intervals between consecutive notes of the part.
+        """
+        if self._intervals is None:
+            self._intervals = _get_intervals(self.notes)
+        return self._intervals
+
+    def lyrics(self, first_note: int, last_note: int) -> List[str]:
+        """
+        Syllables of the notes from `first_note` to `last_note` (excluded).
+        """
+        if self._lyrics is None:
+            self._lyrics = []
+            starts = [0]
+            for note in self.notes:
+                self._lyrics.extend(_get_lyrics_in_notes([note]))
+                starts.append(len(self._lyrics))
+            self._lyrics_starts = starts
+        return self._lyrics[
+            self._lyrics_starts[first_note] : self._lyrics_starts[last_note]
+        ]
+
+    def ambitus(self, first: int, last: int) -> Optional[Tuple[Note, Note]]:
+        """
+        Returns the lowest and highest notes of the measures from `first` to `last`
+        (excluded), or None if they have no notes. As
+        `musif.extract.features.ambitus.handler._get_notes_ambitus`, the first of the
+        notes with the same pitch is returned.
+        """
+        if self.note_starts[last] == self.note_starts[first]:
+            return None
+        if self._lowest is None:
+            self._build_ambitus()
+        lowest = self._lowest.min(first, last) % (len(self.notes) + 1)
+        highest = self._highest.min(first, last) % (len(self.notes) + 1)
+        return self.notes[lowest], self.notes[highest]
+
+    def _build_ambitus(self):
+        # each note is encoded in an integer, so that the lowest (or highest) note of
+        # a range of measures is the minimum of the codes of its measures; ties are
+        # broken by the position of the note
+        n = len(self.notes) + 1
+        midi = np.array([note.pitch.midi for note in self.notes], dtype=np.int64)
+        position = np.arange(len(self.notes), dtype=np.int64)
+        lowest_codes = midi * n + position
+        highest_codes = (128 - midi) * n + position
+        none = np.iinfo(np.int64).max
+        lowest, highest = [], []
+        for measure in range(len(self.measures)):
+            notes = slice(self.note_starts[measure], self.note_starts[measure + 1])
+            if notes.start == notes.stop:
+                lowest.append(none)
+                highest.append(none)
+            else:
+                lowest.append(lowest_codes[notes].min())
+                highest.append(highest_codes[notes].min())
+        self._lowest = _RangeExtremes(np.array(lowest, dtype=np.int64))
+        self._highest = _RangeExtremes(np.array(highest, dtype=np.int64))
+
+    def degrees(self, key: str, first: int, last: int) -> np.ndarray:
+        """
+        Counts the notes of each scale degree of `key` in the measures from `first` to
+        `last` (excluded), as a histogram returned by
+        `musif.musicxml.key.get_degree_histogram`. The degree of each note of the part
+        is looked up once per key.
+        """
+        indices = self._degrees.get(key)
+        if indices is None:
+            indices = get_degree_indices(key, _get_pitch_names(self.notes))
+            self._degrees[key] = indices
+        return count_degree_indices(
+            indices[self.note_starts[first] : self.note_starts[last]]
+        )
+
+
+class PartWindow:
+    """
+    The measures of a part from index `first` to `last` (excluded), whose objects and
+    mergeable features are taken from a :class:`PartMeasureIndex`.
+    """
+
+    def __init__(self, index: PartMeasureIndex, first: int, last: int):
+        self.index = index
+        self.first = first
+        self.last = last
+
+    @property
+    def measures(self) -> list:
+        return self.index.measures[self.first : self.last]
+
+    @property
+    def notes(self) -> list:
+        return self.index.notes[self._first_note : self._last_note]
+
+    @property
+    def notes_and_rests(self) -> list:
+        starts = self.index.notes_and_rests_starts
+        return self.index.notes_and_rests[starts[self.first] : starts[self.last]]
+
+    @property
+    def events(self) -> PartEvents:
+        return self.index.events.window(self.first, self.last)
+
+    @property
+    def sounding_measures(self) -> List[int]:
+        """
+        Indices of the measures containing notes, relative to the window.
+        """
+        return np.flatnonzero(self.index.sounding[self.first : self.last]).tolist()
+
+    @property
+    def intervals(self) -> IntervalArray:
+        if self._last_note - self._first_note < 2:
+            return IntervalArray.empty()
+        return self.index.intervals[self._first_note : self._last_note - 1]
+
+    @property
+    def lyrics(self) -> List[str]:
+        return self.index.lyrics(self._first_note, self._last_note)
+
+    def ambitus(self) -> Optional[Tuple[Note, Note]]:
+        return self.index.ambitus(self.first, self.last)
+
+    def degrees(self, key: str) -> np.ndarray:
+        return self.index.degrees(key, self.first, self.last)
+
+    @property
+    def _first_note(self) -> int:
+        return self.index.note_starts[self.first]
+
+    @property
+    def _last_note(self) -> int:
+        return self.index.note_starts[self.last]
+
+
+
+class ScoreMeasureIndex:
+    """
+    Index of a music21 score by measure, for the score-level objects of windows: the
+    measures of its first part and the pitch-class distribution of the notes of each
+    measure in all the parts, from which the key of a window is estimated as
+    `score.measures(first, last, indicesNotNumbers=True).analyze('key')` does.
+    """
+
+    def __init__(self, score: Score):
+        parts = [list(part.getElementsByClass(Measure)) for part in score.parts]
+        self.first_part_measures = parts[0] if len(parts) > 0 else []
+        n_measures = max((len(measures) for measures in parts), default=0)
+        # the durations are summed exactly, as music21 does when they are fractions
+        self.distributions = [[Fraction(0)] * 12 for _ in range(n_measures)]
+        self.note_counts = [0] * n_measures
+        for measures in parts:
+            for i, measure in enumerate(measures):
+                distribution = self.distributions[i]
+                for note in measure.recurse().notes:
+                    if isinstance(note, Unpitched):
+                        continue
+                    self.note_counts[i] += 1
+                    length = Fraction(note.quarterLength)
+                    for pitch in note.pitches:
+                        distribution[pitch.pitchClass] += length
+
+    def window(self, first: int, last: int) -> "ScoreWindow":
+        """
+        Returns the window from measure index `first` to `last` (excluded).
+        """
+        return ScoreWindow(self, first, last)
+
+    def key(self, first: int, last: int) -> Key:
+        """
+        Estimates the key of the measures from `first` to `last` (excluded).
+        """
+        if sum(self.note_counts[first:last]) == 0:
+            raise DiscreteAnalysisException(
+                "failed to get likely keys for Stream component"
+            )
+        distribution = [
+            float(sum(lengths)) for lengths in zip(*self.distributions[first:last])
+        ]
+        return estimate_key(distribution)
+
+
+class ScoreWindow:
+    """
+    The measures of a score from index `first` to `last` (excluded), whose score-level
+    objects are taken from a :class:`ScoreMeasureIndex`.
+    """
+
+    def __init__(self, index: ScoreMeasureIndex, first: int, last: int):
+        self.index = index
+        self.first = first
+        self.last = last
+
+    @property
+    def first_part_measures(self) -> list:
+        return self.index.first_part_measures[self.first : self.last]
+
+    def key(self) -> Key:
+        return self.index.key(self.first, self.last)
+
+
+class WindowData(dict):
+    """
+    Data of a window (`score_data` or `part_data`) whose items in `lazy` are built the
+    first time they are read, by calling the function they map to.
+
+    It is used for the window streams, which are only needed by the modules that read
+    the music21 objects of the window instead of its indices.
+    """
+
+    def __init__(self, data: dict, lazy: Dict[str, Callable[[], Any]]):
+        super().__init__(data)
+        self._lazy = lazy
+
+    def __missing__(self, key: str):
+        build = self._lazy.pop(key, None)
+        if build is None:
+            raise KeyError(key)
+        value = self[key] = build()
+        return value
+
+    def __contains__(self, key) -> bool:
+        return super().__contains__(key) or key in self._lazy
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self else default
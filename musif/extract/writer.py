@@ -0,0 +1,153 @@
+"""
+Streaming writer of the extracted features, used with the option `stream_output`.
+"""
+import json
+import os
+import shutil
+from pathlib import Path, PurePath
+from typing import Dict, List, Union
+
+import pandas as pd
+from pandas import DataFrame
+
+from musif.cache.store import atomic_write
+from musif.extract.utils import cast_mixed_dtypes
+
+STREAM_FORMATS = {".csv": "csv", ".parquet": "parquet"}
+"""Formats supported by `StreamingWriter`, by file extension"""
+
+JOURNAL_FILE_NAME = "committed.jsonl"
+"""Name of the journal of the committed scores in the parts directory"""
+
+
+class StreamingWriter:
+    """
+    Writes the features of each score to disk as soon as they are extracted, so that
+    the features of the whole corpus are never kept in memory and an interrupted
+    extraction can be resumed.
+
+    The rows of each score are written to a part file in the directory `<path>.parts`,
+    then the score is recorded in a journal in the same directory. A score is committed
+    only when its line is in the journal; part files are written atomically, so that a
+    crash never leaves a truncated one. `committed` returns the scores committed by a
+    previous run, which can be skipped.
+
+    `close` merges the part files into `path`, a CSV or Parquet file (depending on its
+    extension), with the columns of all the scores in alphabetical order, and removes
+    the parts directory. Part files are read one at a time. Parquet files need `pyarrow`.
+    """
+
+    def __init__(self, path: Union[str, PurePath]):
+        self.path = Path(path)
+        self.format = STREAM_FORMATS.get(self.path.suffix)
+        if self.format is None:
+            raise ValueError(
+                f"Unsupported format for the streamed output {self.path}, use one of: {', '.join(STREAM_FORMATS)}"
+            )
+        if self.format == "parquet":
+            # fail before extracting anything
+            import pyarrow.parquet  # noqa: F401
+        self.parts_dir = self.path.with_name(self.path.name + ".parts")
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+        self.journal = self.parts_dir / JOURNAL_FILE_NAME
+
+    def committed(self) -> Dict[str, int]:
+        """
+        Returns the index of the scores committed so far, by file name.
+        """
+        committed = {}
+        if not self.journal.exists():
+            return committed
+        with open(self.journal, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # the last line may be truncated by a crash
+                    continue
+                if (self.parts_dir / entry["part"]).exists():
+                    committed[entry["file"]] = entry["idx"]
+        return committed
+
+    def write(self, idx: int, filename: Union[str, PurePath], rows: List[dict]):
+        """
+        Writes the `rows` of the score `filename` with index `idx` and commits it.
+        """
+        df = DataFrame(rows).replace("NA", pd.NA)
+        part = f"{idx:08d}.{self.format}"
+        if self.format == "parquet":
+            df = df.convert_dtypes().apply(cast_mixed_dtypes, axis=0)
+            data = df.to_parquet(index=False)
+        else:
+            data = df.to_csv(index=False).encode("utf-8")
+        atomic_write(self.parts_dir / part, data)
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"idx": idx, "file": str(filename), "part": part}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self, files: Dict[str, int]):
+        """
+        Merges into the output file the part files of the committed scores that are in
+        `files` with the same index, and removes the parts directory. Parts of scores
+        that are no longer extracted (e.g. committed by a previous run with other files)
+        are discarded.
+        """
+        parts = sorted(
+            self.parts_dir / f"{idx:08d}.{self.format}"
+            for filename, idx in self.committed().items()
+            if files.get(filename) == idx
+        )
+        if self.format == "parquet":
+            self._merge_parquet(parts)
+        else:
+            self._merge_csv(parts)
+        shutil.rmtree(self.parts_dir)
+
+    def _merge_csv(self, parts: List[Path]):
+        columns = set()
+        for part in parts:
+            columns.update(pd.read_csv(part, nrows=0).columns)
+        columns = sorted(columns)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            DataFrame(columns=columns).to_csv(f, index=False)
+            for part in parts:
+                # values are copied as they are written in the part
+                df = pd.read_csv(part, dtype=str, keep_default_na=False)
+                df.reindex(columns=columns).to_csv(f, index=False, header=False)
+        os.replace(tmp_path, self.path)
+
+    def _merge_parquet(self, parts: List[Path]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {}
+        for part in parts:
+            for field in pq.read_schema(part):
+                types.setdefault(field.name, set()).add(field.type)
+        fields = []
+        for name in sorted(types):
+            found = {t for t in types[name] if not pa.types.is_null(t)}
+            if len(found) == 0:
+                fields.append(pa.field(name, pa.null()))
+            elif len(found) == 1:
+                fields.append(pa.field(name, found.pop()))
+            elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in found):
+                fields.append(pa.field(name, pa.float64()))
+            else:
+                fields.append(pa.field(name, pa.string()))
+        schema = pa.schema(fields)
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for part in parts:
+                table = pq.read_table(part)
+                columns = [
+                    table.column(field.name).cast(field.type)
+                    if field.name in table.column_names
+                    else pa.nulls(table.num_rows, field.type)
+                    for field in schema
+                ]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        os.replace(tmp_path, self.path)
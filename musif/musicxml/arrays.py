@@ -0,0 +1,1626 @@
+"""
+Fast MusicXML reader producing columnar NumPy arrays instead of music21 streams.
+
+`parse_musicxml_arrays` streams a MusicXML file with `xml.etree.ElementTree.iterparse`
+and emits, for every part, a :class:`NoteArrays` table (one row per `<note>`, with
+midi pitch, onset, duration, measure index, tie, voice and lyric index) and a set of
+per-measure arrays (time signature, key signature, repeat marks). The reader
+reproduces what `musif.extract.extract.parse_filename` would produce with music21
+(`makeRests`, anacrusis padding, `name_parts`, `fix_repeats` and the removal of
+unpitched objects), so that the feature modules relying only on these arrays yield
+the same values.
+
+Scores that the reader cannot represent faithfully (multiple staves per part,
+harmony symbols, senza-misura, layers to split, etc.) raise
+:class:`~musif.common.exceptions.FastParserError`; callers are expected to fall back
+to music21 in that case.
+
+music21 is still used to build the few header objects shared with the rest of musif
+(instruments, time signatures and keys), but never to parse notes.
+"""
+import xml.etree.ElementTree as ET
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from fractions import Fraction
+from functools import lru_cache
+from io import BytesIO
+from pathlib import PurePath
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from music21 import common
+from music21.analysis.discrete import DiscreteAnalysisException
+from music21.duration import Duration, durationTupleFromTypeDots
+from music21.expressions import TextExpression
+from music21.key import Key
+from music21.meter import TimeSignature
+from music21.musicxml.xmlToM21 import MeasureParser, PartParser, musicXMLTypeToType
+from music21.pitch import Accidental
+
+from musif.common.exceptions import FastParserError
+from musif.musicxml.header import (
+    PartHeader,
+    ScoreHeader,
+    ScoreHeaderReader,
+    open_musicxml,
+)
+from musif.musicxml.intervals import IntervalArray
+from musif.musicxml.key import estimate_key, get_degree_and_accidental
+
+MUSICXML_FILE_EXTENSIONS = [".xml", ".musicxml", ".mxl"]
+"""Extensions that the fast parser can read. Defaults to `[".xml", ".musicxml", ".mxl"]`"""
+
+STEPS = "CDEFGAB"
+_STEP_PITCH_CLASS = [0, 2, 4, 5, 7, 9, 11]
+
+KIND_NOTE = 0
+KIND_REST = 1
+KIND_UNPITCHED = 2
+
+CHORD_NONE = 0
+CHORD_HEAD = 1
+CHORD_MEMBER = 2
+
+TIE_NONE = 0
+TIE_START = 1
+TIE_STOP = 2
+TIE_CONTINUE = 3
+
+REPEAT_START = 1
+REPEAT_END = 2
+REPEAT_SEGNO = 4
+REPEAT_CODA = 8
+REPEAT_EXPRESSION = 16
+
+_DEFAULT_DIVISIONS = Fraction(10080)
+_DEFAULT_TIME_SIGNATURE = "4/4"
+
+# classSortOrder of the music21 classes created while parsing
+_SORT_NOTE = 20
+_SORT_DYNAMIC = 10
+_SORT_TEXT = -30
+_SORT_METRONOME = 1
+_SORT_TIME_SIGNATURE = 4
+_SORT_KEY_SIGNATURE = 2
+_SORT_CLEF = 0
+_SORT_BARLINE = -5
+_SORT_LAYOUT = -10
+
+NOTE_FIELDS = (
+    "midi",
+    "step",
+    "alter",
+    "octave",
+    "offset",
+    "onset",
+    "duration",
+    "measure",
+    "tie",
+    "voice",
+    "lyric",
+    "lyric_count",
+    "dots",
+    "kind",
+    "chord",
+    "grace",
+    "in_voice",
+    "index",
+    "name",
+)
+_NOTE_DTYPES = {
+    "midi": np.int16,
+    "step": np.int8,
+    "alter": np.float32,
+    "octave": np.int8,
+    "offset": np.float64,
+    "onset": np.float64,
+    "duration": np.float64,
+    "measure": np.int32,
+    "tie": np.int8,
+    "voice": np.int16,
+    "lyric": np.int32,
+    "lyric_count": np.int16,
+    "dots": np.int8,
+    "kind": np.int8,
+    "chord": np.int8,
+    "grace": np.bool_,
+    "in_voice": np.bool_,
+    "index": np.int64,
+    "name": object,
+}
+
+Mark = namedtuple(
+    "Mark", ["measure", "offset", "sort_order", "cls", "at_end", "index", "repeat", "payload"]
+)
+"""A non-note element of a measure (time signature, direction, barline, repeat mark...)"""
+
+Element = namedtuple("Element", ["cls", "offset", "duration", "dots", "payload"])
+"""An element of a measure as seen by iterating `measure.elements` in music21"""
+
+MeasureHeader = namedtuple("MeasureHeader", ["measureNumber", "timeSignature"])
+"""The attributes of a music21 `Measure` used by the time signature features"""
+
+
+class NoteArrays:
+    """
+    Columnar view over the notes, rests and chord members of a part.
+
+    Every column is a NumPy array with one entry per row:
+
+    - `midi`, `step` (0 to 6 for C to B), `alter`, `octave` and `name` (music21's
+      `nameWithOctave`) describe the pitch; `midi` is -1 for rests and unpitched notes
+    - `offset` is the offset in the measure, `onset` the offset in the part and
+      `duration` the quarter length; chord members share the duration of the chord
+    - `measure` is the index of the measure in the part
+    - `tie` is one of `TIE_NONE`, `TIE_START`, `TIE_STOP`, `TIE_CONTINUE`
+    - `voice` is the MusicXML voice number (0 if missing)
+    - `lyric` is the index of the first lyric in `lyric_texts` (-1 if the note has no
+      lyric) and `lyric_count` the number of lyrics attached to the note
+    - `kind` is one of `KIND_NOTE`, `KIND_REST`, `KIND_UNPITCHED` and `chord` one of
+      `CHORD_NONE`, `CHORD_HEAD`, `CHORD_MEMBER`
+    - `grace` flags grace notes and `in_voice` notes that music21 puts into a `Voice`
+    - `index` is the insertion order, used to sort simultaneous elements
+
+    Indexing with a boolean mask or an array of indices returns a new `NoteArrays`.
+    """
+
+    __slots__ = NOTE_FIELDS + ("lyric_texts", "lyric_numbers")
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        lyric_texts: List[str],
+        lyric_numbers: List[int],
+    ):
+        for field in NOTE_FIELDS:
+            setattr(self, field, columns[field])
+        self.lyric_texts = lyric_texts
+        self.lyric_numbers = lyric_numbers
+
+    @classmethod
+    def empty(cls) -> "NoteArrays":
+        return cls(
+            {field: np.zeros(0, dtype=dtype) for field, dtype in _NOTE_DTYPES.items()},
+            [],
+            [],
+        )
+
+    @classmethod
+    def concatenate(cls, arrays: List["NoteArrays"]) -> "NoteArrays":
+        """
+        Concatenates several `NoteArrays`, e.g. the notes of different parts.
+        """
+        if len(arrays) == 0:
+            return cls.empty()
+        columns = {}
+        lyric_texts, lyric_numbers, lyric_offsets = [], [], []
+        for arr in arrays:
+            lyric_offsets.append(len(lyric_texts))
+            lyric_texts.extend(arr.lyric_texts)
+            lyric_numbers.extend(arr.lyric_numbers)
+        for field in NOTE_FIELDS:
+            columns[field] = np.concatenate([getattr(arr, field) for arr in arrays])
+        columns["lyric"] = np.concatenate(
+            [
+                np.where(arr.lyric >= 0, arr.lyric + offset, -1)
+                for arr, offset in zip(arrays, lyric_offsets)
+            ]
+        ).astype(_NOTE_DTYPES["lyric"])
+        return cls(columns, lyric_texts, lyric_numbers)
+
+    def __len__(self) -> int:
+        return len(self.midi)
+
+    def __getitem__(self, key) -> "NoteArrays":
+        if isinstance(key, (int, np.integer)):
+            key = [key]
+        return NoteArrays(
+            {field: getattr(self, field)[key] for field in NOTE_FIELDS},
+            self.lyric_texts,
+            self.lyric_numbers,
+        )
+
+    def __repr__(self) -> str:
+        return f"<NoteArrays rows={len(self)}>"
+
+    def lyrics(self) -> List[str]:
+        """
+        Returns the text of all the lyrics attached to the rows, in order.
+        """
+        lyrics = []
+        for start, count in zip(self.lyric.tolist(), self.lyric_count.tolist()):
+            if start >= 0:
+                lyrics.extend(self.lyric_texts[start : start + count])
+        return lyrics
+
+    def diatonic_numbers(self) -> np.ndarray:
+        """
+        Returns music21's `diatonicNoteNum` of each row.
+        """
+        return self.octave.astype(np.int32) * 7 + self.step + 1
+
+    def pitch_spaces(self) -> np.ndarray:
+        """
+        Returns music21's `ps` of each row (the midi number before rounding).
+        """
+        pitch_classes = np.array(_STEP_PITCH_CLASS, dtype=np.float64)[self.step]
+        return (self.octave.astype(np.float64) + 1) * 12 + pitch_classes + self.alter
+
+    def intervals(self) -> IntervalArray:
+        """
+        Returns the intervals between consecutive rows, as
+        `musif.musicxml.common._get_intervals` does for a list of notes.
+        """
+        return IntervalArray.from_pitches(self.diatonic_numbers(), self.pitch_spaces())
+
+    def pitch_names(self) -> List[str]:
+        """
+        Returns music21's pitch `name` (without octave, e.g. 'F#') of each row.
+        """
+        return [
+            name[: -len(str(octave))]
+            for name, octave in zip(self.name.tolist(), self.octave.tolist())
+        ]
+
+    def scale_degrees(self, key: str) -> List[Tuple[int, str]]:
+        """
+        Returns the scale degree and the accidental (music21 full name, or "") of each
+        row with respect to `key` (e.g. 'D- major'), as
+        `musif.musicxml.common._get_degrees_and_accidentals` does for music21 notes.
+        """
+        return [get_degree_and_accidental(key, name) for name in self.pitch_names()]
+
+
+class PartArrays:
+    """
+    Arrays describing a single part of the score.
+
+    It exposes the attributes of a music21 `Part` used by the scoring modules
+    (`id`, `partName`, `partAbbreviation`, `getInstrument` and `lyrics`) plus:
+
+    - `events`: a :class:`NoteArrays` with all the rows of the part, sorted as music21
+      sorts the elements of each measure
+    - per-measure data: `measure_numbers`, `measure_suffixes`, `measure_offsets`,
+      `measure_durations`, `padding_left`, `has_voices`, `time_signatures` (the music21
+      `TimeSignature` placed at offset 0 of the measure, or None), `key_signatures`
+      (number of sharps in effect, negative for flats, or None) and `repeats` (a
+      bitmask of `REPEAT_START`, `REPEAT_END`, `REPEAT_SEGNO`, `REPEAT_CODA`,
+      `REPEAT_EXPRESSION`)
+    - `marks`: a list of :class:`Mark` with the non-note elements of every measure
+    """
+
+    def __init__(
+        self,
+        part_id: str,
+        part_name: Optional[str],
+        part_abbreviation: Optional[str],
+        instrument,
+        events: NoteArrays,
+        measure_numbers: np.ndarray,
+        measure_suffixes: List[Optional[str]],
+        measure_offsets: np.ndarray,
+        measure_durations: np.ndarray,
+        padding_left: np.ndarray,
+        has_voices: np.ndarray,
+        time_signatures: List[Optional[TimeSignature]],
+        key_signatures: List[Optional[int]],
+        repeats: np.ndarray,
+        marks: List[Mark],
+    ):
+        self.id = part_id
+        self.partName = part_name
+        self.partAbbreviation = part_abbreviation
+        self.instrument = instrument
+        self.events = events
+        self.measure_numbers = measure_numbers
+        self.measure_suffixes = measure_suffixes
+        self.measure_offsets = measure_offsets
+        self.measure_durations = measure_durations
+        self.padding_left = padding_left
+        self.has_voices = has_voices
+        self.time_signatures = time_signatures
+        self.key_signatures = key_signatures
+        self.repeats = repeats
+        self.marks = marks
+        self._mark_measures = [mark.measure for mark in marks]
+        self._measure_starts = np.searchsorted(
+            events.measure, np.arange(len(measure_numbers) + 1)
+        )
+        self._time_signatures_before = self._compute_time_signatures_before()
+
+    def __repr__(self) -> str:
+        return f"<PartArrays {self.id} measures={self.measure_count}>"
+
+    @property
+    def measure_count(self) -> int:
+        return len(self.measure_numbers)
+
+    def getInstrument(self, returnDefault: bool = True):
+        """
+        Same as music21's `Part.getInstrument`.
+        """
+        return self.instrument
+
+    def lyrics(self) -> Dict[int, List[str]]:
+        """
+        Returns the lyrics of the notes which are directly in the measures, grouped by
+        lyric number, as music21's `Stream.lyrics` does (only the keys are reliable).
+        """
+        events = self.events
+        lyrics = {}
+        for row in np.flatnonzero(
+            (events.kind != KIND_REST)
+            & (events.chord != CHORD_MEMBER)
+            & ~events.in_voice
+            & (events.lyric >= 0)
+        ):
+            start = events.lyric[row]
+            for i in range(start, start + events.lyric_count[row]):
+                lyrics.setdefault(events.lyric_numbers[i], []).append(
+                    events.lyric_texts[i]
+                )
+        return lyrics
+
+    def measure_headers(self) -> List[MeasureHeader]:
+        """
+        Returns a :class:`MeasureHeader` for every measure, to be used where music21's
+        measures are only needed for their number and time signature.
+        """
+        return [
+            MeasureHeader(number, time_signature)
+            for number, time_signature in zip(
+                self.measure_numbers.tolist(), self.time_signatures
+            )
+        ]
+
+    def measure_rows(self, measure: int) -> slice:
+        """
+        Returns the slice of `events` belonging to a measure.
+        """
+        return slice(self._measure_starts[measure], self._measure_starts[measure + 1])
+
+    def notes_and_measures(self) -> Tuple[NoteArrays, List[int], List[int], NoteArrays]:
+        """
+        Equivalent of `musif.musicxml.common.get_notes_and_measures`: returns the notes,
+        the measure indices, the indices of measures containing notes, and the notes and
+        rests of the part. As in music21, elements inside voices are not considered.
+        """
+        events = self.events
+        in_measure = ~events.in_voice & (events.chord != CHORD_MEMBER)
+        notes = events[in_measure & (events.kind == KIND_NOTE) & (events.chord == CHORD_NONE)]
+        sounding = np.unique(events.measure[in_measure & (events.kind != KIND_REST)])
+        notes_and_rests = events[in_measure]
+        return (
+            notes,
+            list(range(self.measure_count)),
+            sounding.tolist(),
+            notes_and_rests,
+        )
+
+    def measure_elements(self, measure: int) -> List[Element]:
+        """
+        Returns the elements of a measure (notes, rests, chords and marks, but not
+        voices) sorted as music21 sorts `measure.elements`.
+        """
+        events = self.events
+        rows = self.measure_rows(measure)
+        entries = []
+        for row in range(rows.start, rows.stop):
+            if events.in_voice[row] or events.chord[row] == CHORD_MEMBER:
+                continue
+            grace = bool(events.grace[row])
+            entries.append(
+                (
+                    (
+                        False,
+                        events.offset[row],
+                        _SORT_NOTE,
+                        not grace,
+                        events.index[row],
+                    ),
+                    Element(
+                        _row_class(events, row),
+                        float(events.offset[row]),
+                        float(events.duration[row]),
+                        int(events.dots[row]),
+                        row,
+                    ),
+                )
+            )
+        for mark in self.measure_marks(measure):
+            entries.append(
+                (
+                    (mark.at_end, mark.offset, mark.sort_order, True, mark.index),
+                    Element(mark.cls, mark.offset, 0.0, 0, mark.payload),
+                )
+            )
+        entries.sort(key=lambda entry: entry[0])
+        return [element for _, element in entries]
+
+    def measure_marks(self, measure: int) -> List[Mark]:
+        """
+        Returns the marks of a measure, sorted as music21 sorts the elements.
+        """
+        start = bisect_left(self._mark_measures, measure)
+        stop = bisect_right(self._mark_measures, measure)
+        return self.marks[start:stop]
+
+    def text_expressions(self, measure: int) -> List[str]:
+        """
+        Returns the content of the text expressions of a measure.
+        """
+        return [
+            mark.payload
+            for mark in self.measure_marks(measure)
+            if mark.cls == "TextExpression"
+        ]
+
+    def time_signature_at(
+        self, measure: int, offset: float
+    ) -> Tuple[Optional[TimeSignature], float]:
+        """
+        Returns the time signature in effect at `offset` of `measure` and its offset in
+        the measure where it is placed, as music21's `getContextByClass` would find it.
+        """
+        found = None
+        for mark in self.measure_marks(measure):
+            if mark.cls == "TimeSignature" and not mark.at_end and mark.offset <= offset:
+                found = (mark.payload, mark.offset)
+        if found is not None:
+            return found
+        return self._time_signatures_before[measure]
+
+    def beat_str(self, measure: int, offset: float) -> str:
+        """
+        Returns music21's `beatStr` of an element placed at `offset` of `measure`.
+        """
+        ts, ts_offset = self.time_signature_at(measure, offset)
+        if ts is None:
+            return "nan"
+        return _beat_str(
+            ts, _meter_offset(ts, offset + self.padding_left[measure], ts_offset)
+        )
+
+    def beat_strength(self, measure: int, offset: float) -> float:
+        """
+        Returns music21's `beatStrength` of an element placed at `offset` of `measure`.
+        """
+        ts, ts_offset = self.time_signature_at(measure, offset)
+        if ts is None:
+            return float("nan")
+        return _beat_strength(
+            ts, _meter_offset(ts, offset + self.padding_left[measure], ts_offset)
+        )
+
+    def _compute_time_signatures_before(self) -> List[Tuple[Optional[TimeSignature], float]]:
+        # time signature in effect at the beginning of every measure
+        before = []
+        current = (None, 0.0)
+        for measure in range(self.measure_count):
+            before.append(current)
+            for mark in self.measure_marks(measure):
+                if mark.cls == "TimeSignature":
+                    current = (mark.payload, mark.offset)
+        return before
+
+
+class ScoreArrays:
+    """
+    Arrays describing a whole score. `parts` is the list of :class:`PartArrays`, in
+    the same order as music21's `score.parts`, and `header` the
+    :class:`~musif.musicxml.header.ScoreHeader` read during the same pass.
+    """
+
+    def __init__(self, file_path: str, parts: List[PartArrays], header: ScoreHeader):
+        self.file = file_path
+        self.parts = parts
+        self.header = header
+
+    def __repr__(self) -> str:
+        return f"<ScoreArrays {self.file} parts={len(self.parts)}>"
+
+    def analyze(self, method: str) -> Key:
+        """
+        Same as music21's `score.analyze('key')`. Only the 'key' method is supported.
+        """
+        if method != "key":
+            raise ValueError(f"Analysis method {method} is not supported by ScoreArrays")
+        return analyze_key(
+            NoteArrays.concatenate([part.events for part in self.parts])
+        )
+
+
+def parse_musicxml_arrays(
+    file_path: Union[str, PurePath],
+    split_keywords: Optional[List[str]] = None,
+    remove_unpitched_objects: bool = True,
+    data: Optional[bytes] = None,
+) -> ScoreArrays:
+    """
+    Parses a MusicXML file into a :class:`ScoreArrays` without building music21 streams.
+
+    Parameters
+    ----------
+    file_path: Union[str, PurePath]
+      Path to a `.xml`, `.musicxml` or `.mxl` file.
+    split_keywords: List[str]
+      Keywords of instrument sounds whose layers should be split. Parts matching them
+      and having voices cannot be represented and raise `FastParserError`.
+    remove_unpitched_objects: bool
+      Whether unpitched notes and chords should be removed, as in `parse_filename`.
+    data: Optional[bytes]
+      The MusicXML document of the file, as returned by
+      `musif.musicxml.header.read_musicxml`, if it was already read.
+
+    Raises
+    ------
+    FastParserError
+      If the file uses a notation that the fast parser does not support.
+    """
+    split_keywords = split_keywords or []
+    header_reader = ScoreHeaderReader(str(file_path))
+    builders = []
+    score_parts = {}
+    divisions = _DEFAULT_DIVISIONS
+    builder = None
+    depth = 0
+    source = BytesIO(data) if data is not None else open_musicxml(file_path)
+    with source:
+        try:
+            for event, element in ET.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 1 and element.tag != "score-partwise":
+                        raise FastParserError(
+                            file_path, f"unsupported root element <{element.tag}>"
+                        )
+                    if depth == 2 and element.tag == "part":
+                        part_id = element.get("id")
+                        if part_id is None and len(score_parts) > 0:
+                            part_id = next(iter(score_parts))
+                        if part_id not in score_parts:
+                            raise FastParserError(file_path, f"unknown part {part_id}")
+                        builder = _PartBuilder(
+                            str(file_path), score_parts[part_id], part_id, divisions
+                        )
+                        header_reader.part(part_id, builder.part_header())
+                    continue
+                depth -= 1
+                # depth is now the number of ancestors of the element
+                if depth == 1 and element.tag == "part-list":
+                    for score_part in element.iter("score-part"):
+                        score_parts[score_part.get("id")] = score_part
+                        header_reader.score_part(score_part)
+                elif depth == 1 and element.tag == "part":
+                    builder.finish_parsing()
+                    divisions = builder.divisions
+                    builders.append(builder)
+                    builder = None
+                    element.clear()
+                elif depth == 2 and element.tag == "measure" and builder is not None:
+                    header_reader.measure(element)
+                    builder.parse_measure(element)
+                    element.clear()
+        except ET.ParseError as e:
+            raise FastParserError(file_path, str(e)) from e
+
+    for builder in builders:
+        builder.make_rests()
+        if builder.has_layers(split_keywords):
+            raise builder.error("layers to split")
+    _name_parts(builders)
+    _fix_repeats(builders)
+    parts = [builder.build(remove_unpitched_objects) for builder in builders]
+    return ScoreArrays(str(file_path), parts, header_reader.header)
+
+
+def analyze_key(notes: NoteArrays) -> Key:
+    """
+    Estimates the key with the Aarden-Essen algorithm as music21's `analyze('key')`
+    does, from the pitch-class distribution of `notes` weighted by duration.
+    """
+    pitched = notes.kind == KIND_NOTE
+    if not np.any(pitched):
+        raise DiscreteAnalysisException("failed to get likely keys for Stream component")
+    distribution = np.bincount(
+        notes.midi[pitched].astype(np.int64) % 12,
+        weights=notes.duration[pitched],
+        minlength=12,
+    ).tolist()
+    return estimate_key(distribution)
+
+
+# ---------------------------------------------------------------------------
+# parsing
+
+
+class _PartBuilder:
+    """
+    Accumulates the content of a `<part>` measure by measure, mimicking the state kept
+    by music21's `PartParser`.
+    """
+
+    def __init__(
+        self, file_path: str, score_part: ET.Element, part_id: str, divisions: Fraction
+    ):
+        parser = PartParser(mxScorePart=score_part)
+        parser.partId = part_id
+        parser.parseXmlScorePart()
+        # the names are cached by music21 before the instrument is inserted in the part,
+        # while they default to the names of the instrument once the part is complete
+        parser.stream.coreElementsChanged()
+        self.file_path = file_path
+        self.part_id = part_id
+        self.id = parser.stream.id
+        self.part_name = parser.stream.partName
+        self.part_abbreviation = parser.stream.partAbbreviation
+        self.instrument = parser.activeInstrument
+        self.divisions = divisions
+
+        self.rows = []
+        self.marks = []
+        self.lyric_texts = []
+        self.lyric_numbers = []
+        self.insert_index = 0
+
+        self.measure_numbers = []
+        self.measure_suffixes = []
+        self.measure_parse_offsets = []
+        self.measure_highest = []
+        self.measure_lowest = []
+        self.measure_time_signatures = []
+        self.measure_keys = []
+        self.padding_left = []
+        self.has_voices = []
+        self.measure_durations = []
+        self.measure_offsets = []
+
+        self.last_time_signature = None
+        self.last_number = 0
+        self.last_suffix = None
+        self.last_measure_offset = Fraction(0)
+        self.last_measure_was_short = False
+        self.last_key = None
+        self.ended_with_forward = None
+
+    def part_header(self) -> PartHeader:
+        return PartHeader(
+            self.id,
+            self.part_name,
+            self.part_abbreviation,
+            self.instrument.instrumentSound if self.instrument is not None else None,
+        )
+
+    def error(self, reason: str) -> FastParserError:
+        return FastParserError(self.file_path, f"{reason} (part {self.part_id})")
+
+    def next_index(self) -> int:
+        self.insert_index += 1
+        return self.insert_index
+
+    # -- measure parsing ----------------------------------------------------
+
+    def parse_measure(self, mx_measure: ET.Element):
+        measure = len(self.measure_numbers)
+        self._parse_measure_number(mx_measure.get("number"))
+        voices = set()
+        for mx_note in mx_measure.findall("note"):
+            voice = _stripped(mx_note.find("voice"))
+            if voice:
+                voices.add(voice)
+        state = _MeasureState(measure, voices if len(voices) > 1 else None)
+
+        for mx_print in mx_measure.findall("print"):
+            self._parse_print(mx_print, state)
+        children = list(mx_measure)
+        for i, child in enumerate(children):
+            tag = child.tag
+            if tag == "note":
+                next_is_chord = (
+                    i + 1 < len(children)
+                    and children[i + 1].tag == "note"
+                    and children[i + 1].find("chord") is not None
+                )
+                self._parse_note(child, state, next_is_chord)
+            elif tag == "backup":
+                change = self._duration(child)
+                if change is not None:
+                    state.position = max(state.position - change, Fraction(0))
+            elif tag == "forward":
+                self._parse_forward(child, state)
+            elif tag == "direction":
+                self._parse_direction(child, state)
+            elif tag == "attributes":
+                self._parse_attributes(child, state)
+            elif tag == "sound":
+                self._parse_sound(child, state, state.position + self._offset(child))
+            elif tag == "barline":
+                self._parse_barline(child, state)
+            elif tag == "harmony":
+                raise self.error("harmony symbols are not supported")
+        if state.use_voices:
+            self._fill_voices(state)
+        self.ended_with_forward = state.ended_with_forward
+
+        # PartParser.setLastMeasureInfo
+        number, suffix = self.measure_numbers[-1], self.measure_suffixes[-1]
+        if number != self.last_number:
+            self.last_number = number
+            self.last_suffix = suffix
+        time_signature = self._time_signature_at_start(state)
+        if time_signature is not None:
+            self.last_time_signature = time_signature
+        elif self.last_time_signature is None:
+            self.last_time_signature = _time_signature(_DEFAULT_TIME_SIGNATURE)
+        bar = _bar_duration(self.last_time_signature)
+
+        if state.full_measure_rest or (state.rest_count == 1 and state.note_count == 0):
+            self._fix_full_measure_rest(state, bar)
+
+        # PartParser.adjustTimeAttributesFromMeasure
+        highest = self._highest_time(state)
+        padding = Fraction(0)
+        if highest >= bar:
+            shift = highest
+        elif highest == 0 and len(state.rows) == 0:
+            state.rows.append(_rest_row(measure, Fraction(0), bar, self.next_index()))
+            shift = bar
+            self.last_measure_was_short = False
+        else:
+            shift = highest
+            if self.last_measure_offset == 0:
+                padding = bar - highest
+            elif self.last_measure_was_short:
+                padding = bar - highest
+                self.last_measure_was_short = False
+            else:
+                self.last_measure_was_short = True
+
+        self.measure_parse_offsets.append(self.last_measure_offset)
+        self.last_measure_offset += shift
+        self.measure_time_signatures.append(time_signature)
+        self.measure_keys.append(self.last_key)
+        self.padding_left.append(padding)
+        self.has_voices.append(state.use_voices)
+        self.rows.extend(state.rows)
+        self.marks.extend(state.marks)
+        self.measure_highest.append(self._highest_time(state))
+        self.measure_lowest.append(self._lowest_offset(state))
+
+    def _parse_print(self, mx_print: ET.Element, state: "_MeasureState"):
+        # same as MeasureParser.xmlPrint: a page or a system layout is always created
+        page_layout = (
+            mx_print.get("new-page") not in (None, "no")
+            or mx_print.get("page-number") is not None
+            or mx_print.find("page-layout") is not None
+        )
+        system_layout = (
+            mx_print.get("new-system") not in (None, "no")
+            or mx_print.find("system-layout") is not None
+        )
+        if page_layout:
+            state.add_mark(Fraction(0), _SORT_LAYOUT, "PageLayout", self.next_index())
+        if system_layout or not page_layout:
+            state.add_mark(Fraction(0), _SORT_LAYOUT, "SystemLayout", self.next_index())
+        for mx_staff_layout in mx_print.findall("staff-layout"):
+            number = mx_staff_layout.get("number")
+            state.staff_layouts.add((int(number or 1), Fraction(0)))
+            if number is not None:
+                state.add_mark(Fraction(0), _SORT_LAYOUT, "StaffLayout", self.next_index())
+
+    def _fill_voices(self, state: "_MeasureState"):
+        # same as the makeRests(fillGaps=True) called on every voice by MeasureParser
+        lowest = Fraction(0)
+        highest = self._highest_time(state)
+        for voice in sorted(state.voices):
+            rows = sorted(
+                (
+                    row
+                    for row in state.rows
+                    if row["in_voice"] and row["_voice"] == voice and row["chord"] != CHORD_MEMBER
+                ),
+                key=_row_sort_key,
+            )
+            if len(rows) == 0:
+                continue
+            fill = []
+            if rows[0]["_offset"] > lowest:
+                fill.append((lowest, rows[0]["_offset"] - lowest))
+            voice_highest = max(row["_offset"] + row["_ql"] for row in rows)
+            if highest > voice_highest:
+                fill.append((voice_highest, highest - voice_highest))
+            end = Fraction(0)
+            covered = sorted(
+                [(row["_offset"], row["_ql"]) for row in rows] + fill
+            )
+            for start, ql in covered:
+                if start > end:
+                    fill.append((end, start - end))
+                end = max(end, start + ql)
+            for start, ql in fill:
+                state.rows.append(
+                    _rest_row(state.measure, start, ql, self.next_index(), True, voice)
+                )
+
+    def _parse_measure_number(self, raw: Optional[str]):
+        number, suffix = 0, None
+        if raw is not None:
+            digits, letters = common.getNumFromStr(raw)
+            if digits not in (None, ""):
+                number = int(digits)
+            if letters not in (None, ""):
+                suffix = letters
+        # Finale numbers unnumbered measures as X1, X2...
+        if suffix == "X" and number != self.last_number + 1:
+            new_suffix = suffix + str(number)
+            if self.last_suffix is not None:
+                new_suffix = self.last_suffix + new_suffix
+            number = self.last_number
+            suffix = new_suffix
+        self.measure_numbers.append(number)
+        self.measure_suffixes.append(suffix)
+
+    def _duration(self, element: ET.Element) -> Optional[Fraction]:
+        text = _stripped(element.find("duration"))
+        if not text:
+            return None
+        return _quarter_length(text, self.divisions)
+
+    def _offset(self, element: ET.Element) -> Fraction:
+        text = _stripped(element.find("offset"))
+        if not text:
+            return Fraction(0)
+        try:
+            return _quarter_length(text, self.divisions)
+        except ValueError:
+            return Fraction(0)
+
+    def _parse_note(self, mx_note: ET.Element, state: "_MeasureState", next_is_chord: bool):
+        is_rest = mx_note.find("rest") is not None
+        is_chord = mx_note.find("chord") is not None or next_is_chord
+        if next_is_chord:
+            voice = _stripped(mx_note.find("voice"))
+            if voice:
+                state.set_last_voice(voice)
+        increment = Fraction(0)
+        if is_chord:
+            if is_rest:
+                raise self.error("rests in chords are not supported")
+            state.chord.append(mx_note)
+        else:
+            if is_rest:
+                state.rest_count += 1
+            else:
+                state.note_count += 1
+            row = self._note_row(mx_note, state, is_rest)
+            row["lyric"], row["lyric_count"] = self._lyrics(mx_note.findall("lyric"))
+            row["index"] = self.next_index()
+            state.add_row(row, _stripped(mx_note.find("voice")))
+            increment = row["_ql"]
+        if state.chord and not next_is_chord:
+            members = [self._note_row(mx, state, False) for mx in state.chord]
+            lyrics = [ly for mx in state.chord for ly in mx.findall("lyric")]
+            if any(member["kind"] == KIND_UNPITCHED for member in members):
+                for member in members:
+                    member["kind"] = KIND_UNPITCHED
+            voice = ""
+            for mx in state.chord:
+                if mx.find("voice") is not None:
+                    voice = _stripped(mx.find("voice"))
+                    break
+            index = self.next_index()
+            head_ql = members[0]["_ql"]
+            for i, member in enumerate(members):
+                member["chord"] = CHORD_HEAD if i == 0 else CHORD_MEMBER
+                member["_ql"] = head_ql
+                member["duration"] = float(head_ql)
+                member["index"] = index
+                member["grace"] = members[0]["grace"]
+                if i == 0:
+                    member["lyric"], member["lyric_count"] = self._lyrics(lyrics)
+                state.add_row(member, voice)
+            state.chord = []
+            increment = head_ql
+        state.position += increment
+        state.ended_with_forward = None
+
+    def _note_row(self, mx_note: ET.Element, state: "_MeasureState", is_rest: bool) -> dict:
+        ql = self._duration(mx_note) or Fraction(0)
+        type_text = _stripped(mx_note.find("type")) or None
+        has_tuplets = mx_note.find("time-modification") is not None
+        dots, duration_type = _duration_info(
+            type_text, len(mx_note.findall("dot")), ql, has_tuplets
+        )
+        grace = mx_note.find("grace") is not None
+        if grace:
+            ql = Fraction(0)
+        row = _empty_row(state.measure, state.position)
+        row["_ql"] = ql
+        row["duration"] = float(ql)
+        row["dots"] = dots
+        row["grace"] = grace
+        row["_type"] = duration_type
+        row["_tuplets"] = has_tuplets
+        row["_full_measure"] = False
+        voice = _stripped(mx_note.find("voice"))
+        row["voice"] = int(voice) if voice.isdigit() else 0
+        tie = TIE_NONE
+        for mx_tie in mx_note.findall("tie"):
+            tie_type = mx_tie.get("type")
+            if tie_type == "start":
+                tie = TIE_CONTINUE if tie == TIE_STOP else TIE_START
+            elif tie_type == "stop":
+                tie = TIE_CONTINUE if tie == TIE_START else TIE_STOP
+        row["tie"] = tie
+        if is_rest:
+            row["kind"] = KIND_REST
+            if mx_note.find("rest").get("measure") == "yes" and (
+                not type_text or type_text in ("whole", "breve")
+            ):
+                row["_full_measure"] = True
+                state.full_measure_rest = True
+            return row
+        mx_pitch = mx_note.find("pitch")
+        if mx_pitch is None:
+            if mx_note.find("unpitched") is None:
+                raise self.error("note without pitch")
+            row["kind"] = KIND_UNPITCHED
+            return row
+        step = _stripped(mx_pitch.find("step")).upper()
+        octave_text = _stripped(mx_pitch.find("octave"))
+        octave = int(octave_text) if octave_text else 4
+        alter_text = _stripped(mx_pitch.find("alter"))
+        alter = float(alter_text) if alter_text else None
+        modifier = None
+        accidental_text = _stripped(mx_note.find("accidental"))
+        if accidental_text:
+            modifier, accidental_alter = _accidental_from_name(accidental_text)
+            if modifier is not None and alter is None:
+                alter = accidental_alter
+        if alter is None:
+            alter = 0.0
+        if alter != int(alter):
+            raise self.error("microtonal pitches are not supported")
+        if modifier is None:
+            modifier = _accidental_modifier(alter) if alter_text else ""
+        step_index = STEPS.find(step)
+        if step_index < 0 or len(step) != 1:
+            raise self.error(f"invalid step {step}")
+        row["kind"] = KIND_NOTE
+        row["step"] = step_index
+        row["alter"] = alter
+        row["octave"] = octave
+        row["midi"] = (octave + 1) * 12 + _STEP_PITCH_CLASS[step_index] + int(alter)
+        row["name"] = f"{step}{modifier}{octave}"
+        return row
+
+    def _lyrics(self, mx_lyrics: List[ET.Element]) -> Tuple[int, int]:
+        if len(mx_lyrics) == 0:
+            return -1, 0
+        start = len(self.lyric_texts)
+        current_number = 1
+        for mx_lyric in mx_lyrics:
+            texts = mx_lyric.findall("text")
+            if len(texts) == 0:
+                text = ""
+            elif len(texts) == 1:
+                text = texts[0].text.strip() if texts[0].text is not None else ""
+            else:
+                elisions = mx_lyric.findall("elision")
+                text = texts[0].text.strip() if texts[0].text is not None else ""
+                for i, mx_text in enumerate(texts[1:]):
+                    elision = " "
+                    if i < len(elisions):
+                        elision = elisions[i].text or ""
+                    component = mx_text.text.strip() if mx_text.text is not None else ""
+                    text += elision + component
+            try:
+                number = int(mx_lyric.get("number"))
+            except (TypeError, ValueError):
+                number = 0
+            if number == 0:
+                number = current_number
+            self.lyric_texts.append(text)
+            self.lyric_numbers.append(number)
+            current_number += 1
+        return start, len(mx_lyrics)
+
+    def _parse_forward(self, mx_forward: ET.Element, state: "_MeasureState"):
+        change = self._duration(mx_forward)
+        if change is None:
+            return
+        row = _rest_row(state.measure, state.position, change, self.next_index())
+        state.add_row(row, _stripped(mx_forward.find("voice")))
+        state.position += change
+        state.ended_with_forward = row
+
+    def _parse_direction(self, mx_direction: ET.Element, state: "_MeasureState"):
+        offset = state.position + self._offset(mx_direction)
+        metronome_added = False
+        for mx_type in mx_direction.findall("direction-type"):
+            for mx_specific in mx_type:
+                tag = mx_specific.tag
+                if tag == "dynamics":
+                    for _ in mx_specific:
+                        state.add_mark(offset, _SORT_DYNAMIC, "Dynamic", self.next_index())
+                elif tag in ("segno", "coda"):
+                    cls = "Segno" if tag == "segno" else "Coda"
+                    state.add_mark(offset, _SORT_NOTE, cls, self.next_index(), repeat=True)
+                elif tag == "metronome":
+                    state.add_mark(offset, _SORT_METRONOME, "MetronomeMark", self.next_index())
+                    metronome_added = True
+                elif tag == "rehearsal":
+                    state.add_mark(offset, _SORT_TEXT, "RehearsalMark", self.next_index())
+                elif tag == "words":
+                    text = _stripped(mx_specific)
+                    repeat_expression = _repeat_expression(text)
+                    if repeat_expression is not None:
+                        cls, sort_order = repeat_expression
+                        state.add_mark(
+                            offset, sort_order, cls, self.next_index(), repeat=True, payload=text
+                        )
+                    else:
+                        state.add_mark(
+                            offset, _SORT_TEXT, "TextExpression", self.next_index(), payload=text
+                        )
+        if not metronome_added:
+            for mx_sound in mx_direction.findall("sound"):
+                self._parse_sound(mx_sound, state, offset)
+
+    def _parse_sound(self, mx_sound: ET.Element, state: "_MeasureState", offset: Fraction):
+        if "tempo" in mx_sound.attrib:
+            try:
+                tempo = float(mx_sound.get("tempo", 0))
+            except ValueError:
+                raise self.error("invalid tempo")
+            if tempo != 0:
+                state.add_mark(offset, _SORT_METRONOME, "MetronomeMark", self.next_index())
+
+    def _parse_attributes(self, mx_attributes: ET.Element, state: "_MeasureState"):
+        for mx_sub in mx_attributes:
+            tag = mx_sub.tag
+            if tag == "divisions":
+                self.divisions = _opfrac(Fraction(mx_sub.text.strip()))
+            elif tag == "staves":
+                if int(mx_sub.text) > 1:
+                    raise self.error("multiple staves are not supported")
+            elif tag == "time":
+                if mx_sub.find("senza-misura") is not None:
+                    raise self.error("senza-misura is not supported")
+                time_signature = _time_signature_from_xml(ET.tostring(mx_sub))
+                state.add_mark(
+                    state.position,
+                    _SORT_TIME_SIGNATURE,
+                    "TimeSignature",
+                    self.next_index(),
+                    payload=time_signature,
+                )
+            elif tag == "key":
+                fifths = _stripped(mx_sub.find("fifths"))
+                if not fifths:
+                    raise self.error("non traditional key signatures are not supported")
+                mode = _stripped(mx_sub.find("mode"))
+                cls = "Key" if mode in ("major", "minor") else "KeySignature"
+                self.last_key = int(fifths)
+                state.add_mark(
+                    state.position,
+                    _SORT_KEY_SIGNATURE,
+                    cls,
+                    self.next_index(),
+                    payload=(int(fifths), mode or None),
+                )
+            elif tag == "clef":
+                state.add_mark(state.position, _SORT_CLEF, "Clef", self.next_index())
+            elif tag == "staff-details":
+                key = (int(mx_sub.get("number") or 1), state.position)
+                if key not in state.staff_layouts:
+                    state.staff_layouts.add(key)
+                    state.add_mark(
+                        state.position, _SORT_LAYOUT, "StaffLayout", self.next_index()
+                    )
+
+    def _parse_barline(self, mx_barline: ET.Element, state: "_MeasureState"):
+        mx_repeat = mx_barline.find("repeat")
+        payload = None
+        if mx_repeat is not None:
+            direction = (mx_repeat.get("direction") or "").lower()
+            if direction == "forward":
+                payload = "start"
+            elif direction == "backward":
+                payload = "end"
+            else:
+                raise self.error("invalid repeat direction")
+            cls = "Repeat"
+        else:
+            cls = "Barline"
+        location = mx_barline.get("location") or "right"
+        repeat = cls == "Repeat"
+        if location == "left":
+            if state.left_barline is not None:
+                state.marks.remove(state.left_barline)
+            state.left_barline = state.add_mark(
+                Fraction(0), _SORT_BARLINE, cls, self.next_index(), repeat, payload
+            )
+        elif location == "right":
+            state.marks = [mark for mark in state.marks if not mark.at_end]
+            state.add_mark(
+                Fraction(0), _SORT_BARLINE, cls, self.next_index(), repeat, payload, at_end=True
+            )
+        else:
+            state.add_mark(
+                self._highest_time(state), _SORT_BARLINE, cls, self.next_index(), repeat, payload
+            )
+
+    def _time_signature_at_start(self, state: "_MeasureState") -> Optional[TimeSignature]:
+        for mark in state.marks:
+            if mark.cls == "TimeSignature" and mark.offset == 0 and not mark.at_end:
+                return mark.payload
+        return None
+
+    def _fix_full_measure_rest(self, state: "_MeasureState", bar: Fraction):
+        rests = [
+            row
+            for row in state.rows
+            if row["kind"] == KIND_REST and not row["in_voice"]
+        ]
+        if len(rests) == 0:
+            raise self.error("full measure rest inside a voice")
+        rest = min(rests, key=_row_sort_key)
+        if rest["_full_measure"] or (
+            rest["_ql"] != bar
+            and rest["_type"] in ("whole", "breve")
+            and rest["dots"] == 0
+            and not rest["_tuplets"]
+        ):
+            rest["_ql"] = bar
+            rest["duration"] = float(bar)
+
+    @staticmethod
+    def _highest_time(state: "_MeasureState") -> Fraction:
+        highest = Fraction(0)
+        for row in state.rows:
+            if row["chord"] == CHORD_MEMBER:
+                continue
+            highest = max(highest, row["_offset"] + row["_ql"])
+        for mark in state.marks:
+            if not mark.at_end:
+                highest = max(highest, mark.offset)
+        return highest
+
+    @staticmethod
+    def _lowest_offset(state: "_MeasureState") -> Fraction:
+        offsets = [row["_offset"] for row in state.rows]
+        offsets += [mark.offset for mark in state.marks if not mark.at_end]
+        if state.use_voices:
+            offsets.append(Fraction(0))
+        return min(offsets) if offsets else Fraction(0)
+
+    def finish_parsing(self):
+        """
+        Same as music21's `removeEndForwardRest`.
+        """
+        forward = self.ended_with_forward
+        if forward is None or self.has_voices[-1]:
+            return
+        measure = len(self.measure_numbers) - 1
+        rows = [row for row in self.rows if row["measure"] == measure]
+        last = max(rows, key=_row_sort_key)
+        if last is forward:
+            self.rows.remove(forward)
+            state = _MeasureState(measure, None)
+            state.rows = [row for row in rows if row is not forward]
+            state.marks = [mark for mark in self.marks if mark.measure == measure]
+            self.measure_highest[-1] = self._highest_time(state)
+            self.measure_lowest[-1] = self._lowest_offset(state)
+
+    # -- post-processing ---------------------------------------------------
+
+    def make_rests(self):
+        """
+        Same as `score.makeRests()` for this part: fills every measure with a rest up
+        to the bar duration and moves the measures accordingly.
+        """
+        n_measures = len(self.measure_numbers)
+        if n_measures == 0:
+            self.measure_offsets = []
+            self.measure_durations = []
+            return
+        part_highest = max(
+            offset + highest
+            for offset, highest in zip(self.measure_parse_offsets, self.measure_highest)
+        )
+        last_time_signature = None
+        accumulated = Fraction(0)
+        # as in music21, the target is never reset between measures, so it is the
+        # shortest bar seen so far
+        target = part_highest
+        for measure in range(n_measures):
+            last_time_signature = (
+                self.measure_time_signatures[measure] or last_time_signature
+            )
+            bar = _bar_duration(
+                last_time_signature or _time_signature(_DEFAULT_TIME_SIGNATURE)
+            )
+            lowest = self.measure_lowest[measure]
+            highest = self.measure_highest[measure]
+            if lowest > 0:
+                self.rows.append(_rest_row(measure, Fraction(0), lowest, self.next_index()))
+            target = min(bar, target)
+            if target - highest > 0:
+                self.rows.append(
+                    _rest_row(measure, highest, target - highest, self.next_index())
+                )
+                highest = target
+            self.measure_offsets.append(accumulated)
+            self.measure_durations.append(highest)
+            accumulated += highest
+        self._check_rest_overflow()
+
+    def _check_rest_overflow(self):
+        # music21 splits rests exceeding the bar and moves the remainder to the next
+        # measure: this is not reproduced
+        time_signature = None
+        bars = []
+        for measure in range(len(self.measure_numbers)):
+            time_signature = self.measure_time_signatures[measure] or time_signature
+            bars.append(
+                _bar_duration(time_signature or _time_signature(_DEFAULT_TIME_SIGNATURE))
+            )
+        for row in self.rows:
+            if row["kind"] != KIND_REST:
+                continue
+            bar = bars[row["measure"]]
+            if row["_offset"] < bar < row["_offset"] + row["_ql"]:
+                raise self.error("rests exceeding the measure")
+
+    def has_layers(self, split_keywords: List[str]) -> bool:
+        sound = getattr(self.instrument, "instrumentSound", None)
+        if sound is None:
+            return False
+        if not any(keyword in sound for keyword in split_keywords):
+            return False
+        return any(self.has_voices)
+
+    def build(self, remove_unpitched_objects: bool) -> PartArrays:
+        rows = self.rows
+        if remove_unpitched_objects:
+            rows = [row for row in rows if row["kind"] != KIND_UNPITCHED]
+        measure_offsets = [float(offset) for offset in self.measure_offsets]
+        for row in rows:
+            row["offset"] = float(row["_offset"])
+            row["onset"] = measure_offsets[row["measure"]] + row["offset"]
+        rows.sort(
+            key=lambda row: (row["measure"], row["_offset"], not row["grace"], row["index"])
+        )
+        columns = {
+            field: np.array([row[field] for row in rows], dtype=_NOTE_DTYPES[field])
+            for field in NOTE_FIELDS
+        }
+        events = NoteArrays(columns, self.lyric_texts, self.lyric_numbers)
+        marks = sorted(
+            (
+                mark._replace(offset=float(mark.offset))
+                for mark in self.marks
+            ),
+            key=lambda mark: (mark.measure,) + _mark_sort_key(mark),
+        )
+        repeats = np.zeros(len(self.measure_numbers), dtype=np.int8)
+        for mark in marks:
+            if mark.repeat:
+                repeats[mark.measure] |= _repeat_flag(mark)
+        return PartArrays(
+            self.id,
+            self.part_name,
+            self.part_abbreviation,
+            self.instrument,
+            events,
+            np.array(self.measure_numbers, dtype=np.int32),
+            self.measure_suffixes,
+            np.array(measure_offsets, dtype=np.float64),
+            np.array([float(d) for d in self.measure_durations], dtype=np.float64),
+            np.array([float(p) for p in self.padding_left], dtype=np.float64),
+            np.array(self.has_voices, dtype=np.bool_),
+            self.measure_time_signatures,
+            self.measure_keys,
+            repeats,
+            marks,
+        )
+
+
+class _MeasureState:
+    """Parsing state of a single measure (music21's `MeasureParser`)."""
+
+    def __init__(self, measure: int, voices: Optional[set]):
+        self.measure = measure
+        self.voices = voices or set()
+        self.use_voices = voices is not None
+        self.position = Fraction(0)
+        self.rows = []
+        self.marks = []
+        self.chord = []
+        self.last_voice = None
+        self.note_count = 0
+        self.rest_count = 0
+        self.full_measure_rest = False
+        self.ended_with_forward = None
+        self.left_barline = None
+        self.staff_layouts = set()
+
+    def set_last_voice(self, voice: str):
+        self.last_voice = int(voice) if voice.isdigit() else voice
+
+    def add_row(self, row: dict, voice: str):
+        # same as MeasureParser.insertInMeasureOrVoice
+        if not self.use_voices:
+            return self.rows.append(row)
+        if voice:
+            self.set_last_voice(voice)
+        else:
+            voice = str(self.last_voice if self.last_voice is not None else 1)
+        if voice in self.voices:
+            row["in_voice"] = True
+            row["_voice"] = voice
+        self.rows.append(row)
+
+    def add_mark(
+        self,
+        offset: Fraction,
+        sort_order: int,
+        cls: str,
+        index: int,
+        repeat: bool = False,
+        payload=None,
+        at_end: bool = False,
+    ) -> Mark:
+        mark = Mark(self.measure, offset, sort_order, cls, at_end, index, repeat, payload)
+        self.marks.append(mark)
+        return mark
+
+
+# ---------------------------------------------------------------------------
+# post-processing shared by all the parts
+
+
+def _name_parts(builders: List[_PartBuilder]):
+    # same as musif.musicxml.common.name_parts
+    i = 0
+    for builder in builders:
+        increment = False
+        if builder.part_name is None:
+            builder.part_name = f"NoName{i}"
+            increment = True
+        if builder.part_abbreviation is None:
+            builder.part_abbreviation = f"NoName{i}"
+            increment = True
+        if increment:
+            i += 1
+
+
+def _fix_repeats(builders: List[_PartBuilder]):
+    # same as musif.musicxml.common.fix_repeats: the repeat marks are visited lazily,
+    # so marks copied into parts not yet visited are visited too, and the measures of
+    # every part are consumed through a single iterator shared by all the marks
+    repeat_marks = []
+    for builder in builders:
+        by_measure = [[] for _ in builder.measure_numbers]
+        for mark in builder.marks:
+            if mark.repeat:
+                by_measure[mark.measure].append(mark)
+        repeat_marks.append(by_measure)
+    cursors = [0] * len(builders)
+    for part, builder in enumerate(builders):
+        for measure, marks in enumerate(repeat_marks[part]):
+            if len(marks) == 0:
+                continue
+            measure_offset = builder.measure_offsets[measure]
+            for mark in sorted(marks, key=_mark_sort_key):
+                offset = builder.measure_durations[measure] if mark.at_end else mark.offset
+                for other, other_builder in enumerate(builders):
+                    offsets = other_builder.measure_offsets
+                    while cursors[other] < len(offsets):
+                        target = cursors[other]
+                        cursors[other] += 1
+                        if offsets[target] != measure_offset:
+                            continue
+                        target_marks = repeat_marks[other][target]
+                        if mark.cls not in [m.cls for m in target_marks]:
+                            copy = mark._replace(
+                                measure=target,
+                                offset=offset,
+                                at_end=False,
+                                index=other_builder.next_index(),
+                            )
+                            target_marks.append(copy)
+                            other_builder.marks.append(copy)
+                        break
+
+
+# ---------------------------------------------------------------------------
+# helpers
+
+
+def _stripped(element: Optional[ET.Element]) -> str:
+    if element is None or element.text is None:
+        return ""
+    return element.text.strip()
+
+
+def _opfrac(value) -> Fraction:
+    return Fraction(common.opFrac(value))
+
+
+@lru_cache(maxsize=None)
+def _quarter_length(text: str, divisions: Fraction) -> Fraction:
+    # durations and offsets are repeated a lot: convert each of them only once
+    return _opfrac(Fraction(text) / divisions)
+
+
+def _empty_row(measure: int, offset: Fraction) -> dict:
+    return {
+        "midi": -1,
+        "step": 0,
+        "alter": 0.0,
+        "octave": 0,
+        "offset": 0.0,
+        "onset": 0.0,
+        "duration": 0.0,
+        "measure": measure,
+        "tie": TIE_NONE,
+        "voice": 0,
+        "lyric": -1,
+        "lyric_count": 0,
+        "dots": 0,
+        "kind": KIND_REST,
+        "chord": CHORD_NONE,
+        "grace": False,
+        "in_voice": False,
+        "index": 0,
+        "name": "",
+        "_offset": offset,
+        "_ql": Fraction(0),
+        "_type": None,
+        "_tuplets": False,
+        "_full_measure": False,
+        "_voice": None,
+    }
+
+
+def _rest_row(
+    measure: int,
+    offset: Fraction,
+    ql: Fraction,
+    index: int,
+    in_voice: bool = False,
+    voice: Optional[str] = None,
+) -> dict:
+    row = _empty_row(measure, offset)
+    row["_ql"] = ql
+    row["duration"] = float(ql)
+    row["dots"], row["_type"] = _raw_duration(ql)
+    row["index"] = index
+    row["in_voice"] = in_voice
+    row["_voice"] = voice
+    return row
+
+
+def _row_sort_key(row: dict) -> tuple:
+    return (row["_offset"], not row["grace"], row["index"])
+
+
+def _row_class(events: NoteArrays, row: int) -> str:
+    kind = events.kind[row]
+    if kind == KIND_REST:
+        return "Rest"
+    if events.chord[row] == CHORD_HEAD:
+        return "PercussionChord" if kind == KIND_UNPITCHED else "Chord"
+    return "Unpitched" if kind == KIND_UNPITCHED else "Note"
+
+
+def _mark_sort_key(mark: Mark) -> tuple:
+    return (mark.at_end, mark.offset, mark.sort_order, True, mark.index)
+
+
+def _repeat_flag(mark: Mark) -> int:
+    if mark.cls == "Repeat":
+        return REPEAT_START if mark.payload == "start" else REPEAT_END
+    if mark.cls == "Segno":
+        return REPEAT_SEGNO
+    if mark.cls == "Coda":
+        return REPEAT_CODA
+    return REPEAT_EXPRESSION
+
+
+@lru_cache(maxsize=None)
+def _raw_duration(ql: Fraction) -> Tuple[int, str]:
+    duration = Duration(quarterLength=common.opFrac(ql))
+    return duration.dots, duration.type
+
+
+@lru_cache(maxsize=None)
+def _type_dots_length(duration_type: str, dots: int) -> Fraction:
+    return _opfrac(durationTupleFromTypeDots(duration_type, dots).quarterLength)
+
+
+def _duration_info(
+    type_text: Optional[str], dots: int, ql: Fraction, has_tuplets: bool
+) -> Tuple[int, Optional[str]]:
+    # same as MeasureParser.xmlToDuration: the duration is built from the quarter length
+    # unless the type, dots and time modification describe a different one
+    if not type_text:
+        return _raw_duration(ql)
+    duration_type = musicXMLTypeToType(type_text)
+    if not has_tuplets and _type_dots_length(duration_type, dots) == ql:
+        return _raw_duration(ql)
+    return dots, duration_type
+
+
+@lru_cache(maxsize=None)
+def _accidental_from_name(name: str) -> Tuple[Optional[str], Optional[float]]:
+    mx_accidental = ET.Element("accidental")
+    mx_accidental.text = name
+    try:
+        accidental = MeasureParser().xmlToAccidental(mx_accidental)
+    except Exception:
+        return None, None
+    return accidental.modifier, float(accidental.alter)
+
+
+@lru_cache(maxsize=None)
+def _accidental_modifier(alter: float) -> str:
+    return Accidental(alter).modifier
+
+
+@lru_cache(maxsize=None)
+def _time_signature(ratio: str) -> TimeSignature:
+    return TimeSignature(ratio)
+
+
+@lru_cache(maxsize=None)
+def _time_signature_from_xml(mx_time: bytes) -> TimeSignature:
+    return MeasureParser().xmlToTimeSignature(ET.fromstring(mx_time))
+
+
+_BAR_DURATIONS = {}
+
+
+def _bar_duration(time_signature: TimeSignature) -> Fraction:
+    key = id(time_signature)
+    if key not in _BAR_DURATIONS:
+        _BAR_DURATIONS[key] = _opfrac(time_signature.barDuration.quarterLength)
+    return _BAR_DURATIONS[key]
+
+
+_BEATS = {}
+
+
+def _meter_offset(time_signature: TimeSignature, offset: float, ts_offset: float) -> Fraction:
+    # same as TimeSignature.getMeasureOffsetOrMeterModulusOffset
+    offset, ts_offset = _opfrac(offset), _opfrac(ts_offset)
+    bar = _bar_duration(time_signature)
+    if offset + ts_offset < bar:
+        return offset
+    return (offset - ts_offset) % bar
+
+
+def _beat_str(time_signature: TimeSignature, position: Fraction) -> str:
+    key = (id(time_signature), position, "str")
+    if key not in _BEATS:
+        _BEATS[key] = time_signature.getBeatProportionStr(common.opFrac(position))
+    return _BEATS[key]
+
+
+def _beat_strength(time_signature: TimeSignature, position: Fraction) -> float:
+    key = (id(time_signature), position, "strength")
+    if key not in _BEATS:
+        _BEATS[key] = time_signature.getAccentWeight(
+            common.opFrac(position), forcePositionMatch=True, permitMeterModulus=False
+        )
+    return _BEATS[key]
+
+
+@lru_cache(maxsize=None)
+def _repeat_expression(text: str) -> Optional[Tuple[str, int]]:
+    expression = TextExpression(text).getRepeatExpression()
+    if expression is None:
+        return None
+    return type(expression).__name__, expression.classSortOrder
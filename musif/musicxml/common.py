@@ -1,16 +1,17 @@
 from copy import deepcopy
-from typing import List, Tuple
-import itertools
+from typing import List, Optional, Tuple
 
-from music21.interval import Interval
+import numpy as np
 from music21.note import Note
 from music21.repeat import RepeatMark
-from music21.scale import MajorScale, MinorScale
 from music21.stream.base import Measure, Part, Score, Voice
 from music21.text import assembleLyrics
 from roman import toRoman
 
 from musif.cache import isinstance
+from musif.musicxml.arrays import NoteArrays, PartArrays
+from musif.musicxml.intervals import IntervalArray
+from musif.musicxml.key import get_degree_and_accidental, get_degree_histogram
 
 
 def is_voice(part: Part) -> bool:
@@ -111,9 +112,13 @@ def get_notes_and_measures(
     Parameters
     ----------
     part : Part
-      Music21 part to extract the info from.
+      Music21 part to extract the info from. If it is a `PartArrays` produced by the
+      fast parser, `NoteArrays` are returned instead of lists of notes, and measure
+      indices instead of measures.
 
     """
+    if isinstance(part, PartArrays):
+        return part.notes_and_measures()
 
     measures = list(part.getElementsByClass(Measure))
     sounding_measures = [
@@ -183,31 +188,46 @@ def _get_part_clef(part):
     return ""
 
 
-def _get_degrees_and_accidentals(key: str, notes: List[Note]) -> List[Tuple[str, str]]:
-    if "major" in key.split():
-        scl = MajorScale(key.split(" ")[0])
-    else:
-        scl = MinorScale(key.split(" ")[0])
+def get_measures(part: Part) -> list:
+    """
+    Returns the measures of a part. For a `PartArrays` produced by the fast parser,
+    a list of `MeasureHeader` is returned, which only provides `measureNumber` and
+    `timeSignature`.
+    """
+    if isinstance(part, PartArrays):
+        return part.measure_headers()
+    return part.getElementsByClass(Measure)
 
-    degrees = [
-        scl.getScaleDegreeAndAccidentalFromPitch(note.pitches[0]) for note in notes
-    ]
 
-    return [(degree[0], degree[1].fullName if degree[1] else "") for degree in degrees]
+def _get_pitch_names(notes: List[Note]) -> List[str]:
+    if isinstance(notes, NoteArrays):
+        return notes.pitch_names()
+    return [note.pitches[0].name for note in notes]
 
 
-def _get_intervals(notes: List[Note]) -> List[Interval]:
+def _get_degrees_and_accidentals(key: str, notes: List[Note]) -> List[Tuple[str, str]]:
     return [
-        Interval(notes[i].pitches[0], notes[i + 1].pitches[0])
-        for i in range(len(notes) - 1)
+        get_degree_and_accidental(key, name) for name in _get_pitch_names(notes)
     ]
 
 
+def _get_degree_histogram(key: str, notes: List[Note]) -> np.ndarray:
+    return get_degree_histogram(key, _get_pitch_names(notes))
+
+
+def _get_intervals(notes: List[Note]) -> IntervalArray:
+    if isinstance(notes, NoteArrays):
+        return notes.intervals()
+    return IntervalArray.from_notes(notes)
+
+
 def _contains_text(part: Part) -> bool:
     return assembleLyrics(part)
 
 
 def _get_lyrics_in_notes(notes: List[Note]) -> List[str]:
+    if isinstance(notes, NoteArrays):
+        return notes.lyrics()
     lyrics = []
     for note in notes:
         if note.lyrics is None or len(note.lyrics) == 0:
@@ -219,25 +239,44 @@ def _get_lyrics_in_notes(notes: List[Note]) -> List[str]:
     return lyrics
 
 
-def fix_repeats(score: Score):
+def fix_repeats(score: Score, inserted: Optional[List[list]] = None):
     """Fix the repeat sign in the score by ensuring that all the parts have
-    the same signs"""
+    the same signs.
+
+    If `inserted` is a list, it is filled with a list for each part, containing the
+    signs inserted in that part as tuples `(measure index, offset, sign)`, so that
+    they can be inserted again in a part parsed alone (see `insert_repeat_marks`)."""
     signs = score.recurse().getElementsByClass("RepeatMark")
     # measure_parts is an iterator, but successive loops won't restart from index
     # 0 but from where the previous one was left
-    # for this, we use itertools.chain to force the creation of a proper
+    # for this, we use enumerate to force the creation of a proper
     # iterator
     measure_parts = [
-        itertools.chain(p.getElementsByClass("Measure")) for p in score.parts
+        enumerate(p.getElementsByClass("Measure")) for p in score.parts
     ]
+    if inserted is not None:
+        inserted[:] = [[] for _ in measure_parts]
     for sign in signs:
         measure_sign = sign.activeSite
         measure_sign_offset = measure_sign.offset
         offset_sign = sign.offset
-        for measures in measure_parts:
-            for m in measures:
+        for part_index, measures in enumerate(measure_parts):
+            for measure_index, m in measures:
                 if m.offset == measure_sign_offset:
                     marks = m.getElementsByClass("RepeatMark")
                     if sign.__class__ not in [mark.__class__ for mark in marks]:
                         m.insert(offset_sign, sign)
+                        if inserted is not None:
+                            inserted[part_index].append(
+                                (measure_index, offset_sign, sign)
+                            )
                     break
+
+
+def insert_repeat_marks(part: Part, repeat_marks: List[tuple]):
+    """Inserts in `part` a copy of the signs that `fix_repeats` inserted in it when
+    it was parsed with the rest of the score. `repeat_marks` is one of the lists
+    filled by `fix_repeats`."""
+    measures = list(part.getElementsByClass("Measure"))
+    for measure_index, offset, sign in repeat_marks:
+        measures[measure_index].insert(offset, deepcopy(sign))
@@ -0,0 +1,143 @@
+"""
+Index of the elements of the measures of a part by class.
+
+The elements of every measure (`measure.elements`) are read once, and the feature
+modules look up the notes, rests, dynamics, text expressions, time signatures, ... of
+a part in the index, instead of traversing the measures again and classifying each
+element. The index is built by the `core` module and stored in `part_data["events"]`.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+from music21.note import GeneralNote, Note, NotRest
+from music21.stream.base import Measure
+
+from musif.cache import isinstance
+from musif.musicxml.arrays import PartArrays
+
+_ARRAYS_GENERAL_NOTES = ("Note", "Rest", "Chord", "Unpitched", "PercussionChord")
+_ARRAYS_NOT_RESTS = ("Note", "Chord", "Unpitched", "PercussionChord")
+
+
+class PartEvents:
+    """
+    The elements of the measures of a part, in the order of `measure.elements`, measure
+    by measure.
+
+    - `measures` are the measures of the part (music21 `Measure` objects, or measure
+      indices for a `PartArrays` of the fast parser, whose elements are the `Element`
+      tuples returned by `PartArrays.measure_elements`)
+    - `elements` are the elements, and `classes` their music21 class names
+      (`element.classes[0]`)
+    - `element_measures` is the index of the measure of each element in `measures`,
+      and the elements of measure `i` are those from `measure_starts[i]` to
+      `measure_starts[i + 1]`
+    - `is_note`, `is_not_rest` and `is_general_note` flag the elements returned by
+      `[n for n in measure.notes if isinstance(n, Note)]`, `measure.notes` and
+      `measure.notesAndRests`
+    """
+
+    def __init__(self, part, measures: Optional[list] = None):
+        self.part = part
+        if measures is None:
+            if isinstance(part, PartArrays):
+                measures = list(range(part.measure_count))
+            else:
+                measures = list(part.getElementsByClass(Measure))
+        self.measures = measures
+        self.elements = []
+        classes = []
+        element_measures = []
+        is_note, is_not_rest, is_general_note = [], [], []
+        if isinstance(part, PartArrays):
+            for i, measure in enumerate(measures):
+                for element in part.measure_elements(measure):
+                    self.elements.append(element)
+                    classes.append(element.cls)
+                    element_measures.append(i)
+                    is_note.append(element.cls == "Note")
+                    is_not_rest.append(element.cls in _ARRAYS_NOT_RESTS)
+                    is_general_note.append(element.cls in _ARRAYS_GENERAL_NOTES)
+        else:
+            for i, measure in enumerate(measures):
+                for element in measure.elements:
+                    self.elements.append(element)
+                    classes.append(element.classes[0])
+                    element_measures.append(i)
+                    general_note = isinstance(element, GeneralNote)
+                    is_general_note.append(general_note)
+                    is_not_rest.append(general_note and isinstance(element, NotRest))
+                    is_note.append(general_note and isinstance(element, Note))
+        self.classes = np.array(classes, dtype=object)
+        self.element_measures = np.array(element_measures, dtype=np.int64)
+        self.measure_starts = np.searchsorted(
+            self.element_measures, np.arange(len(measures) + 1)
+        )
+        self.is_note = np.array(is_note, dtype=bool)
+        self.is_not_rest = np.array(is_not_rest, dtype=bool)
+        self.is_general_note = np.array(is_general_note, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def __repr__(self) -> str:
+        return f"<PartEvents measures={len(self.measures)} elements={len(self)}>"
+
+    def window(self, first: int, last: int) -> "PartEvents":
+        """
+        Returns the index of the measures from `first` to `last` (excluded).
+        """
+        start, stop = self.measure_starts[first], self.measure_starts[last]
+        window = PartEvents.__new__(PartEvents)
+        window.part = self.part
+        window.measures = self.measures[first:last]
+        window.elements = self.elements[start:stop]
+        window.classes = self.classes[start:stop]
+        window.element_measures = self.element_measures[start:stop] - first
+        window.measure_starts = self.measure_starts[first : last + 1] - start
+        window.is_note = self.is_note[start:stop]
+        window.is_not_rest = self.is_not_rest[start:stop]
+        window.is_general_note = self.is_general_note[start:stop]
+        return window
+
+    def positions(self, *classes: str) -> np.ndarray:
+        """
+        Returns the positions in `elements` of the elements of the given classes.
+        """
+        return np.flatnonzero(np.isin(self.classes, classes))
+
+    def of_class(self, *classes: str) -> list:
+        """
+        Returns the elements of the given classes, in order.
+        """
+        return [self.elements[i] for i in self.positions(*classes).tolist()]
+
+    def measure_elements(self, measure: int) -> list:
+        """
+        Returns the elements of the `measure`-th measure.
+        """
+        return self.elements[
+            self.measure_starts[measure] : self.measure_starts[measure + 1]
+        ]
+
+    def sounding_measures(self) -> List[int]:
+        """
+        Returns the indices of the measures containing notes.
+        """
+        counts = np.bincount(
+            self.element_measures[self.is_not_rest], minlength=len(self.measures)
+        )
+        return np.flatnonzero(counts).tolist()
+
+    def notes_and_measures(self) -> Tuple[list, list, List[int], list]:
+        """
+        Same as `musif.musicxml.common.get_notes_and_measures` for a music21 part:
+        returns the notes, the measures, the indices of the measures containing notes
+        and the notes and rests.
+        """
+        return (
+            [self.elements[i] for i in np.flatnonzero(self.is_note).tolist()],
+            self.measures,
+            self.sounding_measures(),
+            [self.elements[i] for i in np.flatnonzero(self.is_general_note).tolist()],
+        )
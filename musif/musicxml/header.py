@@ -0,0 +1,283 @@
+"""
+Score header pre-pass: the metadata of a MusicXML file read in a single streaming pass.
+
+`read_score_header` walks the document with `xml.etree.ElementTree.iterparse`, clearing
+every measure once it has been seen, and collects the numeric tempo, the initial key
+and time signatures, the part list with the instrument sounds and the number of
+measures of each part. `.mxl` files are supported.
+
+The fast parser (:mod:`musif.musicxml.arrays`) fills the same :class:`ScoreHeader`
+during its own pass, so that the file is never read twice. On the music21 path, the
+document is read once with `read_musicxml` and both music21 and `read_score_header`
+parse it from memory.
+"""
+import xml.etree.ElementTree as ET
+import zipfile
+from io import BytesIO
+from pathlib import PurePath
+from typing import IO, Optional, Union
+
+from music21.musicxml.xmlToM21 import PartParser
+
+
+class PartHeader:
+    """
+    Metadata of a part, as declared in the `<part-list>` of the MusicXML file.
+
+    `instrument_sound` is the `instrumentSound` of the instrument that music21 creates
+    for the part (None if music21 would not set it), and `measure_count` the number of
+    `<measure>` elements of the part.
+    """
+
+    def __init__(
+        self,
+        part_id: str,
+        name: Optional[str],
+        abbreviation: Optional[str],
+        instrument_sound: Optional[str],
+    ):
+        self.id = part_id
+        self.name = name
+        self.abbreviation = abbreviation
+        self.instrument_sound = instrument_sound
+        self.measure_count = 0
+
+    def __repr__(self) -> str:
+        return f"<PartHeader {self.id} {self.name} measures={self.measure_count}>"
+
+
+class ScoreHeader:
+    """
+    Metadata of a MusicXML score.
+
+    - `numeric_tempo`: the `tempo` attribute of the `<sound>` of the first `<direction>`
+      of the first measure of the first part, or `'NA'`
+    - `key_fifths` and `key_mode`: the first key signature of the first part (None if
+      missing)
+    - `time_signature`: the first time signature of the first part as a string, e.g.
+      `'3/4'` (None if missing)
+    - `parts`: a list of :class:`PartHeader`, in the order of the `<part>` elements
+    """
+
+    def __init__(self, file_path: str):
+        self.file = file_path
+        self.numeric_tempo = "NA"
+        self.key_fifths = None
+        self.key_mode = None
+        self.time_signature = None
+        self.parts = []
+
+    def __repr__(self) -> str:
+        return f"<ScoreHeader {self.file} parts={len(self.parts)}>"
+
+    def get_part(self, part_id: str) -> Optional[PartHeader]:
+        """
+        Returns the header of the part with id `part_id`, or None.
+        """
+        for part in self.parts:
+            if part.id == part_id:
+                return part
+        return None
+
+    @property
+    def measure_count(self) -> int:
+        """
+        The number of measures of the first part (0 if the score has no parts).
+        """
+        return self.parts[0].measure_count if len(self.parts) > 0 else 0
+
+
+class ScoreHeaderReader:
+    """
+    Builds a :class:`ScoreHeader` from the elements of a MusicXML document, as they are
+    found by a streaming parser.
+
+    `score_part` must be called for each `<score-part>`, `part` when a `<part>` starts
+    (optionally with its :class:`PartHeader`, if the caller has already built it) and
+    `measure` for each complete `<measure>` (before it is cleared).
+    """
+
+    def __init__(self, file_path: str):
+        self.header = ScoreHeader(file_path)
+        self._score_parts = {}
+        self._current = None
+
+    def score_part(self, element: ET.Element):
+        self._score_parts[element.get("id")] = element
+
+    def part(self, part_id: Optional[str], part_header: Optional[PartHeader] = None):
+        if part_header is None:
+            if part_id is None and len(self._score_parts) > 0:
+                part_id = next(iter(self._score_parts))
+            score_part = self._score_parts.get(part_id)
+            if score_part is None:
+                part_header = PartHeader(part_id, None, None, None)
+            else:
+                part_header = _part_header(score_part, part_id)
+        self._current = part_header
+        self.header.parts.append(part_header)
+
+    def measure(self, element: ET.Element):
+        if self._current is None:
+            return
+        self._current.measure_count += 1
+        if len(self.header.parts) == 1 and self._current.measure_count == 1:
+            self._first_measure(element)
+
+    def _first_measure(self, element: ET.Element):
+        header = self.header
+        # only the first direction of the measure is considered
+        try:
+            header.numeric_tempo = int(
+                element.find("direction").find("sound").get("tempo")
+            )
+        except Exception:
+            header.numeric_tempo = "NA"
+        for mx_attributes in element.findall("attributes"):
+            mx_key = mx_attributes.find("key")
+            if header.key_fifths is None and mx_key is not None:
+                fifths = _text(mx_key.find("fifths"))
+                if fifths is not None and fifths.lstrip("-").isdigit():
+                    header.key_fifths = int(fifths)
+                    header.key_mode = _text(mx_key.find("mode"))
+            mx_time = mx_attributes.find("time")
+            if header.time_signature is None and mx_time is not None:
+                header.time_signature = _time_signature(mx_time)
+
+
+def open_musicxml(file_path: Union[str, PurePath]) -> IO[bytes]:
+    """
+    Opens a MusicXML file for reading, decompressing it if it is a `.mxl` file.
+
+    Parameters
+    ----------
+    file_path: Union[str, PurePath]
+      Path to a `.xml`, `.musicxml` or `.mxl` file.
+
+    Returns
+    -------
+    IO[bytes]
+      A binary file-like object with the MusicXML document.
+
+    Raises
+    ------
+    ValueError
+      If a `.mxl` archive does not contain any MusicXML document.
+    """
+    file_path = str(file_path)
+    if not file_path.lower().endswith(".mxl"):
+        return open(file_path, "rb")
+    with zipfile.ZipFile(file_path) as archive:
+        names = archive.namelist()
+        root_file = None
+        if "META-INF/container.xml" in names:
+            container = ET.fromstring(archive.read("META-INF/container.xml"))
+            for element in container.iter():
+                if element.tag.endswith("rootfile") and element.get("full-path"):
+                    root_file = element.get("full-path")
+                    break
+        if root_file is None:
+            candidates = [
+                name
+                for name in names
+                if not name.startswith("META-INF")
+                and name.lower().endswith((".xml", ".musicxml"))
+            ]
+            if len(candidates) == 0:
+                raise ValueError(f"No MusicXML document in archive {file_path}")
+            root_file = candidates[0]
+        return archive.open(root_file)
+
+
+def read_musicxml(file_path: Union[str, PurePath]) -> bytes:
+    """
+    Reads the MusicXML document of a file, decompressing it if it is a `.mxl` file.
+
+    Parameters
+    ----------
+    file_path: Union[str, PurePath]
+      Path to a `.xml`, `.musicxml` or `.mxl` file.
+
+    Returns
+    -------
+    bytes
+      The MusicXML document.
+    """
+    with open_musicxml(file_path) as source:
+        return source.read()
+
+
+def read_score_header(
+    file_path: Union[str, PurePath], data: Optional[bytes] = None
+) -> ScoreHeader:
+    """
+    Reads the :class:`ScoreHeader` of a MusicXML file in a single streaming pass.
+
+    Parameters
+    ----------
+    file_path: Union[str, PurePath]
+      Path to a `.xml`, `.musicxml` or `.mxl` file.
+    data: Optional[bytes]
+      The MusicXML document of the file, as returned by `read_musicxml`, if it was
+      already read; the file is not opened then.
+
+    Returns
+    -------
+    ScoreHeader
+      The header of the score. If the file cannot be read, the header has no parts and
+      its numeric tempo is `'NA'`.
+    """
+    reader = ScoreHeaderReader(str(file_path))
+    depth = 0
+    try:
+        source = BytesIO(data) if data is not None else open_musicxml(file_path)
+        with source:
+            for event, element in ET.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 2 and element.tag == "part":
+                        reader.part(element.get("id"))
+                    continue
+                depth -= 1
+                if depth == 1 and element.tag == "part-list":
+                    for score_part in element.iter("score-part"):
+                        reader.score_part(score_part)
+                elif depth == 1 and element.tag == "part":
+                    element.clear()
+                elif depth == 2 and element.tag == "measure":
+                    reader.measure(element)
+                    element.clear()
+    except Exception:
+        return ScoreHeader(str(file_path))
+    return reader.header
+
+
+def _part_header(score_part: ET.Element, part_id: str) -> PartHeader:
+    parser = PartParser(mxScorePart=score_part)
+    parser.partId = part_id
+    parser.parseXmlScorePart()
+    # the names are cached by music21 before the instrument is inserted in the part
+    parser.stream.coreElementsChanged()
+    instrument = parser.activeInstrument
+    return PartHeader(
+        parser.stream.id,
+        parser.stream.partName,
+        parser.stream.partAbbreviation,
+        instrument.instrumentSound if instrument is not None else None,
+    )
+
+
+def _text(element: Optional[ET.Element]) -> Optional[str]:
+    if element is None or element.text is None:
+        return None
+    return element.text.strip()
+
+
+def _time_signature(mx_time: ET.Element) -> Optional[str]:
+    if mx_time.find("senza-misura") is not None:
+        return None
+    beats = [_text(beat) for beat in mx_time.findall("beats")]
+    beat_types = [_text(beat_type) for beat_type in mx_time.findall("beat-type")]
+    if len(beats) == 0 or len(beat_types) == 0:
+        return None
+    return "+".join(f"{b}/{t}" for b, t in zip(beats, beat_types))
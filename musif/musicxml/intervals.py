@@ -0,0 +1,223 @@
+"""
+Melodic intervals between consecutive notes, stored as NumPy arrays.
+
+An :class:`IntervalArray` keeps, for every pair of consecutive notes, the distance in
+semitones and in diatonic steps, computed at once from the pitches of the notes instead
+of creating a music21 `Interval` for every pair. The names (e.g. 'M-3') and qualities of
+the intervals are read from tables filled once per distinct interval, since a corpus
+contains millions of intervals but only a few hundred distinct ones.
+"""
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+from music21.interval import (
+    ChromaticInterval,
+    GenericInterval,
+    Interval,
+    intervalFromGenericAndChromatic,
+)
+
+QUALITY_DOUBLE_AUGMENTED = 0
+QUALITY_AUGMENTED = 1
+QUALITY_MAJOR = 2
+QUALITY_PERFECT = 3
+QUALITY_MINOR = 4
+QUALITY_DOUBLE_DIMINISHED = 5
+QUALITY_DIMINISHED = 6
+QUALITY_UNKNOWN = -1
+
+
+class IntervalArray:
+    """
+    The intervals between consecutive notes, as `musif.musicxml.common._get_intervals`
+    returns them.
+
+    - `semitones` is music21's `Interval.semitones` of each interval (integers, unless
+      some pitches are microtonal)
+    - `steps` is the signed distance between the staff positions of the two notes (0
+      for a unison, 1 for an ascending second, -2 for a descending third, ...)
+
+    Slicing or indexing with a mask returns a new `IntervalArray`, and iterating over it
+    yields the music21 `Interval` objects, so that code written for lists of intervals
+    keeps working.
+    """
+
+    __slots__ = ("semitones", "steps", "_kinds", "_kind_index")
+
+    def __init__(self, semitones: np.ndarray, steps: np.ndarray):
+        semitones = np.asarray(semitones)
+        if semitones.dtype.kind == "f" and np.all(semitones == np.round(semitones)):
+            semitones = semitones.astype(np.int64)
+        self.semitones = semitones
+        self.steps = np.asarray(steps, dtype=np.int64)
+        self._kinds = None
+        self._kind_index = None
+
+    @classmethod
+    def empty(cls) -> "IntervalArray":
+        return cls(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def from_pitches(
+        cls, diatonic_numbers: np.ndarray, pitch_spaces: np.ndarray
+    ) -> "IntervalArray":
+        """
+        Returns the intervals between consecutive pitches, given music21's
+        `diatonicNoteNum` and `ps` of each pitch.
+        """
+        if len(pitch_spaces) < 2:
+            return cls.empty()
+        return cls(
+            np.diff(np.asarray(pitch_spaces, dtype=np.float64)),
+            np.diff(np.asarray(diatonic_numbers, dtype=np.int64)),
+        )
+
+    @classmethod
+    def from_notes(cls, notes: list) -> "IntervalArray":
+        """
+        Returns the intervals between the first pitches of consecutive music21 notes.
+        """
+        pitches = [note.pitches[0] for note in notes]
+        return cls.from_pitches(
+            [pitch.diatonicNoteNum for pitch in pitches],
+            [pitch.ps for pitch in pitches],
+        )
+
+    @classmethod
+    def concatenate(cls, arrays: List["IntervalArray"]) -> "IntervalArray":
+        """
+        Concatenates several `IntervalArray`, e.g. the intervals of different parts.
+        """
+        if len(arrays) == 0:
+            return cls.empty()
+        return cls(
+            np.concatenate([arr.semitones for arr in arrays]),
+            np.concatenate([arr.steps for arr in arrays]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.semitones)
+
+    def __getitem__(self, key) -> "IntervalArray":
+        if isinstance(key, (int, np.integer)):
+            key = [key]
+        return IntervalArray(self.semitones[key], self.steps[key])
+
+    def __iter__(self) -> Iterator[Interval]:
+        return iter(
+            _interval(steps, semitones)
+            for steps, semitones in zip(self.steps.tolist(), self.semitones.tolist())
+        )
+
+    def __repr__(self) -> str:
+        return f"<IntervalArray intervals={len(self)}>"
+
+    @property
+    def generic(self) -> np.ndarray:
+        """
+        music21's directed generic interval number (1 for a unison, 3 for an ascending
+        third, -2 for a descending second, ...).
+        """
+        return np.where(self.steps >= 0, self.steps + 1, self.steps - 1)
+
+    def directed_names(self) -> np.ndarray:
+        """
+        music21's `Interval.directedName` of each interval, as an array of strings.
+        """
+        kinds, index = self._get_kinds()
+        names = np.array([name for name, _ in kinds], dtype=object)
+        return names[index]
+
+    def qualities(self) -> np.ndarray:
+        """
+        The quality of each interval, one of the `QUALITY_*` constants
+        (`QUALITY_UNKNOWN` if music21 gives a name that is not recognized).
+        """
+        kinds, index = self._get_kinds()
+        qualities = np.array([quality for _, quality in kinds], dtype=np.int64)
+        return qualities[index]
+
+    def name_counts(self) -> Dict[str, int]:
+        """
+        Counts the intervals by `directedName`, in order of first appearance.
+        """
+        distinct, inverse = self.distinct()
+        counts = np.bincount(inverse, minlength=len(distinct))
+        name_counts = {}
+        for name, count in zip(distinct.directed_names().tolist(), counts.tolist()):
+            name_counts[name] = name_counts.get(name, 0) + count
+        return name_counts
+
+    def distinct(self) -> Tuple["IntervalArray", np.ndarray]:
+        """
+        Returns the distinct intervals, in order of first appearance, and the position
+        of each interval among them.
+        """
+        kinds, index = self._get_kinds()
+        if len(index) == 0:
+            return IntervalArray.empty(), np.zeros(0, dtype=np.int64)
+        first = np.full(len(kinds), len(index))
+        np.minimum.at(first, index, np.arange(len(index)))
+        order = np.argsort(first, kind="stable")
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        return self[first[order]], rank[index]
+
+    def _get_kinds(self) -> Tuple[List[Tuple[str, int]], np.ndarray]:
+        # the distinct (steps, semitones) pairs, and the position of each interval
+        # among them
+        if self._kinds is None:
+            pairs = np.stack(
+                [self.steps.astype(np.float64), self.semitones.astype(np.float64)],
+                axis=1,
+            )
+            unique, index = np.unique(pairs, axis=0, return_inverse=True)
+            self._kinds = [
+                _interval_kind(int(steps), _semitones_value(semitones))
+                for steps, semitones in unique.tolist()
+            ]
+            self._kind_index = index.reshape(-1)
+        return self._kinds, self._kind_index
+
+
+@lru_cache(maxsize=None)
+def _interval(steps: int, semitones: float) -> Interval:
+    generic = GenericInterval(steps + 1 if steps >= 0 else steps - 1)
+    return intervalFromGenericAndChromatic(generic, ChromaticInterval(semitones))
+
+
+@lru_cache(maxsize=None)
+def _interval_kind(steps: int, semitones: float) -> Tuple[str, int]:
+    name = _interval(steps, semitones).directedName
+    return name, _quality(name)
+
+
+def _quality(name: str) -> int:
+    if name.startswith("AA"):
+        return QUALITY_DOUBLE_AUGMENTED
+    elif name.startswith("A"):
+        return QUALITY_AUGMENTED
+    elif name.startswith("M"):
+        return QUALITY_MAJOR
+    elif name.lower().startswith("p"):
+        return QUALITY_PERFECT
+    elif name.startswith("m"):
+        return QUALITY_MINOR
+    elif name.startswith("dd"):
+        return QUALITY_DOUBLE_DIMINISHED
+    elif name.startswith("d"):
+        return QUALITY_DIMINISHED
+    return QUALITY_UNKNOWN
+
+
+def _semitones_value(semitones: float):
+    return int(semitones) if semitones == int(semitones) else semitones
+
+
+@lru_cache(maxsize=None)
+def semitones_directed_name(semitones: float) -> str:
+    """
+    Returns the `directedName` of music21's `Interval(semitones)`, e.g. 'M-2' for -2.
+    """
+    return Interval(semitones).directedName
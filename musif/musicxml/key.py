@@ -1,8 +1,16 @@
-from typing import Tuple
+from functools import lru_cache
+from typing import List, Tuple
 
+import numpy as np
+from music21.analysis.discrete import AardenEssen
 from music21.key import Key
+from music21.pitch import Pitch
+from music21.scale import ConcreteScale, MajorScale, MinorScale
 from music21.stream.base import Score
 
+DEGREE_ACCIDENTALS = ["", "sharp", "flat"]
+"""Accidentals of the scale degrees counted by `get_degree_histogram`, in order"""
+
 
 def _get_key_signature(score_key: Key) -> str:
     """
@@ -56,6 +64,26 @@ def get_key_and_mode(score: Score) -> Tuple[Key, str, str]:
     return score_key, tonality, mode
 
 
+def estimate_key(distribution: List[float]) -> Key:
+    """
+    Estimates the key with the Aarden-Essen algorithm as music21's `analyze('key')`
+    does, from a pitch-class distribution weighted by duration (12 values, starting
+    from C).
+    """
+    solver = AardenEssen()
+    solutions = []
+    for mode in ("major", "minor"):
+        results = solver._convoluteDistribution(distribution, mode)
+        differences = solver._getDifference(results, distribution, mode)
+        likely_keys = solver._getLikelyKeys(results, differences)
+        solutions += [(coefficient, p, mode) for (p, coefficient) in likely_keys]
+    solutions.sort()
+    solutions.reverse()
+    coefficient, tonic, mode = solutions[0]
+    tonic = solver._bestKeyEnharmonic(tonic, mode)
+    return solver._solutionToObject((tonic, mode, coefficient))
+
+
 def get_name_from_key(score_key: Key) -> Tuple[str, str]:
     """
     Returns abbreviated designation of keys (uppercase for major mode; lowercase for minor mode)
@@ -87,3 +115,84 @@ def _get_mode(key: str) -> str:
         return "M"
     else:
         return "m"
+
+
+@lru_cache(maxsize=None)
+def _get_scale(key: str) -> ConcreteScale:
+    tonic = key.split(" ")[0]
+    return MajorScale(tonic) if "major" in key.split() else MinorScale(tonic)
+
+
+@lru_cache(maxsize=None)
+def get_degree_and_accidental(key: str, pitch_name: str) -> Tuple[int, str]:
+    """
+    Returns the scale degree of a pitch in a key and the accidental (music21 full name,
+    or "") applied to the degree to get the pitch, as
+    `getScaleDegreeAndAccidentalFromPitch` of the scale of the key does.
+
+    The result only depends on the spelling of the pitch, so it is computed once per
+    key and pitch name and then looked up.
+
+    Example
+    ----------
+    get_degree_and_accidental('D major', 'C') == (7, 'flat')
+
+    Parameters
+    ----------
+        key : str
+            Name of the key (e.g. 'D- major', 'c minor')
+        pitch_name : str
+            Name of the pitch, without octave (e.g. 'F#')
+    """
+    degree, accidental = _get_scale(key).getScaleDegreeAndAccidentalFromPitch(
+        Pitch(pitch_name)
+    )
+    return degree, accidental.fullName if accidental is not None else ""
+
+
+@lru_cache(maxsize=None)
+def _get_degree_index(key: str, pitch_name: str) -> int:
+    degree, accidental = get_degree_and_accidental(key, pitch_name)
+    if accidental not in DEGREE_ACCIDENTALS:
+        return -1
+    return DEGREE_ACCIDENTALS.index(accidental) * 7 + degree - 1
+
+
+def get_degree_indices(key: str, pitch_names: List[str]) -> np.ndarray:
+    """
+    Returns the position of each pitch in the flattened degree histogram of
+    `get_degree_histogram`, or -1 for pitches whose accidental is not in
+    `DEGREE_ACCIDENTALS`.
+    """
+    return np.fromiter(
+        (_get_degree_index(key, name) for name in pitch_names),
+        dtype=np.int64,
+        count=len(pitch_names),
+    )
+
+
+def get_degree_histogram(key: str, pitch_names: List[str]) -> np.ndarray:
+    """
+    Counts the pitches of each scale degree of a key.
+
+    Returns an integer array of shape (3, 7), whose rows are the accidentals in
+    `DEGREE_ACCIDENTALS` and whose columns are the degrees from 1 to 7. Pitches with
+    other accidentals (e.g. double sharps) are not counted. Histograms of several parts
+    can be summed.
+
+    Parameters
+    ----------
+        key : str
+            Name of the key (e.g. 'D- major', 'c minor')
+        pitch_names : list of str
+            Names of the pitches, without octave
+    """
+    return count_degree_indices(get_degree_indices(key, pitch_names))
+
+
+def count_degree_indices(indices: np.ndarray) -> np.ndarray:
+    """
+    Returns the degree histogram of the positions returned by `get_degree_indices`.
+    """
+    counts = np.bincount(indices[indices >= 0], minlength=7 * len(DEGREE_ACCIDENTALS))
+    return counts.reshape(len(DEGREE_ACCIDENTALS), 7)
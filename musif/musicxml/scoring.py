@@ -4,10 +4,16 @@ from music21.stream.base import Part
 from roman import fromRoman, toRoman
 
 from musif.config import ExtractConfiguration
+from musif.musicxml.header import ScoreHeader
 
 ROMAN_NUMERALS_FROM_1_TO_20 = [toRoman(i).upper() for i in range(1, 21)]
 
-def to_abbreviation(part: Part, parts: List[Part], cfg: ExtractConfiguration) -> str:
+def to_abbreviation(
+    part: Part,
+    parts: List[Part],
+    cfg: ExtractConfiguration,
+    header: Optional[ScoreHeader] = None,
+) -> str:
     """
         Returns abbreviation name for a specific part based on the sound name
         
@@ -19,12 +25,16 @@ def to_abbreviation(part: Part, parts: List[Part], cfg: ExtractConfiguration) ->
             List of parts in the score
         cfg: ExtractConfiguration
             ExtractConfiguration object            
+        header: ScoreHeader
+            Header of the score, used to get the instrument sound (see `extract_sound`)
     """
     
-    sound = extract_sound(part, cfg)
+    sound = extract_sound(part, cfg, header)
     return list(_extract_abbreviated_part(sound, part, parts, cfg))[0]
 
-def extract_sound(part: Part, config: ExtractConfiguration) -> str:
+def extract_sound(
+    part: Part, config: ExtractConfiguration, header: Optional[ScoreHeader] = None
+) -> str:
     """
     Returns sound name for a specific part based on the sound name
     Part: VnI -> Sound name: Vn
@@ -34,17 +44,25 @@ def extract_sound(part: Part, config: ExtractConfiguration) -> str:
         Part to get abbreviaton from
     cfg: ExtractConfiguration
         ExtractConfiguration object            
+    header: ScoreHeader
+        Header of the score. If the part is found in it, its instrument sound is taken
+        from the header instead of asking the part for its instrument.
     """
     
-    instrument = part.getInstrument(returnDefault=False)
+    part_header = header.get_part(part.id) if header is not None else None
+    if part_header is not None:
+        instrument_sound = part_header.instrument_sound
+    else:
+        instrument = part.getInstrument(returnDefault=False)
+        instrument_sound = instrument.instrumentSound if instrument is not None else None
     sound_name = None
-    if instrument is None or instrument.instrumentSound is None:
+    if instrument_sound is None:
         sound_name = part.partName.strip().split(' ')[0]
         if sound_name not in config.sound_to_abbreviation:
             sound_name = _replace_naming_exceptions(sound_name, part)
             sound_name = sound_name if sound_name[-1] != 's' else sound_name[:-1]
     else:
-        for instrument in instrument.instrumentSound.split(".")[::-1]:
+        for instrument in instrument_sound.split(".")[::-1]:
             if (
                 "flat" not in instrument
                 and "sharp" not in instrument
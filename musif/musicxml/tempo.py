@@ -1,10 +1,11 @@
 import re
-import xml.etree.ElementTree as ET
 from enum import Enum
 from typing import Optional
 
 import pandas as pd
 
+from musif.musicxml.header import read_score_header
+
 
 class TempoGroup2(Enum):
     """
@@ -286,26 +287,13 @@ def extract_numeric_tempo(file_path: str) -> Optional[int]:
     Finds the numeric tempo in a musixml file by looking at the tempo marking in
     the xml code.
 
+    The file is streamed by `musif.musicxml.header.read_score_header`; if the
+    other metadata of the score are needed too, use that function instead.
+
     Parameters
     ----------
         file_path: str
         Path to xml file to get the tempo from.
 
     """
-    try:
-        tree = ET.parse(file_path)
-    except ET.ParseError as e:
-        return "NA"
-
-    root = tree.getroot()
-    try:
-        tempo = int(
-            root.find("part")
-            .find("measure")
-            .find("direction")
-            .find("sound")
-            .get("tempo")
-        )
-    except:
-        tempo = "NA"
-    return tempo
\ No newline at end of file
+    return read_score_header(file_path).numeric_tempo
@@ -7,6 +7,7 @@ from pathlib import Path
 
 import pandas as pd
 from musif.extract.extract import FeaturesExtractor
+from musif.extract.journal import ErrorJournal
 from musif.process.processor import DataProcessor
 
 # MAIN FILE to run extractions of data by Didone Project.
@@ -19,18 +20,14 @@ DEST_PATH = "destination_path"
 # directory containing .pkl files in case of previous extractions for cache
 cache_dir = None
 
-# csv file containing files which raised error and need to be reextracted
-try:
-    path_error = f'{DEST_PATH}/error_files.csv'
-    errored_files = list(pd.read_csv(path_error, low_memory=False)[FILE_NAME])
-except Exception:
-    # Handle the case where there is no file is empty
-    print("There is no error_files.csv, it will be created and loaded error files are included manually in it.")
-    pass
+# journal of the files which raised errors; use `FeaturesExtractor.retry` to extract
+# them again and merge them into a previous extraction
+error_journal = f'{DEST_PATH}/error_files.jsonl'
+errored_files = ErrorJournal(error_journal).failed_files()
 
-# In case a partial extraction has been run, set here the previous df to avoid re-extracting these files.
-# prev_path = str(prefix / NAME) + '.csv'
-# exclude_files = list(pd.read_csv('martiser/extractions/total_8_12.csv', low_memory=False)['FileName'])
+# directory keeping the manifest of previous extractions: unchanged files are not
+# re-extracted, and their previous rows are reused. None for extracting all the files.
+incremental_dir = None
 
 # In case only some files need to be extracted.
 # xml_files = [filename for filename in os.listdir(data_dir) if os.path.isfile(os.path.join(data_dir, filename)) and filename.endswith('.xml')]
@@ -40,9 +37,10 @@ extracted_df = FeaturesExtractor(
     GenericConfiguration("config_extraction_example.yml"),
     data_dir = str(data_dir), 
     # musescore_dir = Path("data") / "musescore", #only for harmonic analysis
-    # exclude_files = exclude_files,
     # limit_files = limit_files,
     cache_dir=cache_dir,
+    incremental_dir=incremental_dir,
+    error_journal=error_journal,
 ).extract()
 
 extracted_df.to_csv(str(DEST_PATH)+'.csv', index=False)